@@ -0,0 +1,213 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import POOL_CONFIG, STREAM_CONFIG
+from app.utils.bulk_import import bulk_import
+from app.utils.change_listener import ChangeListener
+from app.utils.columnar import fetch_columns
+from app.utils.db_pool import close_pool
+from app.utils.db_utils import execute_batch, execute_procedure, is_function, open_stream, transaction
+from app.utils.export import export_result
+from app.utils.signing import sign_player
+from app.utils.snapshots import create_snapshot, delete_snapshot, drop_database, list_snapshots, restore_snapshot
+
+REQUIRED = object()
+
+
+class _Today:
+    # A current_date default: filled in with today's date when a complete parameter list is needed, since a NULL
+    # in its place would override the SQL default
+    def __repr__(self):
+        return 'current_date'
+
+
+TODAY = _Today()
+
+
+def _required(*names):
+    return [(name, REQUIRED) for name in names]
+
+
+_COUNTERS = ('goals', 'assists', 'tackles', 'saves', 'yellow_cards', 'red_cards')
+_PLAYER = _required('first_name', 'last_name', 'date_of_birth', 'nationality', 'main_position',
+                    'estimated_market_price')
+
+
+def _page(sort_column='player_id', descending=False):
+    return [('page_size', 100), ('sort_column', sort_column), ('descending', descending), ('after_value', None),
+            ('after_id', None), ('nationality', None), ('position', None), ('min_salary', None),
+            ('max_salary', None)]
+
+
+def _by_ids():
+    return _required('player_ids') + [('nationality', None), ('position', None), ('min_salary', None),
+                                      ('max_salary', None)]
+
+
+# Input parameters of every procedure and function in init.sql that is meant to be called directly, in order,
+# with their SQL defaults. INOUT results are returned, not passed.
+PROCEDURES = {
+    'add_player': _PLAYER,
+    'update_player': _required('player_id') + _PLAYER,
+    'update_contract': _required('player_id', 'sign_date', 'end_date', 'monthly_salary'),
+    'update_statistics': _required('player_id', 'matches_played', 'total_play_time', *_COUNTERS),
+    'update_statistics_batch': _required('player_ids', 'matches_played', 'total_play_time', *_COUNTERS),
+    'record_match_events': _required('match_date', 'player_ids', 'play_time', *_COUNTERS),
+    'correct_match_event': _required('event_id', 'play_time', *_COUNTERS),
+    'ensure_match_event_partitions': _required('dates'),
+    'refresh_avg_performance': [('player_ids', None)],
+    'refresh_leaderboard': [('changes_age', None)],
+    'save_performance_weights': _required('positions', *_COUNTERS),
+    'delete_by_id': _required('player_id'),
+    'delete_by_ids': _required('player_ids'),
+    'delete_player': _required('last_name'),
+    'clean_table': _required('table_name'),
+    'clean_all_tables': [],
+    'display_players_contents': [],
+    'display_contracts_contents': [],
+    'display_statistics_contents': [],
+    'display_avg_performance_contents': [],
+    'display_players_page': _page(),
+    'display_contracts_page': _page(),
+    'display_statistics_page': _page(),
+    'display_avg_performance_page': _page('avg_performance', True),
+    'display_players_by_ids': _by_ids(),
+    'display_contracts_by_ids': _by_ids(),
+    'display_statistics_by_ids': _by_ids(),
+    'display_avg_performance_by_ids': _by_ids(),
+    'display_leaderboard': [('group', 'overall'), ('limit', 50), ('group_value', None)],
+    'display_leaderboard_status': [],
+    'display_player_matches': _required('player_id') + [('matches', 5)],
+    'display_recent_form': _required('player_ids') + [('matches', 5)],
+    'display_statistics_between': _required('date_from', 'date_to'),
+    'display_season_statistics': _required('season'),
+    'display_performance_weights': [('version', None)],
+    'display_scoring_inputs': [],
+    'display_expiring_contracts': _required('days') + [('date_from', TODAY)],
+    'display_payroll_projection': _required('date_from', 'date_to'),
+    'display_payroll_by_group': _required('group', 'date_from', 'date_to'),
+    'search_by_last_name': _required('last_name'),
+    'search_players': _required('query') + [('mode', 'prefix'), ('limit', 50)],
+    'calculate_avg_performance': _required('total_play_time', *_COUNTERS) + [('main_position', None)],
+    'season_of': _required('date'),
+}
+
+# Names of the INOUT values procedures return
+OUTPUTS = {
+    'add_player': ['player_id'],
+    'delete_by_ids': ['deleted'],
+    'delete_player': ['deleted_ids'],
+    'save_performance_weights': ['version'],
+}
+
+
+def parameters(procedure):
+    if procedure not in PROCEDURES:
+        raise ValueError(f"Unknown procedure {procedure!r}")
+    return [name for name, _ in PROCEDURES[procedure]]
+
+
+def bind(procedure, args=(), kwargs=None, complete=False):
+    # Turns positional and keyword arguments into the positional parameter list of the SQL call. Trailing
+    # parameters nobody passed are left out, so the database applies its own defaults, unless complete is set.
+    kwargs = kwargs or {}
+    names = parameters(procedure)
+    if len(args) > len(names):
+        raise TypeError(f"{procedure}() takes {len(names)} arguments but {len(args)} were given")
+    for name in kwargs:
+        if name not in names:
+            raise TypeError(f"{procedure}() got an unexpected argument {name!r}")
+        if names.index(name) < len(args):
+            raise TypeError(f"{procedure}() got multiple values for argument {name!r}")
+
+    end = len(names) if complete else max([len(args)] + [names.index(name) + 1 for name in kwargs])
+    values = list(args)
+    for name, default in PROCEDURES[procedure][len(args):]:
+        if name in kwargs:
+            value = kwargs[name]
+        elif default is REQUIRED:
+            raise TypeError(f"{procedure}() missing required argument {name!r}")
+        elif default is TODAY:
+            value = datetime.date.today()
+        else:
+            value = default
+        if len(values) < end:
+            values.append(value)
+    return values
+
+
+def call(procedure, *args, **kwargs):
+    return execute_procedure(procedure, *bind(procedure, args, kwargs))
+
+
+def query(procedure, *args, chunk_size=None, typed=False, **kwargs):
+    # Column names and an iterator that pulls the rows from the server chunk by chunk; typed decodes NUMERIC
+    # to float
+    if not is_function(procedure):
+        raise ValueError(f"{procedure} is a procedure; use call() instead")
+    chunk_size = chunk_size or STREAM_CONFIG['chunk_size']
+    stream, rows = open_stream(procedure, *bind(procedure, args, kwargs), chunk_size=chunk_size, typed=typed)
+    columns = [column.name for column in stream.description]
+
+    def iterate(rows):
+        try:
+            while rows:
+                yield from rows
+                rows = stream.fetch(chunk_size)
+        finally:
+            stream.close()
+
+    return columns, iterate(rows)
+
+
+def query_columns(procedure, *args, **kwargs):
+    # The whole result as one NumPy array per column, keyed by column name
+    if not is_function(procedure):
+        raise ValueError(f"{procedure} is a procedure; only functions return columns")
+    return fetch_columns(procedure, *bind(procedure, args, kwargs))
+
+
+def call_batch(procedure, rows, page_size=100, handle=None):
+    # rows are tuples of positional arguments or dicts of keyword arguments, one per CALL
+    bound = [bind(procedure, kwargs=row, complete=True) if isinstance(row, dict)
+             else bind(procedure, row, complete=True) for row in rows]
+    return execute_batch(procedure, bound, page_size=page_size, handle=handle)
+
+
+def run_concurrently(calls, workers=None, return_exceptions=False):
+    # calls are (procedure, *args) tuples; results come back in the same order. The pool bounds how many
+    # reach the database at once, so more workers than pooled connections only adds waiting.
+    calls = list(calls)
+    with ThreadPoolExecutor(max_workers=workers or POOL_CONFIG['max_size']) as executor:
+        futures = [executor.submit(call, *entry) for entry in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                results.append(e)
+    return results
+
+
+def import_files(players=None, contracts=None, statistics=None):
+    return bulk_import(players=players, contracts=contracts, statistics=statistics)
+
+
+def export(procedure, *args, path, fmt='csv', header=True, **kwargs):
+    return export_result(procedure, *bind(procedure, args, kwargs), path=path, fmt=fmt, header=header)
+
+
+def listen(on_changes, coalesce=None):
+    # Starts a background listener that calls on_changes with {table: changed player IDs, or None for "reload"}
+    # whenever any session commits changes; stop() it when done
+    listener = ChangeListener(on_changes, coalesce=coalesce)
+    listener.start()
+    return listener
+
+
+def close():
+    close_pool()
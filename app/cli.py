@@ -0,0 +1,200 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+from app import api
+from app.utils.export import EXPORT_FORMATS
+
+
+def parse_value(text):
+    # JSON where it parses (numbers, true/false/null, [arrays]); anything else is passed on as text
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_arguments(values):
+    # "name=value" binds by parameter name, anything else is positional
+    args, kwargs = [], {}
+    for value in values:
+        name, sep, text = value.partition("=")
+        if sep and name.isidentifier():
+            kwargs[name] = parse_value(text)
+        elif kwargs:
+            raise ValueError(f"Positional argument {value!r} follows a named one")
+        else:
+            args.append(parse_value(value))
+    return args, kwargs
+
+
+def write_rows(columns, rows, fmt):
+    if fmt == 'jsonl':
+        for row in rows:
+            sys.stdout.write(json.dumps(dict(zip(columns, row)), default=str) + "\n")
+        return
+    writer = csv.writer(sys.stdout)
+    writer.writerow(columns)
+    writer.writerows(rows)
+
+
+def list_procedures(args):
+    for procedure, specs in sorted(api.PROCEDURES.items()):
+        params = [name if default is api.REQUIRED else f"{name}={default!r}" for name, default in specs]
+        print(f"{procedure}({', '.join(params)})")
+
+
+def call(args):
+    positional, named = parse_arguments(args.arguments)
+    if api.is_function(args.procedure):
+        columns, rows = api.query(args.procedure, *positional, **named)
+        write_rows(columns, rows, args.format)
+        return
+    result = api.call(args.procedure, *positional, **named)
+    if result:
+        write_rows(api.OUTPUTS.get(args.procedure, ["result"]), result, args.format)
+
+
+def batch(args):
+    # One CALL per CSV row; the header names the parameters and empty cells take their defaults
+    source = sys.stdin if args.file == "-" else open(args.file, newline="", encoding="utf-8")
+    with source:
+        rows = [{name: parse_value(value) for name, value in row.items() if value != ""}
+                for row in csv.DictReader(source)]
+    start = time.perf_counter()
+    count = api.call_batch(args.procedure, rows, page_size=args.page_size)
+    print(f"{count} calls of {args.procedure} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+def parallel(args):
+    # One JSON array per line: ["procedure", arg, ...]. Results are written in input order, one per line.
+    source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    with source:
+        calls = [tuple(json.loads(line)) for line in source if line.strip()]
+    start = time.perf_counter()
+    results = api.run_concurrently(calls, workers=args.workers, return_exceptions=True)
+    failed = 0
+    for entry, result in zip(calls, results):
+        if isinstance(result, Exception):
+            failed += 1
+            output = {'procedure': entry[0], 'error': str(result)}
+        else:
+            output = {'procedure': entry[0], 'rows': result}
+        sys.stdout.write(json.dumps(output, default=str) + "\n")
+    print(f"{len(calls)} calls ({failed} failed) in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+def export(args):
+    positional, named = parse_arguments(args.arguments)
+    report = api.export(args.procedure, *positional, path=args.output, fmt=args.format,
+                        header=not args.no_header, **named)
+    print(report.summary(), file=sys.stderr)
+
+
+def import_files(args):
+    if not (args.players or args.contracts or args.statistics):
+        raise ValueError("Nothing to import; pass --players, --contracts and/or --statistics")
+    report = api.import_files(players=args.players, contracts=args.contracts, statistics=args.statistics)
+    print(report.summary(), file=sys.stderr)
+
+
+def snapshot(args):
+    if args.action == 'list':
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["name", "taken_at", "size_bytes"])
+        writer.writerows(api.list_snapshots())
+        return
+    if not args.name:
+        raise ValueError(f"snapshot {args.action} needs a snapshot name")
+    start = time.perf_counter()
+    if args.action == 'create':
+        api.create_snapshot(args.name, replace=args.replace)
+    elif args.action == 'restore':
+        api.restore_snapshot(args.name)
+    else:
+        api.delete_snapshot(args.name)
+    print(f"snapshot {args.action} {args.name} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+def watch(args):
+    # One JSON line per coalesced batch of changes until interrupted
+    def show(changes):
+        batch = {table: None if ids is None else sorted(ids) for table, ids in changes.items()}
+        sys.stdout.write(json.dumps(batch) + "\n")
+        sys.stdout.flush()
+
+    listener = api.listen(show, coalesce=args.coalesce)
+    try:
+        while listener.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli",
+                                     description="Run the football management procedures without the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list the procedures and their parameters").set_defaults(run=list_procedures)
+
+    call_parser = commands.add_parser("call", help="run one procedure or function and print its result")
+    call_parser.add_argument("procedure")
+    call_parser.add_argument("arguments", nargs="*", help="values, or name=value; JSON values are decoded")
+    call_parser.add_argument("--format", choices=EXPORT_FORMATS, default='csv')
+    call_parser.set_defaults(run=call)
+
+    batch_parser = commands.add_parser("batch", help="run a procedure once per CSV row, pipelined in one "
+                                                     "transaction")
+    batch_parser.add_argument("procedure")
+    batch_parser.add_argument("file", help="CSV file whose header names the parameters, or - for stdin")
+    batch_parser.add_argument("--page-size", type=int, default=100, help="calls sent per round trip")
+    batch_parser.set_defaults(run=batch)
+
+    parallel_parser = commands.add_parser("parallel", help="run independent calls concurrently")
+    parallel_parser.add_argument("file", help="JSON lines of [\"procedure\", arg, ...], or - for stdin")
+    parallel_parser.add_argument("--workers", type=int, help="defaults to the connection pool size")
+    parallel_parser.set_defaults(run=parallel)
+
+    export_parser = commands.add_parser("export", help="stream a display or search function to a file")
+    export_parser.add_argument("procedure")
+    export_parser.add_argument("arguments", nargs="*")
+    export_parser.add_argument("--output", required=True)
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default='csv')
+    export_parser.add_argument("--no-header", action="store_true")
+    export_parser.set_defaults(run=export)
+
+    import_parser = commands.add_parser("import", help="bulk import CSV files")
+    import_parser.add_argument("--players")
+    import_parser.add_argument("--contracts")
+    import_parser.add_argument("--statistics")
+    import_parser.set_defaults(run=import_files)
+
+    snapshot_parser = commands.add_parser("snapshot", help="take, restore, list or delete database snapshots")
+    snapshot_parser.add_argument("action", choices=['list', 'create', 'restore', 'delete'])
+    snapshot_parser.add_argument("name", nargs="?")
+    snapshot_parser.add_argument("--replace", action="store_true", help="overwrite an existing snapshot on create")
+    snapshot_parser.set_defaults(run=snapshot)
+
+    watch_parser = commands.add_parser("watch", help="print the players whose rows other sessions change")
+    watch_parser.add_argument("--coalesce", type=float, help="seconds to merge a burst of changes over")
+    watch_parser.set_defaults(run=watch)
+
+    args = parser.parse_args(argv)
+    try:
+        args.run(args)
+    except (RuntimeError, ValueError, TypeError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        api.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,4 +4,53 @@ DB_CONFIG = {
     'password': 'password',
     'host': 'localhost',
     'port': '5433'
-}
\ No newline at end of file
+}
+
+# Superuser connection to the maintenance database, for dropping, snapshotting and restoring the database above
+ADMIN_DB_CONFIG = {
+    'dbname': 'postgres',
+    'user': 'admin',
+    'password': 'secure_password',
+    'host': 'localhost',
+    'port': '5433'
+}
+
+POOL_CONFIG = {
+    'min_size': 1,
+    'max_size': 10,
+    'checkout_timeout': 30,
+    'health_check_interval': 30,
+    'max_idle_time': 300
+}
+
+STREAM_CONFIG = {
+    'chunk_size': 200,
+    'idle_timeout': 30
+}
+
+CACHE_CONFIG = {
+    'max_entries': 256,
+    'max_bytes': 16 * 1024 * 1024,
+    'ttl': 60
+}
+
+METRICS_CONFIG = {
+    'capacity': 1000,
+    'window': 300,
+    'log_file': None
+}
+
+SNAPSHOT_CONFIG = {
+    # Times to disconnect everyone and retry when a session slips in before CREATE or DROP DATABASE
+    'disconnect_attempts': 5,
+    'retry_delay': 0.2
+}
+
+LISTEN_CONFIG = {
+    # Seconds to keep merging change notifications after the first before handing them on
+    'coalesce': 0.25,
+    'poll_interval': 0.5,
+    'reconnect_delay': 2,
+    # Seconds the GUI waits after a change to players or scores before recomputing the rankings
+    'leaderboard_refresh_delay': 10
+}
@@ -6,8 +6,6 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.ui.main_window import DatabaseApp
 
-os.environ['QT_QPA_PLATFORM'] = 'windows'
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = DatabaseApp()
@@ -1,9 +1,25 @@
+import importlib
+
 from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTabWidget
-from app.ui.tabs.player_tab import PlayerTab
-from app.ui.tabs.contract_tab import ContractTab
-from app.ui.tabs.statistics_tab import StatisticsTab
-from app.ui.tabs.utilities_tab import UtilitiesTab
-from app.ui.tabs.database_tab import DatabaseTab
+from PyQt5.QtCore import QTimer
+from app.ui.workers import run_in_background
+
+# (attribute, title, module, class) in tab order; each tab is imported and built the first time it is opened
+TABS = [
+    ('player_tab', "Player Management", 'app.ui.tabs.player_tab', 'PlayerTab'),
+    ('statistics_tab', "Statistics Management", 'app.ui.tabs.statistics_tab', 'StatisticsTab'),
+    ('contract_tab', "Contract Management", 'app.ui.tabs.contract_tab', 'ContractTab'),
+    ('utilities_tab', "Utilities", 'app.ui.tabs.utilities_tab', 'UtilitiesTab'),
+    ('scoring_tab', "Scoring", 'app.ui.tabs.scoring_tab', 'ScoringTab'),
+    ('database_tab', "Database Management", 'app.ui.tabs.database_tab', 'DatabaseTab'),
+    ('diagnostics_tab', "Diagnostics", 'app.ui.tabs.diagnostics_tab', 'DiagnosticsTab'),
+]
+
+
+def prewarm_pool(handle=None):
+    # Runs on a worker thread, so loading psycopg2 and connecting never delay the first paint
+    from app.utils.db_pool import get_pool
+    get_pool().fill()
 
 
 class DatabaseApp(QMainWindow):
@@ -19,14 +35,34 @@ class DatabaseApp(QMainWindow):
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
 
-        self.player_tab = PlayerTab()
-        self.contract_tab = ContractTab()
-        self.statistics_tab = StatisticsTab()
-        self.utilities_tab = UtilitiesTab()
-        self.database_tab = DatabaseTab()
-
-        self.tabs.addTab(self.player_tab, "Player Management")
-        self.tabs.addTab(self.statistics_tab, "Statistics Management")
-        self.tabs.addTab(self.contract_tab, "Contract Management")
-        self.tabs.addTab(self.utilities_tab, "Utilities")
-        self.tabs.addTab(self.database_tab, "Database Management")
+        for attribute, title, _, _ in TABS:
+            setattr(self, attribute, None)
+            placeholder = QWidget()
+            QVBoxLayout(placeholder).setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(placeholder, title)
+
+        self.prewarmed = False
+        self.tabs.currentChanged.connect(self.build_tab)
+        self.build_tab(self.tabs.currentIndex())
+
+    def build_tab(self, index):
+        attribute, _, module, class_name = TABS[index]
+        tab = getattr(self, attribute)
+        if tab is None:
+            tab = getattr(importlib.import_module(module), class_name)()
+            self.tabs.widget(index).layout().addWidget(tab)
+            setattr(self, attribute, tab)
+        return tab
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.prewarmed:
+            self.prewarmed = True
+            # Queued so the window finishes painting before the connection is opened
+            QTimer.singleShot(0, self.prewarm)
+
+    def prewarm(self):
+        self.statusBar().showMessage("Connecting to the database...")
+        run_in_background(prewarm_pool,
+                          on_result=lambda _: self.statusBar().showMessage("Connected to the database", 5000),
+                          on_error=lambda e: self.statusBar().showMessage(f"Database unavailable: {e}"))
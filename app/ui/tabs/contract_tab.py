@@ -1,6 +1,33 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
+import datetime
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, \
+    QComboBox, QGroupBox, QSlider, QTableView, QAbstractItemView
+from PyQt5.QtCore import Qt, QTimer
 from app.utils.helpers import is_valid_date
-from app.utils.db_utils import execute_procedure
+from app.utils.db_utils import open_stream
+from app.ui.widgets.query_progress import QueryProgress
+from app.ui.widgets.result_model import ResultTableModel
+
+# Views of the payroll panel: the SQL function behind each, its grouping and its column headers
+PAYROLL_VIEWS = [
+    ("Expiring Contracts", 'display_expiring_contracts', None,
+     ["Player ID", "First Name", "Last Name", "Main Position", "Nationality", "Sign Date", "End Date", "Days Left",
+      "Monthly Salary"]),
+    ("Monthly Payroll", 'display_payroll_projection', None, ["Month", "Players", "Payroll"]),
+    ("Payroll by Position", 'display_payroll_by_group', 'position',
+     ["Main Position", "Players", "Monthly Payroll", "Committed Payroll", "Expiring Players", "Expiring Payroll"]),
+    ("Payroll by Nationality", 'display_payroll_by_group', 'nationality',
+     ["Nationality", "Players", "Monthly Payroll", "Committed Payroll", "Expiring Players", "Expiring Payroll"]),
+]
+
+# Horizon slider range and steps, in days
+HORIZON_MIN_DAYS = 30
+HORIZON_MAX_DAYS = 5 * 365
+HORIZON_STEP_DAYS = 30
+HORIZON_DEFAULT_DAYS = 365
+
+# Milliseconds to wait after the slider stops before querying again
+HORIZON_DEBOUNCE_MS = 75
 
 
 class ContractTab(QWidget):
@@ -14,6 +41,17 @@ class ContractTab(QWidget):
 
         self.update_contract_btn = QPushButton("Update Contract")
 
+        self.progress = QueryProgress()
+
+        self.view_input = QComboBox()
+        self.as_of_input = QLineEdit(datetime.date.today().isoformat())
+        self.horizon_slider = QSlider(Qt.Horizontal)
+        self.horizon_label = QLabel()
+        self.payroll_table = QTableView()
+        self.payroll_progress = QueryProgress()
+        self.horizon_timer = QTimer(self)
+        self.current_query = None
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -37,7 +75,50 @@ class ContractTab(QWidget):
         self.update_contract_btn.clicked.connect(self.update_contract)
 
         layout.addWidget(self.update_contract_btn)
+
+        self.progress.busy_changed.connect(lambda busy: self.update_contract_btn.setEnabled(not busy))
+        layout.addWidget(self.progress)
+
+        # Contract expiry and payroll, redrawn as the horizon moves
+        payroll_group = QGroupBox("Expiry and Payroll")
+        payroll_layout = QVBoxLayout()
+
+        controls_layout = QHBoxLayout()
+        for title, *_ in PAYROLL_VIEWS:
+            self.view_input.addItem(title)
+        controls_layout.addWidget(QLabel("View:"))
+        controls_layout.addWidget(self.view_input)
+        controls_layout.addWidget(QLabel("From (YYYY-MM-DD):"))
+        controls_layout.addWidget(self.as_of_input)
+        payroll_layout.addLayout(controls_layout)
+
+        horizon_layout = QHBoxLayout()
+        self.horizon_slider.setRange(HORIZON_MIN_DAYS, HORIZON_MAX_DAYS)
+        self.horizon_slider.setSingleStep(HORIZON_STEP_DAYS)
+        self.horizon_slider.setPageStep(3 * HORIZON_STEP_DAYS)
+        self.horizon_slider.setValue(HORIZON_DEFAULT_DAYS)
+        horizon_layout.addWidget(QLabel("Horizon:"))
+        horizon_layout.addWidget(self.horizon_slider)
+        horizon_layout.addWidget(self.horizon_label)
+        payroll_layout.addLayout(horizon_layout)
+
+        self.payroll_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        payroll_layout.addWidget(self.payroll_table)
+        payroll_layout.addWidget(self.payroll_progress)
+        payroll_group.setLayout(payroll_layout)
+        layout.addWidget(payroll_group)
+
+        # Queries follow the slider once it pauses, not every step it passes
+        self.horizon_timer.setSingleShot(True)
+        self.horizon_timer.setInterval(HORIZON_DEBOUNCE_MS)
+        self.horizon_timer.timeout.connect(self.refresh_payroll)
+        self.horizon_slider.valueChanged.connect(self.horizon_changed)
+        self.view_input.currentIndexChanged.connect(self.refresh_payroll)
+        self.as_of_input.editingFinished.connect(self.refresh_payroll)
+
         self.setLayout(layout)
+        self.update_horizon_label()
+        self.refresh_payroll()
 
     def update_contract(self):
         # Check if required fields are empty
@@ -54,16 +135,74 @@ class ContractTab(QWidget):
             # Convert values to appropriate types
             player_id = int(self.contract_player_id_input.text())
             monthly_salary = float(self.monthly_salary_input.text())
-            execute_procedure(
-                "update_contract",
-                player_id,
-                self.sign_date_input.text(),
-                self.end_date_input.text(),
-                monthly_salary
-            )
-            QMessageBox.information(self, "Success", "Contract updated successfully!")
         except ValueError:
             QMessageBox.warning(self, "Input Error",
                                 "Player ID must be an integer and Monthly Salary must be a valid number.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error updating contract:\n{e}")
+            return
+
+        self.progress.run(
+            "update_contract",
+            player_id,
+            self.sign_date_input.text(),
+            self.end_date_input.text(),
+            monthly_salary,
+            message="Updating contract...",
+            on_result=self.on_contract_updated,
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Error updating contract:\n{e}")
+        )
+
+    def on_contract_updated(self, _):
+        QMessageBox.information(self, "Success", "Contract updated successfully!")
+        self.refresh_payroll()
+
+    def horizon_window(self):
+        start = datetime.date.fromisoformat(self.as_of_input.text())
+        return start, start + datetime.timedelta(days=self.horizon_slider.value())
+
+    def update_horizon_label(self):
+        days = self.horizon_slider.value()
+        if is_valid_date(self.as_of_input.text()):
+            self.horizon_label.setText(f"{days} days (until {self.horizon_window()[1].isoformat()})")
+        else:
+            self.horizon_label.setText(f"{days} days")
+
+    def horizon_changed(self):
+        self.update_horizon_label()
+        self.horizon_timer.start()
+
+    def refresh_payroll(self):
+        self.horizon_timer.stop()
+        if not is_valid_date(self.as_of_input.text()):
+            QMessageBox.warning(self, "Input Error", "Date must be in the format YYYY-MM-DD.")
+            return
+        self.update_horizon_label()
+
+        _, procedure, group, headers = PAYROLL_VIEWS[self.view_input.currentIndex()]
+        start, end = self.horizon_window()
+        if procedure == 'display_expiring_contracts':
+            params = (self.horizon_slider.value(), start)
+        elif group is None:
+            params = (start, end)
+        else:
+            params = (group, start, end)
+
+        # A newer horizon supersedes the query still in flight
+        if self.current_query is not None:
+            self.current_query.cancel()
+        self.current_query = self.payroll_progress.start(
+            open_stream, procedure, *params, typed=True,
+            message="Loading payroll...",
+            on_result=lambda result: self.show_payroll(result, headers),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to load the payroll:\n{e}"),
+            on_discard=lambda result: result[0].close()
+        )
+
+    def show_payroll(self, result, headers):
+        stream, rows = result
+        model = ResultTableModel(headers, rows, stream, progress=self.payroll_progress)
+        model.fetch_failed.connect(lambda e: QMessageBox.critical(self, "Error", f"Failed to load the payroll:\n{e}"))
+        old_model = self.payroll_table.model()
+        self.payroll_table.setModel(model)
+        if old_model is not None:
+            old_model.close()
+            old_model.deleteLater()
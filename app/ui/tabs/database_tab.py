@@ -1,26 +1,8 @@
 from PyQt5.QtWidgets import QInputDialog, QWidget, QVBoxLayout, QPushButton, QMessageBox
-from app.utils.db_utils import execute_procedure
-import psycopg2
-
-
-def delete_database():
-
-    db_name = 'football_management'
-    conn = psycopg2.connect(
-        dbname="postgres", user="admin", password="secure_password", host='localhost', port='5433'
-    )
-    conn.autocommit = True
-    cursor = conn.cursor()
-
-    # Завершаем все подключения к базе данных
-    cursor.execute(f"""
-        SELECT pg_terminate_backend(pg_stat_activity.pid)
-        FROM pg_stat_activity
-        WHERE pg_stat_activity.datname = '{db_name}'
-        AND pid <> pg_backend_pid();
-    """)
-
-    cursor.execute(f"DROP DATABASE {db_name}")
+from app.ui.widgets.bulk_import_dialog import BulkImportDialog
+from app.ui.widgets.query_progress import QueryProgress
+from app.utils.bulk_import import bulk_import
+from app.utils.snapshots import create_snapshot, delete_snapshot, drop_database, list_snapshots, restore_snapshot
 
 
 class DatabaseTab(QWidget):
@@ -30,6 +12,12 @@ class DatabaseTab(QWidget):
         self.clean_table_btn = QPushButton("Clean Table")
         self.clean_all_tables_btn = QPushButton("Clean All Tables")
         self.drop_db_btn = QPushButton("Drop Database")
+        self.bulk_import_btn = QPushButton("Bulk Import CSV")
+        self.snapshot_btn = QPushButton("Take Snapshot...")
+        self.restore_btn = QPushButton("Restore Snapshot...")
+        self.delete_snapshot_btn = QPushButton("Delete Snapshot...")
+
+        self.progress = QueryProgress()
 
         self.setup_ui()
 
@@ -42,9 +30,21 @@ class DatabaseTab(QWidget):
         layout.addWidget(self.clean_table_btn)
         layout.addWidget(self.clean_all_tables_btn)
 
+        self.bulk_import_btn.clicked.connect(self.bulk_import)
+        layout.addWidget(self.bulk_import_btn)
+
+        self.snapshot_btn.clicked.connect(self.take_snapshot)
+        self.restore_btn.clicked.connect(lambda: self.choose_snapshot(self.restore_snapshot))
+        self.delete_snapshot_btn.clicked.connect(lambda: self.choose_snapshot(self.delete_snapshot))
+        layout.addWidget(self.snapshot_btn)
+        layout.addWidget(self.restore_btn)
+        layout.addWidget(self.delete_snapshot_btn)
+
         self.drop_db_btn.clicked.connect(self.drop_database)
 
         layout.addWidget(self.drop_db_btn)
+        layout.addWidget(self.progress)
+        self.progress.busy_changed.connect(self.set_busy)
         self.setLayout(layout)
 
     def drop_database(self):
@@ -54,21 +54,112 @@ class DatabaseTab(QWidget):
         )
 
         if confirm == QMessageBox.Yes:
-            try:
-                delete_database()
-                QMessageBox.information(self, "Success", "Database dropped successfully!")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to drop database:\n{e}")
+            self.progress.start(drop_database, message="Dropping database...",
+                                on_result=lambda _: QMessageBox.information(self, "Success",
+                                                                            "Database dropped successfully!"),
+                                on_error=lambda e: QMessageBox.critical(self, "Error",
+                                                                        f"Failed to drop database:\n{e}"))
+
+    def set_busy(self, busy):
+        # Snapshots disconnect every session, so they never run next to anything else from this tab
+        for button in (self.snapshot_btn, self.restore_btn, self.delete_snapshot_btn, self.drop_db_btn):
+            button.setEnabled(not busy)
+
+    def take_snapshot(self):
+        name, ok = QInputDialog.getText(self, "Take Snapshot", "Snapshot name (lowercase letters, digits, _):")
+        if not ok or not name:
+            return
+        self.progress.start(list_snapshots, message="Listing snapshots...",
+                            on_result=lambda snapshots: self.create_snapshot(name, snapshots),
+                            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to list snapshots:\n{e}"))
+
+    def create_snapshot(self, name, snapshots):
+        replace = name in [snapshot[0] for snapshot in snapshots]
+        if replace:
+            confirm = QMessageBox.question(self, "Replace Snapshot", f"Snapshot '{name}' already exists. Replace it?",
+                                           QMessageBox.Yes | QMessageBox.No)
+            if confirm != QMessageBox.Yes:
+                return
+        self.progress.start(create_snapshot, name, replace=replace, message=f"Taking snapshot {name}...",
+                            on_result=lambda _: QMessageBox.information(self, "Success", f"Snapshot '{name}' taken."),
+                            on_error=lambda e: QMessageBox.critical(self, "Error",
+                                                                    f"Failed to take the snapshot:\n{e}"))
+
+    def choose_snapshot(self, then):
+        self.progress.start(list_snapshots, message="Listing snapshots...",
+                            on_result=lambda snapshots: self.on_snapshots(snapshots, then),
+                            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to list snapshots:\n{e}"))
+
+    def on_snapshots(self, snapshots, then):
+        if not snapshots:
+            QMessageBox.information(self, "Snapshots", "There are no snapshots yet.")
+            return
+        labels = [f"{name} (taken {taken or 'unknown'}, {size / 1024 / 1024:.0f} MB)"
+                  for name, taken, size in snapshots]
+        label, ok = QInputDialog.getItem(self, "Snapshots", "Snapshot:", labels, 0, False)
+        if ok:
+            then(snapshots[labels.index(label)][0])
+
+    def restore_snapshot(self, name):
+        confirm = QMessageBox.question(
+            self, "Confirm Restore",
+            f"Replace the database with snapshot '{name}'? Everything changed since it was taken is lost.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if confirm == QMessageBox.Yes:
+            self.progress.start(restore_snapshot, name, message=f"Restoring snapshot {name}...",
+                                on_result=lambda _: QMessageBox.information(self, "Success",
+                                                                            f"Database restored from '{name}'."),
+                                on_error=lambda e: QMessageBox.critical(self, "Error",
+                                                                        f"Failed to restore the snapshot:\n{e}"))
+
+    def delete_snapshot(self, name):
+        confirm = QMessageBox.question(self, "Confirm Delete", f"Delete snapshot '{name}'?",
+                                       QMessageBox.Yes | QMessageBox.No)
+        if confirm == QMessageBox.Yes:
+            self.progress.start(delete_snapshot, name, message=f"Deleting snapshot {name}...",
+                                on_result=lambda _: QMessageBox.information(self, "Success",
+                                                                            f"Snapshot '{name}' deleted."),
+                                on_error=lambda e: QMessageBox.critical(self, "Error",
+                                                                        f"Failed to delete the snapshot:\n{e}"))
 
     def clean_table(self):
         table_name, ok = self.get_table_name()
         if ok:
-            execute_procedure("clean_table", table_name)
-            QMessageBox.information(self, "Success", f"Table '{table_name}' cleaned successfully!")
+            self.progress.run("clean_table", table_name, message=f"Cleaning {table_name}...",
+                              on_result=lambda _: QMessageBox.information(
+                                  self, "Success", f"Table '{table_name}' cleaned successfully!"),
+                              on_error=lambda e: QMessageBox.critical(self, "Error", e))
 
     def clean_all_tables(self):
-        execute_procedure("clean_all_tables")
-        QMessageBox.information(self, "Success", "All tables cleaned successfully!")
+        self.progress.run("clean_all_tables", message="Cleaning all tables...",
+                          on_result=lambda _: QMessageBox.information(self, "Success",
+                                                                      "All tables cleaned successfully!"),
+                          on_error=lambda e: QMessageBox.critical(self, "Error", e))
+
+    def bulk_import(self):
+        dialog = BulkImportDialog(self)
+        if dialog.exec_() != BulkImportDialog.Accepted:
+            return
+
+        paths = dialog.paths()
+        if not any(paths.values()):
+            QMessageBox.warning(self, "Input Error", "Please select at least one CSV file to import.")
+            return
+
+        self.bulk_import_btn.setEnabled(False)
+        self.progress.start(bulk_import, **paths, message="Importing CSV files...",
+                            on_result=self.show_import_report,
+                            on_error=lambda e: QMessageBox.critical(self, "Error", f"Bulk import failed:\n{e}"),
+                            on_finished=lambda: self.bulk_import_btn.setEnabled(True))
+
+    def show_import_report(self, report):
+        box = QMessageBox(QMessageBox.Information, "Bulk Import", report.summary(), QMessageBox.Ok, self)
+        if report.rejected:
+            box.setDetailedText("\n".join(
+                f"{table} line {line}: {reason}" for table, line, reason in report.rejected[:1000]
+            ))
+        box.exec_()
 
     def get_table_name(self):
         table_name, ok = QInputDialog.getText(self, "Table Name", "Enter table name:")
@@ -0,0 +1,188 @@
+import datetime
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox, QTableWidget, \
+    QTableWidgetItem, QAbstractItemView, QPlainTextEdit, QFileDialog, QGroupBox, QHeaderView
+from PyQt5.QtCore import QTimer
+from app.ui.widgets.query_progress import QueryProgress
+from app.utils.db_utils import explain_procedure, is_function
+from app.utils.metrics import JsonLinesExporter, get_metrics
+from app.utils.query_cache import get_cache
+
+SUMMARY_COLUMNS = ["Procedure", "Calls", "Errors", "Cache Hits", "Avg Rows", "p50 (ms)", "p95 (ms)", "p99 (ms)"]
+SLOWEST_COLUMNS = ["Time", "Procedure", "Total (ms)", "Checkout (ms)", "Execute (ms)", "Fetch (ms)", "Rows",
+                   "Error"]
+
+REFRESH_INTERVAL_MS = 2000
+SLOWEST_COUNT = 20
+
+
+def format_ms(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+class DiagnosticsTab(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.summary_table = QTableWidget(0, len(SUMMARY_COLUMNS))
+        self.slowest_table = QTableWidget(0, len(SLOWEST_COLUMNS))
+        self.plan_output = QPlainTextEdit()
+        self.cache_label = QLabel()
+
+        self.refresh_btn = QPushButton("Refresh")
+        self.explain_btn = QPushButton("Explain Selected Call")
+        self.export_btn = QPushButton("Export Metrics...")
+        self.log_btn = QPushButton("Log Calls to File...")
+        self.clear_btn = QPushButton("Clear")
+
+        self.progress = QueryProgress()
+        self.refresh_timer = QTimer(self)
+        self.slowest_records = []
+        self.log_exporter = None
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        for table, columns in ((self.summary_table, SUMMARY_COLUMNS), (self.slowest_table, SLOWEST_COLUMNS)):
+            table.setHorizontalHeaderLabels(columns)
+            table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+            table.setSelectionBehavior(QAbstractItemView.SelectRows)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.slowest_table.setSelectionMode(QAbstractItemView.SingleSelection)
+
+        summary_group = QGroupBox("Latency by Procedure (last 5 minutes)")
+        summary_layout = QVBoxLayout()
+        summary_layout.addWidget(self.summary_table)
+        summary_layout.addWidget(self.cache_label)
+        summary_group.setLayout(summary_layout)
+        layout.addWidget(summary_group)
+
+        slowest_group = QGroupBox("Slowest Recent Calls")
+        slowest_layout = QVBoxLayout()
+        slowest_layout.addWidget(self.slowest_table)
+        slowest_group.setLayout(slowest_layout)
+        layout.addWidget(slowest_group)
+
+        plan_group = QGroupBox("Query Plan")
+        plan_layout = QVBoxLayout()
+        self.plan_output.setReadOnly(True)
+        self.plan_output.setPlaceholderText("Select a call above and press \"Explain Selected Call\".")
+        plan_layout.addWidget(self.plan_output)
+        plan_group.setLayout(plan_layout)
+        layout.addWidget(plan_group)
+
+        buttons_layout = QHBoxLayout()
+        self.log_btn.setCheckable(True)
+        for button in (self.refresh_btn, self.explain_btn, self.export_btn, self.log_btn, self.clear_btn):
+            buttons_layout.addWidget(button)
+        layout.addLayout(buttons_layout)
+        layout.addWidget(self.progress)
+
+        self.refresh_btn.clicked.connect(self.refresh)
+        self.explain_btn.clicked.connect(self.explain_selected)
+        self.export_btn.clicked.connect(self.export_metrics)
+        self.log_btn.toggled.connect(self.toggle_logging)
+        self.clear_btn.clicked.connect(self.clear)
+        self.progress.busy_changed.connect(lambda busy: self.explain_btn.setEnabled(not busy))
+
+        # Refresh only while the tab is visible
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        self.setLayout(layout)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def refresh(self):
+        metrics = get_metrics()
+
+        summary = metrics.summary()
+        self.summary_table.setRowCount(len(summary))
+        for row, entry in enumerate(summary):
+            values = [entry['procedure'], entry['calls'], entry['errors'], entry['cached'],
+                      f"{entry['avg_rows']:.1f}", format_ms(entry['p50_ms']), format_ms(entry['p95_ms']),
+                      format_ms(entry['p99_ms'])]
+            for column, value in enumerate(values):
+                self.summary_table.setItem(row, column, QTableWidgetItem(str(value)))
+
+        # Keep the selection on the same call across refreshes
+        selected = self.selected_record()
+        self.slowest_records = metrics.slowest(SLOWEST_COUNT)
+        self.slowest_table.setRowCount(len(self.slowest_records))
+        for row, record in enumerate(self.slowest_records):
+            values = [datetime.datetime.fromtimestamp(record.timestamp).strftime("%H:%M:%S"), record.label,
+                      format_ms(record.total * 1000), format_ms(record.checkout * 1000),
+                      format_ms(record.execute * 1000), format_ms(record.fetch * 1000),
+                      "-" if record.rows is None else record.rows, record.error or ""]
+            for column, value in enumerate(values):
+                self.slowest_table.setItem(row, column, QTableWidgetItem(str(value)))
+            if record is selected:
+                self.slowest_table.selectRow(row)
+
+        stats = get_cache().stats()
+        self.cache_label.setText(
+            f"Result cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+            f"{stats['entries']} entries, {stats['bytes'] / 1024:.0f} KiB"
+        )
+
+    def selected_record(self):
+        row = self.slowest_table.currentRow()
+        if not self.slowest_table.selectionModel().hasSelection() or not 0 <= row < len(self.slowest_records):
+            return None
+        return self.slowest_records[row]
+
+    def explain_selected(self):
+        record = self.selected_record()
+        if record is None:
+            QMessageBox.warning(self, "No Selection", "Please select a call to explain.")
+            return
+        if not is_function(record.procedure):
+            QMessageBox.warning(self, "Not Supported",
+                                f"{record.procedure} is a procedure; only display and search functions can be "
+                                f"explained.")
+            return
+
+        self.progress.start(explain_procedure, record.procedure, *record.params,
+                            message=f"Explaining {record.procedure}...",
+                            on_result=self.plan_output.setPlainText,
+                            on_error=lambda e: QMessageBox.critical(self, "Error", f"EXPLAIN failed:\n{e}"))
+
+    def export_metrics(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "metrics.jsonl", "JSON Lines (*.jsonl)")
+        if not path:
+            return
+        try:
+            count = get_metrics().export(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to export metrics:\n{e}")
+            return
+        QMessageBox.information(self, "Success", f"Exported {count} calls to {path}.")
+
+    def toggle_logging(self, enabled):
+        metrics = get_metrics()
+        if not enabled:
+            if self.log_exporter is not None:
+                metrics.remove_exporter(self.log_exporter)
+                self.log_exporter = None
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Log Calls To", "calls.jsonl", "JSON Lines (*.jsonl)")
+        if not path:
+            self.log_btn.setChecked(False)
+            return
+        # Every following call is appended to the file as one JSON object per line
+        self.log_exporter = metrics.add_exporter(JsonLinesExporter(path))
+
+    def clear(self):
+        get_metrics().clear()
+        self.plan_output.clear()
+        self.refresh()
@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
 from app.utils.helpers import is_valid_date
-from app.utils.db_utils import execute_procedure
+from app.ui.widgets.query_progress import QueryProgress
+from app.ui.widgets.sign_player_dialog import SignPlayerDialog
 
 
 class PlayerTab(QWidget):
@@ -17,6 +18,9 @@ class PlayerTab(QWidget):
 
         self.add_player_btn = QPushButton("Add Player")
         self.update_player_btn = QPushButton("Update Player")
+        self.sign_player_btn = QPushButton("Sign Player...")
+
+        self.progress = QueryProgress()
 
         self.setup_ui()
 
@@ -48,13 +52,23 @@ class PlayerTab(QWidget):
 
         self.add_player_btn.clicked.connect(self.add_player)
         self.update_player_btn.clicked.connect(self.update_player)
+        self.sign_player_btn.clicked.connect(self.sign_player)
 
         button_layout.addWidget(self.add_player_btn)
         button_layout.addWidget(self.update_player_btn)
+        button_layout.addWidget(self.sign_player_btn)
 
         layout.addLayout(button_layout)
+
+        self.progress.busy_changed.connect(self.set_busy)
+        layout.addWidget(self.progress)
         self.setLayout(layout)
 
+    def set_busy(self, busy):
+        self.add_player_btn.setEnabled(not busy)
+        self.update_player_btn.setEnabled(not busy)
+        self.sign_player_btn.setEnabled(not busy)
+
     def add_player(self):
         # Check for empty fields
         if not self.first_name_input.text() or not self.last_name_input.text() or not self.dob_input.text() or \
@@ -71,21 +85,23 @@ class PlayerTab(QWidget):
         try:
             # Validate market price
             estimated_market_price = float(self.estimated_market_price_input.text())
-
-            execute_procedure(
-                "add_player",
-                self.first_name_input.text(),
-                self.last_name_input.text(),
-                self.dob_input.text(),
-                self.nationality_input.text(),
-                self.main_position_input.text(),
-                estimated_market_price
-            )
-            QMessageBox.information(self, "Success", "Player added successfully!")
         except ValueError:
             QMessageBox.warning(self, "Input Error", "Estimated Market Price must be a valid number.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error adding player:\n{e}")
+            return
+
+        self.progress.run(
+            "add_player",
+            self.first_name_input.text(),
+            self.last_name_input.text(),
+            self.dob_input.text(),
+            self.nationality_input.text(),
+            self.main_position_input.text(),
+            estimated_market_price,
+            message="Adding player...",
+            on_result=lambda result: QMessageBox.information(
+                self, "Success", f"Player added successfully with ID {result[0][0]}!"),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Error adding player:\n{e}")
+        )
 
     def update_player(self):
         # Check if player ID is provided
@@ -103,20 +119,37 @@ class PlayerTab(QWidget):
             # Convert player ID and market price to appropriate types
             player_id = int(self.player_id_input.text())
             estimated_market_price = float(self.estimated_market_price_input.text())
-
-            execute_procedure(
-                "update_player",
-                player_id,
-                self.first_name_input.text(),
-                self.last_name_input.text(),
-                self.dob_input.text(),
-                self.nationality_input.text(),
-                self.main_position_input.text(),
-                estimated_market_price
-            )
-            QMessageBox.information(self, "Success", "Player updated successfully!")
         except ValueError:
             QMessageBox.warning(self, "Input Error",
                                 "Player ID must be a valid integer and Market Price a valid number.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error updating player:\n{e}")
+            return
+
+        self.progress.run(
+            "update_player",
+            player_id,
+            self.first_name_input.text(),
+            self.last_name_input.text(),
+            self.dob_input.text(),
+            self.nationality_input.text(),
+            self.main_position_input.text(),
+            estimated_market_price,
+            message="Updating player...",
+            on_result=lambda _: QMessageBox.information(self, "Success", "Player updated successfully!"),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Error updating player:\n{e}")
+        )
+
+    def sign_player(self):
+        dialog = SignPlayerDialog(self)
+        if dialog.exec_() != SignPlayerDialog.Accepted:
+            return
+
+        # Imported on first use so psycopg2 is not loaded before the window is up
+        from app.utils.signing import sign_player
+        self.progress.start(
+            sign_player,
+            **dialog.values(),
+            message="Signing player...",
+            on_result=lambda player_id: QMessageBox.information(
+                self, "Success", f"Player signed successfully with ID {player_id}!"),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Error signing player:\n{e}")
+        )
@@ -0,0 +1,210 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox, QComboBox, \
+    QDoubleSpinBox, QGroupBox, QGridLayout, QSpinBox, QTableView, QAbstractItemView
+from PyQt5.QtCore import Qt, QTimer
+from app.ui.widgets.query_progress import QueryProgress
+from app.ui.widgets.result_model import ResultTableModel
+from app.utils.scoring import ALL_POSITIONS, COUNTERS, compare, evaluate, load_squad, load_weights, save_weights
+
+COMPARISON_COLUMNS = ["Player ID", "First Name", "Last Name", "Main Position", "Current Score", "What-if Score",
+                      "Current Rank", "What-if Rank", "Rank Change"]
+
+# Milliseconds to wait after the last weight change before scoring the squad again
+EVALUATE_DEBOUNCE_MS = 100
+
+
+def load_scoring_data(handle=None):
+    version, weights = load_weights(handle=handle)
+    return version, weights, load_squad(handle=handle)
+
+
+class ScoringTab(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.position_input = QComboBox()
+        self.weight_inputs = {name: QDoubleSpinBox() for name in COUNTERS}
+        self.override_label = QLabel()
+        self.top_input = QSpinBox()
+        self.comparison_table = QTableView()
+        self.status_label = QLabel("Load the squad to try out weights.")
+
+        self.load_btn = QPushButton("Load Squad")
+        self.clear_override_btn = QPushButton("Use Default Weights")
+        self.reset_btn = QPushButton("Reset to Saved")
+        self.save_btn = QPushButton("Save as New Version")
+
+        self.progress = QueryProgress()
+        self.evaluate_timer = QTimer(self)
+
+        # Saved weights, the candidate being edited and the squad they are tried on
+        self.version = None
+        self.saved_weights = {}
+        self.weights = {}
+        self.squad = None
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        weights_group = QGroupBox("Candidate Weights")
+        weights_layout = QGridLayout()
+        weights_layout.addWidget(QLabel("Position:"), 0, 0)
+        weights_layout.addWidget(self.position_input, 0, 1)
+        weights_layout.addWidget(self.override_label, 0, 2, 1, 2)
+        for column, name in enumerate(COUNTERS):
+            spin_box = self.weight_inputs[name]
+            spin_box.setRange(-100, 100)
+            spin_box.setDecimals(2)
+            spin_box.setSingleStep(0.5)
+            spin_box.valueChanged.connect(self.weight_changed)
+            weights_layout.addWidget(QLabel(f"{name.replace('_', ' ').title()}:"), 1 + column // 3, 2 * (column % 3))
+            weights_layout.addWidget(spin_box, 1 + column // 3, 2 * (column % 3) + 1)
+        weights_group.setLayout(weights_layout)
+        layout.addWidget(weights_group)
+
+        buttons_layout = QHBoxLayout()
+        self.top_input.setRange(10, 1000)
+        self.top_input.setValue(50)
+        self.top_input.valueChanged.connect(self.evaluate_timer.start)
+        buttons_layout.addWidget(self.load_btn)
+        buttons_layout.addWidget(self.clear_override_btn)
+        buttons_layout.addWidget(self.reset_btn)
+        buttons_layout.addWidget(self.save_btn)
+        buttons_layout.addWidget(QLabel("Show top:"))
+        buttons_layout.addWidget(self.top_input)
+        layout.addLayout(buttons_layout)
+
+        self.comparison_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # Rows arrive best what-if score first; header clicks re-sort them locally
+        self.comparison_table.horizontalHeader().setSortIndicator(COMPARISON_COLUMNS.index("What-if Rank"),
+                                                                  Qt.AscendingOrder)
+        self.comparison_table.setSortingEnabled(True)
+        layout.addWidget(self.comparison_table)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.progress)
+
+        self.position_input.currentIndexChanged.connect(self.show_position)
+        self.load_btn.clicked.connect(self.load)
+        self.clear_override_btn.clicked.connect(self.clear_override)
+        self.reset_btn.clicked.connect(self.reset)
+        self.save_btn.clicked.connect(self.save)
+
+        # Scores are recomputed once the spin boxes stop changing, not on every step
+        self.evaluate_timer.setSingleShot(True)
+        self.evaluate_timer.setInterval(EVALUATE_DEBOUNCE_MS)
+        self.evaluate_timer.timeout.connect(self.evaluate)
+
+        self.progress.busy_changed.connect(self.set_busy)
+        self.set_busy(False)
+        self.setLayout(layout)
+
+    def set_busy(self, busy):
+        loaded = self.squad is not None
+        self.load_btn.setEnabled(not busy)
+        for widget in (self.reset_btn, self.save_btn, self.position_input, *self.weight_inputs.values()):
+            widget.setEnabled(loaded and not busy)
+        self.clear_override_btn.setEnabled(loaded and not busy and self.current_position() in self.weights
+                                           and self.current_position() != ALL_POSITIONS)
+
+    def current_position(self):
+        return self.position_input.currentData() or ALL_POSITIONS
+
+    def load(self):
+        self.progress.start(load_scoring_data, message="Loading squad...", on_result=self.on_loaded,
+                            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to load the squad:\n{e}"))
+
+    def on_loaded(self, result):
+        self.version, self.saved_weights, self.squad = result
+        self.weights = {position: list(values) for position, values in self.saved_weights.items()}
+
+        positions = sorted(set(self.squad['main_position']) - {None})
+        self.position_input.blockSignals(True)
+        self.position_input.clear()
+        self.position_input.addItem("All Positions", ALL_POSITIONS)
+        for position in positions:
+            self.position_input.addItem(position, position)
+        self.position_input.blockSignals(False)
+
+        self.show_position()
+        self.evaluate()
+
+    def show_position(self):
+        position = self.current_position()
+        values = self.weights.get(position, self.weights.get(ALL_POSITIONS))
+        if values is None:
+            return
+        for name, value in zip(COUNTERS, values):
+            # Filling in the boxes is not an edit
+            self.weight_inputs[name].blockSignals(True)
+            self.weight_inputs[name].setValue(value)
+            self.weight_inputs[name].blockSignals(False)
+        self.update_override_label()
+
+    def update_override_label(self):
+        position = self.current_position()
+        if position == ALL_POSITIONS:
+            text = "Used for every position without weights of its own"
+        elif position in self.weights:
+            text = f"{position} has its own weights"
+        else:
+            text = f"{position} uses the weights of all positions; editing gives it its own"
+        self.override_label.setText(text)
+        self.set_busy(bool(self.progress.workers))
+
+    def weight_changed(self):
+        # Editing a position without weights of its own starts it from the shared weights
+        self.weights[self.current_position()] = [self.weight_inputs[name].value() for name in COUNTERS]
+        self.update_override_label()
+        self.evaluate_timer.start()
+
+    def clear_override(self):
+        self.weights.pop(self.current_position(), None)
+        self.show_position()
+        self.evaluate()
+
+    def reset(self):
+        self.weights = {position: list(values) for position, values in self.saved_weights.items()}
+        self.show_position()
+        self.evaluate()
+
+    def evaluate(self):
+        self.evaluate_timer.stop()
+        if self.squad is None:
+            return
+        # Vectorized over the whole squad in memory; nothing is written or queried
+        scores = evaluate(self.squad, self.weights)
+        rows = compare(self.squad, scores, self.top_input.value())
+        moved = sum(1 for row in rows if row[-1] != 0)
+
+        old_model = self.comparison_table.model()
+        self.comparison_table.setModel(ResultTableModel(COMPARISON_COLUMNS, rows))
+        if old_model is not None:
+            old_model.deleteLater()
+        header = self.comparison_table.horizontalHeader()
+        self.comparison_table.sortByColumn(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+        changed = "unsaved changes" if self.weights != self.saved_weights else "no changes"
+        self.status_label.setText(f"Weights version {self.version}, {changed}. {len(scores):,} players scored; "
+                                  f"{moved} of the top {len(rows)} change rank.")
+
+    def save(self):
+        confirm = QMessageBox.question(
+            self, "Save Weights",
+            "Save these weights as a new version and rescore every player with them?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if confirm != QMessageBox.Yes:
+            return
+
+        weights = {position: list(values) for position, values in self.weights.items()}
+        self.progress.start(save_weights, weights, message="Saving weights and rescoring players...",
+                            on_result=lambda version: self.on_saved(version, weights),
+                            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to save weights:\n{e}"))
+
+    def on_saved(self, version, weights):
+        self.version = version
+        self.saved_weights = weights
+        QMessageBox.information(self, "Success", f"Weights saved as version {version} and every player rescored.")
+        # Current scores and ranks changed on the server
+        self.load()
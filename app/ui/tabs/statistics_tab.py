@@ -1,5 +1,15 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
-from app.utils.db_utils import execute_procedure
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, \
+    QGroupBox, QTableWidget, QTableWidgetItem, QAbstractItemView
+from PyQt5.QtCore import Qt
+from app.utils.helpers import is_valid_date
+from app.ui.widgets.query_progress import QueryProgress
+
+
+# Columns of the matchday grid; every row is one appearance and everything after the player name is a counter
+# sent to record_match_events
+MATCHDAY_COLUMNS = ["Player ID", "Player", "Play Time", "Goals", "Assists", "Tackles", "Saves", "Yellow Cards",
+                    "Red Cards"]
+COUNTER_OFFSET = 2
 
 
 class StatisticsTab(QWidget):
@@ -18,6 +28,15 @@ class StatisticsTab(QWidget):
 
         self.update_statistics_btn = QPushButton("Update Statistics")
 
+        self.match_date_input = QLineEdit()
+        self.matchday_table = QTableWidget(0, len(MATCHDAY_COLUMNS))
+        self.add_row_btn = QPushButton("Add Row")
+        self.remove_rows_btn = QPushButton("Remove Rows")
+        self.load_squad_btn = QPushButton("Load Squad")
+        self.submit_matchday_btn = QPushButton("Submit Matchday")
+
+        self.progress = QueryProgress()
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -50,6 +69,34 @@ class StatisticsTab(QWidget):
         self.update_statistics_btn.clicked.connect(self.update_statistics)
 
         layout.addWidget(self.update_statistics_btn)
+
+        # Grid entry: one row per player, the whole matchday goes to the database in a single call
+        matchday_group = QGroupBox("Matchday Entry")
+        matchday_layout = QVBoxLayout()
+        match_date_layout = QHBoxLayout()
+        match_date_layout.addWidget(QLabel("Match Date (YYYY-MM-DD):"))
+        match_date_layout.addWidget(self.match_date_input)
+        matchday_layout.addLayout(match_date_layout)
+        self.matchday_table.setHorizontalHeaderLabels(MATCHDAY_COLUMNS)
+        self.matchday_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        matchday_layout.addWidget(self.matchday_table)
+
+        grid_buttons_layout = QHBoxLayout()
+        grid_buttons_layout.addWidget(self.add_row_btn)
+        grid_buttons_layout.addWidget(self.remove_rows_btn)
+        grid_buttons_layout.addWidget(self.load_squad_btn)
+        grid_buttons_layout.addWidget(self.submit_matchday_btn)
+        matchday_layout.addLayout(grid_buttons_layout)
+        matchday_group.setLayout(matchday_layout)
+        layout.addWidget(matchday_group)
+
+        self.add_row_btn.clicked.connect(lambda: self.add_matchday_row())
+        self.remove_rows_btn.clicked.connect(self.remove_matchday_rows)
+        self.load_squad_btn.clicked.connect(self.load_squad)
+        self.submit_matchday_btn.clicked.connect(self.submit_matchday)
+
+        self.progress.busy_changed.connect(self.set_busy)
+        layout.addWidget(self.progress)
         self.setLayout(layout)
 
     def update_statistics(self):
@@ -73,21 +120,119 @@ class StatisticsTab(QWidget):
             saves = int(self.saves_input.text())
             yellow_cards = int(self.yellow_cards_input.text())
             red_cards = int(self.red_cards_input.text())
-
-            execute_procedure(
-                "update_statistics",
-                player_id,
-                matches_played,
-                total_play_time,
-                goals,
-                assists,
-                tackles,
-                saves,
-                yellow_cards,
-                red_cards
-            )
-            QMessageBox.information(self, "Success", "Statistics updated successfully!")
         except ValueError:
             QMessageBox.warning(self, "Input Error", "All numerical fields must be valid numbers.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error updating statistics:\n{e}")
+            return
+
+        self.progress.run(
+            "update_statistics",
+            player_id,
+            matches_played,
+            total_play_time,
+            goals,
+            assists,
+            tackles,
+            saves,
+            yellow_cards,
+            red_cards,
+            message="Updating statistics...",
+            on_result=lambda _: QMessageBox.information(self, "Success", "Statistics updated successfully!"),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Error updating statistics:\n{e}")
+        )
+
+    def set_busy(self, busy):
+        for button in (self.update_statistics_btn, self.load_squad_btn, self.submit_matchday_btn):
+            button.setEnabled(not busy)
+
+    def add_matchday_row(self, player_id=None, player_name=""):
+        row = self.matchday_table.rowCount()
+        self.matchday_table.insertRow(row)
+        self.matchday_table.setItem(row, 0, QTableWidgetItem("" if player_id is None else str(player_id)))
+
+        # The name is only there to help with entry and is not sent anywhere
+        name_item = QTableWidgetItem(player_name)
+        name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
+        self.matchday_table.setItem(row, 1, name_item)
+
+        for column in range(COUNTER_OFFSET, len(MATCHDAY_COLUMNS)):
+            self.matchday_table.setItem(row, column, QTableWidgetItem("0"))
+
+    def remove_matchday_rows(self):
+        rows = sorted({index.row() for index in self.matchday_table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.matchday_table.removeRow(row)
+
+    def load_squad(self):
+        self.progress.run("display_players_contents", message="Loading squad...",
+                          on_result=self.show_squad,
+                          on_error=lambda e: QMessageBox.critical(self, "Error", f"Error loading squad:\n{e}"))
+
+    def show_squad(self, players):
+        self.matchday_table.setRowCount(0)
+        for player in players:
+            self.add_matchday_row(player[0], f"{player[1]} {player[2]}")
+
+    def cell_text(self, row, column):
+        item = self.matchday_table.item(row, column)
+        return item.text().strip() if item is not None else ""
+
+    def submit_matchday(self):
+        match_date = self.match_date_input.text().strip()
+        if not is_valid_date(match_date):
+            QMessageBox.warning(self, "Input Error", "Please enter the match date in the format YYYY-MM-DD.")
+            return
+
+        # Parallel arrays: the first holds player ids, the rest one counter each
+        columns = [[] for _ in range(len(MATCHDAY_COLUMNS) - 1)]
+        skipped = []
+        for row in range(self.matchday_table.rowCount()):
+            if not self.cell_text(row, 0):
+                continue
+            try:
+                values = [int(self.cell_text(row, 0))] + [
+                    int(self.cell_text(row, column) or 0) for column in range(COUNTER_OFFSET, len(MATCHDAY_COLUMNS))
+                ]
+            except ValueError:
+                QMessageBox.warning(self, "Input Error", f"Row {row + 1}: all fields must be valid numbers.")
+                return
+            if any(value < 0 for value in values[1:]):
+                QMessageBox.warning(self, "Input Error", f"Row {row + 1}: statistics cannot be negative.")
+                return
+            if not any(values[1:]):
+                # Every row counts as an appearance, so squad members left at zero did not play
+                skipped.append(row + 1)
+                continue
+            for column, value in zip(columns, values):
+                column.append(value)
+
+        if not columns[0]:
+            QMessageBox.warning(self, "Input Error", "Please enter statistics for at least one player; rows left "
+                                                     "at zero are not recorded.")
+            return
+
+        player_count = len(columns[0])
+        if len(set(columns[0])) != player_count:
+            QMessageBox.warning(self, "Input Error", "Each player can only be entered once per match.")
+            return
+
+        # One event per player; statistics and the season totals are rolled up from them in the database
+        self.progress.run(
+            "record_match_events",
+            match_date,
+            *columns,
+            message=f"Recording the match for {player_count} players...",
+            on_result=lambda _: self.on_matchday_submitted(player_count, skipped),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Error updating statistics:\n{e}")
+        )
+
+    def on_matchday_submitted(self, player_count, skipped):
+        # Reset the counters so the same matchday cannot be submitted twice by accident
+        for row in range(self.matchday_table.rowCount()):
+            for column in range(COUNTER_OFFSET, len(MATCHDAY_COLUMNS)):
+                self.matchday_table.item(row, column).setText("0")
+        message = f"Match recorded for {player_count} players!"
+        if skipped:
+            # A loaded squad leaves most rows at zero; only a short list is worth naming
+            rows = f" (rows {', '.join(map(str, skipped))})" if len(skipped) <= 20 else ""
+            message += f"\n\n{len(skipped)} row(s) left at zero were not recorded as appearances{rows}."
+        QMessageBox.information(self, "Success", message)
@@ -1,29 +1,256 @@
-from PyQt5.QtWidgets import QTableWidgetItem, QInputDialog, QTableWidget, QWidget, QVBoxLayout, QPushButton, QMessageBox
-from app.utils.db_utils import execute_procedure
-from PyQt5.QtCore import Qt
+import datetime
+import time
+
+from PyQt5.QtWidgets import QAbstractItemView, QInputDialog, QTableView, QWidget, QVBoxLayout, QHBoxLayout, QLabel, \
+    QLineEdit, QSpinBox, QPushButton, QMessageBox, QComboBox, QFileDialog
+from PyQt5.QtCore import Qt, QTimer, QCoreApplication, pyqtSignal
+from app.ui.widgets.query_progress import QueryProgress
+from app.ui.widgets.result_model import ResultTableModel
+from app.ui.workers import run_in_background
+from app.config import LISTEN_CONFIG, STREAM_CONFIG
+from app.utils.change_listener import ChangeListener
+from app.utils.helpers import is_valid_date
+from app.utils.db_utils import execute_procedure, open_stream
+from app.utils.export import export_result
+from app.utils.query_cache import read_tables
+
+
+# Column names explicitly set for different tables
+COLUMN_HEADERS = {
+    'players': ["Player ID", "First Name", "Last Name", "Date of Birth", "Nationality",
+                "Main Position", "Estimated Market Price"],
+    'search_players': ["Player ID", "First Name", "Last Name", "Date of Birth", "Nationality",
+                       "Main Position", "Estimated Market Price", "Matches Played",
+                       "Total Play Time (minutes)",
+                       "Goals", "Assists", "Tackles", "Saves", "Yellow Cards", "Red Cards"],
+    'contracts': ["Player ID", "First Name", "Last Name", "Sign Date", "End Date", "Monthly Salary"],
+    'statistics': ["Player ID", "First Name", "Last Name", "Matches Played", "Total Play Time", "Goals",
+                   "Assists",
+                   "Tackles", "Saves", "Yellow Cards", "Red Cards"],
+    'avg_performance': ["Player ID", "First Name", "Last Name", "Average Performance"],
+    'leaderboard': ["Player ID", "Rank", "Group", "First Name", "Last Name", "Main Position", "Nationality",
+                    "Average Performance", "Percentile"],
+    'player_matches': ["Match Date", "Season", "Play Time", "Goals", "Assists", "Tackles", "Saves", "Yellow Cards",
+                       "Red Cards", "Last Event ID"],
+}
+
+# Keyset-paginated SQL functions behind each display view, with their default sort
+PAGED_VIEWS = {
+    'players': ("display_players_page", 'player_id', False),
+    'contracts': ("display_contracts_page", 'player_id', False),
+    'statistics': ("display_statistics_page", 'player_id', False),
+    'avg_performance': ("display_avg_performance_page", 'avg_performance', True),
+}
+
+# Functions returning the rows of each display view for given players, to patch rows other sessions change
+PATCH_FUNCTIONS = {
+    'players': "display_players_by_ids",
+    'contracts': "display_contracts_by_ids",
+    'statistics': "display_statistics_by_ids",
+    'avg_performance': "display_avg_performance_by_ids",
+}
+
+# Search modes offered by search_players
+SEARCH_MODES = [("Prefix", 'prefix'), ("Exact", 'exact'), ("Fuzzy", 'fuzzy')]
+
+# Milliseconds to wait after the last keystroke before searching
+SEARCH_DEBOUNCE_MS = 250
+
+# Groupings offered by display_leaderboard
+LEADERBOARD_GROUPS = [("Overall", 'overall'), ("By Position", 'position'), ("By Nationality", 'nationality')]
+
+# Page size that makes a paged display function return the whole view
+EXPORT_ALL_ROWS = 2147483647
 
 
 class UtilitiesTab(QWidget):
+    # Emitted from the listener thread; Qt queues it to the GUI thread
+    changes_received = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
 
-        self.output_table = QTableWidget()
+        self.output_table = QTableView()
 
         self.display_players_btn = QPushButton("Display Players")
         self.display_contracts_btn = QPushButton("Display Contracts")
         self.display_statistics_btn = QPushButton("Display Statistics")
         self.display_avg_performance_btn = QPushButton("Display Avg Performance")
-        self.search_player_btn = QPushButton("Search by Last Name")
+        self.search_input = QLineEdit()
+        self.search_mode_input = QComboBox()
+        self.search_timer = QTimer(self)
         self.delete_player_btn = QPushButton("Delete Player")
         self.delete_selected_btn = QPushButton("Delete Selected")
+        self.export_btn = QPushButton("Export...")
+
+        self.nationality_filter_input = QLineEdit()
+        self.position_filter_input = QLineEdit()
+        self.min_salary_filter_input = QLineEdit()
+        self.max_salary_filter_input = QLineEdit()
+        self.apply_filters_btn = QPushButton("Apply Filters")
+
+        self.prev_page_btn = QPushButton("Previous Page")
+        self.next_page_btn = QPushButton("Next Page")
+        self.page_label = QLabel()
+        self.page_size_input = QSpinBox()
+
+        self.leaderboard_group_input = QComboBox()
+        self.leaderboard_value_input = QLineEdit()
+        self.leaderboard_size_input = QSpinBox()
+        self.show_leaderboard_btn = QPushButton("Show Leaderboard")
+        self.refresh_leaderboard_btn = QPushButton("Refresh Rankings")
+        self.leaderboard_status_label = QLabel()
+        self.leaderboard_timer = QTimer(self)
+        self.leaderboard_refresh = None
+        self.leaderboard_changed_at = None
+
+        self.season_input = QSpinBox()
+        self.show_season_btn = QPushButton("Show Season")
+        self.period_from_input = QLineEdit()
+        self.period_to_input = QLineEdit()
+        self.show_period_btn = QPushButton("Show Period")
+        self.matches_player_id_input = QLineEdit()
+        self.matches_count_input = QSpinBox()
+        self.show_matches_btn = QPushButton("Show Last Matches")
+
+        self.progress = QueryProgress()
+        self.current_query = None
+        # Function and parameters behind the results on screen
+        self.export_source = None
+
+        # Paging state of the current display view
+        self.view_name = None
+        self.column_names = []
+        self.sort_column = None
+        self.descending = False
+        self.filters = (None, None, None, None)
+        self.page_key = (None, None)
+        self.previous_page_keys = []
+
+        # Changes committed by other sessions, coalesced on a connection of their own
+        self.listener = ChangeListener(self.changes_received.emit)
+        self.patch_query = None
 
         self.setup_ui()
 
     def setup_ui(self):
         layout = QVBoxLayout()
-        self.output_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.output_table.setSelectionMode(QTableWidget.SingleSelection)
+
+        # Search as you type: each keystroke restarts the timer, the query runs once typing pauses
+        search_layout = QHBoxLayout()
+        self.search_input.setPlaceholderText("Search players by first or last name...")
+        self.search_input.setClearButtonEnabled(True)
+        for label, mode in SEARCH_MODES:
+            self.search_mode_input.addItem(label, mode)
+        search_layout.addWidget(QLabel("Search:"))
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.search_mode_input)
+        layout.addLayout(search_layout)
+
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_players)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.search_players)
+        self.search_mode_input.currentIndexChanged.connect(self.search_players)
+
+        self.output_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.output_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.output_table.horizontalHeader().setSectionsClickable(True)
+        self.output_table.horizontalHeader().sectionClicked.connect(self.sort_by_section)
         layout.addWidget(self.output_table)
+        layout.addWidget(self.progress)
+
+        # Filters pushed down to the paginated display functions
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Nationality:"))
+        filter_layout.addWidget(self.nationality_filter_input)
+        filter_layout.addWidget(QLabel("Position:"))
+        filter_layout.addWidget(self.position_filter_input)
+        filter_layout.addWidget(QLabel("Min Salary:"))
+        filter_layout.addWidget(self.min_salary_filter_input)
+        filter_layout.addWidget(QLabel("Max Salary:"))
+        filter_layout.addWidget(self.max_salary_filter_input)
+        filter_layout.addWidget(self.apply_filters_btn)
+        layout.addLayout(filter_layout)
+
+        # Paging controls
+        paging_layout = QHBoxLayout()
+        self.page_size_input.setRange(10, 10000)
+        self.page_size_input.setSingleStep(50)
+        self.page_size_input.setValue(100)
+        paging_layout.addWidget(self.prev_page_btn)
+        paging_layout.addWidget(self.page_label)
+        paging_layout.addWidget(self.next_page_btn)
+        paging_layout.addWidget(QLabel("Page Size:"))
+        paging_layout.addWidget(self.page_size_input)
+        layout.addLayout(paging_layout)
+        self.update_paging_controls()
+
+        # Top-N leaderboards from the materialized rankings
+        leaderboard_layout = QHBoxLayout()
+        for label, group in LEADERBOARD_GROUPS:
+            self.leaderboard_group_input.addItem(label, group)
+        self.leaderboard_value_input.setPlaceholderText("All groups")
+        self.leaderboard_size_input.setRange(1, 1000)
+        self.leaderboard_size_input.setValue(10)
+        leaderboard_layout.addWidget(QLabel("Leaderboard:"))
+        leaderboard_layout.addWidget(self.leaderboard_group_input)
+        leaderboard_layout.addWidget(self.leaderboard_value_input)
+        leaderboard_layout.addWidget(QLabel("Top:"))
+        leaderboard_layout.addWidget(self.leaderboard_size_input)
+        leaderboard_layout.addWidget(self.show_leaderboard_btn)
+        leaderboard_layout.addWidget(self.refresh_leaderboard_btn)
+        leaderboard_layout.addWidget(self.leaderboard_status_label)
+        layout.addLayout(leaderboard_layout)
+
+        # Changes to players or scores recompute the rankings a little later, at most once per interval
+        self.leaderboard_timer.setSingleShot(True)
+        self.leaderboard_timer.setInterval(LISTEN_CONFIG['leaderboard_refresh_delay'] * 1000)
+        self.leaderboard_timer.timeout.connect(self.refresh_leaderboard_automatically)
+        self.update_leaderboard_status()
+
+        self.leaderboard_group_input.currentIndexChanged.connect(
+            lambda: self.leaderboard_value_input.setEnabled(self.leaderboard_group_input.currentData() != 'overall'))
+        self.leaderboard_value_input.setEnabled(False)
+        self.show_leaderboard_btn.clicked.connect(self.show_leaderboard)
+        self.refresh_leaderboard_btn.clicked.connect(self.refresh_leaderboard)
+
+        # Windowed statistics from the match history: a season, a date range or a player's last matches
+        history_layout = QHBoxLayout()
+        today = datetime.date.today()
+        self.season_input.setRange(1900, 2100)
+        self.season_input.setValue(today.year if today.month >= 7 else today.year - 1)
+        self.period_from_input.setPlaceholderText("YYYY-MM-DD")
+        self.period_to_input.setPlaceholderText("YYYY-MM-DD")
+        history_layout.addWidget(QLabel("Season:"))
+        history_layout.addWidget(self.season_input)
+        history_layout.addWidget(self.show_season_btn)
+        history_layout.addWidget(QLabel("From:"))
+        history_layout.addWidget(self.period_from_input)
+        history_layout.addWidget(QLabel("To:"))
+        history_layout.addWidget(self.period_to_input)
+        history_layout.addWidget(self.show_period_btn)
+        layout.addLayout(history_layout)
+
+        matches_layout = QHBoxLayout()
+        self.matches_count_input.setRange(1, 100)
+        self.matches_count_input.setValue(5)
+        matches_layout.addWidget(QLabel("Player ID:"))
+        matches_layout.addWidget(self.matches_player_id_input)
+        matches_layout.addWidget(QLabel("Last Matches:"))
+        matches_layout.addWidget(self.matches_count_input)
+        matches_layout.addWidget(self.show_matches_btn)
+        layout.addLayout(matches_layout)
+
+        self.show_season_btn.clicked.connect(self.show_season)
+        self.show_period_btn.clicked.connect(self.show_period)
+        self.show_matches_btn.clicked.connect(self.show_player_matches)
+
+        self.apply_filters_btn.clicked.connect(self.apply_filters)
+        self.prev_page_btn.clicked.connect(self.previous_page)
+        self.next_page_btn.clicked.connect(self.next_page)
+        self.page_size_input.editingFinished.connect(self.reload_view)
 
         # Connect buttons to respective methods
         self.delete_player_btn.clicked.connect(self.delete_player)
@@ -31,13 +258,13 @@ class UtilitiesTab(QWidget):
         self.display_contracts_btn.clicked.connect(self.display_contracts_contents)
         self.display_statistics_btn.clicked.connect(self.display_statistics_contents)
         self.display_avg_performance_btn.clicked.connect(self.display_avg_performance)
-        self.search_player_btn.clicked.connect(self.search_by_last_name)
         self.delete_selected_btn.clicked.connect(self.delete_selected)
+        self.export_btn.clicked.connect(self.export_results)
 
         # Add buttons to the layout
-        layout.addWidget(self.search_player_btn)
         layout.addWidget(self.delete_player_btn)
         layout.addWidget(self.delete_selected_btn)
+        layout.addWidget(self.export_btn)
         layout.addWidget(self.display_players_btn)
         layout.addWidget(self.display_contracts_btn)
         layout.addWidget(self.display_statistics_btn)
@@ -45,96 +272,348 @@ class UtilitiesTab(QWidget):
 
         self.setLayout(layout)
 
-    def delete_selected(self):
-        selected_row = self.output_table.currentRow()
-        if selected_row == -1:
-            QMessageBox.warning(self, "No Selection", "Please select a row to delete.")
+        self.changes_received.connect(self.apply_changes)
+        QCoreApplication.instance().aboutToQuit.connect(self.listener.stop)
+        QCoreApplication.instance().aboutToQuit.connect(self.leaderboard_timer.stop)
+        self.listener.start()
+
+    def run_query(self, procedure, *params, table_name):
+        # A newer query supersedes the one still in flight
+        if self.current_query is not None:
+            self.current_query.cancel()
+        self.export_source = (procedure, params)
+        self.current_query = self.progress.start(
+            open_stream, procedure, *params, typed=True,
+            message=f"Running {procedure}...",
+            on_result=lambda result: self.show_results(result, table_name),
+            on_error=self.show_error,
+            on_discard=lambda result: result[0].close()
+        )
+
+    def export_results(self):
+        if self.export_source is None:
+            QMessageBox.warning(self, "Nothing to Export", "Please display a table or search for players first.")
+            return
+
+        procedure, params = self.export_source
+        if self.view_name is not None:
+            # The whole view in its current order and with its filters, not just the visible page
+            params = (EXPORT_ALL_ROWS, self.sort_column, self.descending, None, None, *self.filters)
+
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Results", f"{self.view_name or 'search_results'}.csv", "CSV (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if not path:
+            return
+        fmt = 'jsonl' if path.endswith(".jsonl") or selected_filter.startswith("JSON") else 'csv'
+
+        # Rows go straight from COPY to the file, so memory stays flat however large the export is
+        self.export_btn.setEnabled(False)
+        self.progress.start(export_result, procedure, *params, path=path, fmt=fmt, message="Exporting...",
+                            on_progress=lambda rows: self.progress.set_message(f"Exporting... {rows:,} rows"),
+                            on_result=lambda report: QMessageBox.information(self, "Export Complete",
+                                                                             report.summary()),
+                            on_error=lambda e: QMessageBox.critical(self, "Error", f"Export failed:\n{e}"),
+                            on_finished=lambda: self.export_btn.setEnabled(True))
+
+    def show_error(self, message):
+        QMessageBox.critical(self, "Error", message)
+
+    def open_view(self, table_name):
+        _, self.sort_column, self.descending = PAGED_VIEWS[table_name]
+        self.view_name = table_name
+        self.reload_view()
+
+    def reload_view(self):
+        if self.view_name is None:
             return
+        self.page_key = (None, None)
+        self.previous_page_keys = []
+        self.load_page()
 
-        # Assuming the first column contains the primary key (e.g., player ID)
-        primary_key_item = self.output_table.item(selected_row, 0)
-        primary_key = primary_key_item.text()
+    def load_page(self):
+        procedure = PAGED_VIEWS[self.view_name][0]
+        after_value, after_id = self.page_key
+        self.run_query(procedure, self.page_size_input.value(), self.sort_column, self.descending,
+                       after_value, after_id, *self.filters, table_name=self.view_name)
 
-        # Confirmation dialog
+    def apply_filters(self):
+        try:
+            min_salary = float(self.min_salary_filter_input.text()) if self.min_salary_filter_input.text() else None
+            max_salary = float(self.max_salary_filter_input.text()) if self.max_salary_filter_input.text() else None
+        except ValueError:
+            QMessageBox.warning(self, "Input Error", "Salary filters must be valid numbers.")
+            return
+
+        self.filters = (self.nationality_filter_input.text() or None, self.position_filter_input.text() or None,
+                        min_salary, max_salary)
+        self.reload_view()
+
+    def next_page(self):
+        model = self.output_table.model()
+        if self.view_name is None or model is None:
+            return
+        # The rest of this page may still be on its way; the keyset cursor needs its last row
+        page_key = self.page_key
+        model.fetch_all(lambda: self.load_next_page(model, page_key))
+
+    def load_next_page(self, model, page_key):
+        # Repeated clicks while the page loads move on once
+        if model is not self.output_table.model() or self.page_key != page_key:
+            return
+        if model.rowCount() < self.page_size_input.value():
+            return
+
+        # The keyset cursor is the sort key and player_id of the last row on this page
+        last_row = model.row_data(model.rowCount() - 1)
+        sort_value = last_row[self.column_names.index(self.sort_column)]
+        self.previous_page_keys.append(self.page_key)
+        self.page_key = (None if sort_value is None else str(sort_value), last_row[0])
+        self.load_page()
+
+    def previous_page(self):
+        if self.view_name is None or not self.previous_page_keys:
+            return
+        self.page_key = self.previous_page_keys.pop()
+        self.load_page()
+
+    def sort_by_section(self, section):
+        model = self.output_table.model()
+        if model is None or section >= len(self.column_names):
+            return
+        column = self.column_names[section]
+        self.descending = not self.descending if column == self.sort_column else False
+        self.sort_column = column
+        if self.view_name is not None and self.previous_page_keys:
+            self.reload_view()
+            return
+        model.fetch_all(lambda: self.sort_loaded(model, section))
+
+    def sort_loaded(self, model, section):
+        if model is not self.output_table.model():
+            return
+        # A first page shorter than the page size is the whole view; anything longer is sorted by the database
+        if self.view_name is not None and model.rowCount() >= self.page_size_input.value():
+            self.reload_view()
+            return
+
+        # Every row is already here: sort them on their native values instead of querying again
+        model.sort(section, Qt.DescendingOrder if self.descending else Qt.AscendingOrder)
+        self.update_paging_controls()
+
+    def update_paging_controls(self):
+        model = self.output_table.model()
+        paged = self.view_name is not None and model is not None
+        self.prev_page_btn.setEnabled(paged and bool(self.previous_page_keys))
+        self.next_page_btn.setEnabled(paged and (model.canFetchMore() or
+                                                 model.rowCount() >= self.page_size_input.value()))
+        self.page_label.setText(f"Page {len(self.previous_page_keys) + 1}" if paged else "")
+
+        header = self.output_table.horizontalHeader()
+        sorted_view = model is not None and self.sort_column in self.column_names
+        header.setSortIndicatorShown(sorted_view)
+        if sorted_view:
+            header.setSortIndicator(self.column_names.index(self.sort_column),
+                                    Qt.DescendingOrder if self.descending else Qt.AscendingOrder)
+
+    def apply_changes(self, changes):
+        if changes.keys() & {'players', 'avg_performance'}:
+            self.leaderboard_changed_at = time.monotonic()
+            if not self.leaderboard_timer.isActive():
+                self.leaderboard_timer.start()
+
+        # Patches the rows of the current view that other sessions changed instead of loading it again
+        model = self.output_table.model()
+        if self.view_name is None or not isinstance(model, ResultTableModel):
+            return
+        tables = read_tables(PAGED_VIEWS[self.view_name][0])
+        relevant = [ids for table, ids in changes.items() if table in tables]
+        if not relevant:
+            return
+        if None in relevant:
+            # Too many rows changed to list them, so the page is loaded again
+            self.load_page()
+            return
+
+        player_ids = sorted(set().union(*relevant))
+        if self.patch_query is not None:
+            self.patch_query.cancel()
+        self.patch_query = run_in_background(
+            execute_procedure, PATCH_FUNCTIONS[self.view_name], player_ids, *self.filters, typed=True,
+            on_result=lambda rows: self.patch_rows(model, player_ids, rows)
+        )
+
+    def patch_rows(self, model, player_ids, rows):
+        if model is not self.output_table.model():
+            return
+        found = model.update_keys(rows)
+        # Players the view no longer returns were deleted or no longer match the filters
+        model.remove_keys(set(player_ids) - {row[0] for row in rows})
+
+        # New rows only have a known place when the whole view is on screen; otherwise they show up on reload
+        whole_view = not self.previous_page_keys and not model.canFetchMore() and \
+            model.rowCount() < self.page_size_input.value()
+        if whole_view:
+            model.append_rows([row for row in rows if row[0] not in found])
+            if self.sort_column in self.column_names:
+                model.sort(self.column_names.index(self.sort_column),
+                           Qt.DescendingOrder if self.descending else Qt.AscendingOrder)
+        self.update_paging_controls()
+
+    def delete_selected(self):
+        model = self.output_table.model()
+        rows = self.output_table.selectionModel().selectedRows() if model is not None else []
+        if not rows:
+            QMessageBox.warning(self, "No Selection", "Please select the rows to delete.")
+            return
+        if model.headers[0] != "Player ID":
+            QMessageBox.warning(self, "Not Supported", "Players can only be deleted from views that list players.")
+            return
+
+        # The first column of every player view is the player ID
+        player_ids = sorted({int(model.row_data(index.row())[0]) for index in rows})
         confirm = QMessageBox.question(
-            self, "Confirm Delete", f"Are you sure you want to delete the item with ID {primary_key}?",
+            self, "Confirm Delete",
+            f"Are you sure you want to delete {len(player_ids)} player(s) with their contracts and statistics?",
             QMessageBox.Yes | QMessageBox.No
         )
 
         if confirm == QMessageBox.Yes:
-            # Delete from database
-            try:
-                execute_procedure("delete_by_id", int(primary_key))
-                # Remove from the table
-                self.output_table.removeRow(selected_row)
-                QMessageBox.information(self, "Success", f"Item with ID {primary_key} deleted successfully!")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to delete item with ID {primary_key}:\n{e}")
+            self.progress.run("delete_by_ids", player_ids, message=f"Deleting {len(player_ids)} player(s)...",
+                              on_result=lambda result: self.on_deleted(player_ids, result[0][0]),
+                              on_error=lambda e: QMessageBox.critical(
+                                  self, "Error", f"Failed to delete the selected players:\n{e}"))
+
+    def on_deleted(self, player_ids, deleted):
+        # Drop the rows from the loaded result instead of running the query again
+        model = self.output_table.model()
+        if model is not None:
+            model.remove_keys(player_ids)
+        QMessageBox.information(self, "Success", f"{deleted} player(s) deleted.")
 
     def delete_player(self):
         last_name, ok = QInputDialog.getText(self, "Delete Player", "Enter the last name:")
         if ok:
-            execute_procedure("delete_player", last_name)
-            QMessageBox.information(self, "Success", "Player deleted successfully!")
+            self.progress.run("delete_player", last_name, message="Deleting player...",
+                              on_result=lambda result: self.on_deleted(result[0][0], len(result[0][0])),
+                              on_error=self.show_error)
+
+    def search_players(self):
+        self.search_timer.stop()
+        search_text = self.search_input.text().strip()
+        if not search_text:
+            return
+        # run_query cancels the search still in flight, so only the latest text produces results
+        self.view_name = None
+        self.run_query("search_players", search_text, self.search_mode_input.currentData(),
+                       self.page_size_input.value(), table_name='search_players')
+
+    def show_leaderboard(self):
+        group = self.leaderboard_group_input.currentData()
+        group_value = self.leaderboard_value_input.text().strip() if group != 'overall' else ""
+        self.view_name = None
+        self.run_query("display_leaderboard", group, self.leaderboard_size_input.value(), group_value or None,
+                       table_name='leaderboard')
+        self.update_leaderboard_status()
+
+    def refresh_leaderboard(self):
+        self.start_leaderboard_refresh(self.show_leaderboard)
+
+    def refresh_leaderboard_automatically(self):
+        if self.leaderboard_refresh is not None:
+            # The refresh running may have started before the latest changes
+            self.leaderboard_timer.start()
+            return
+        # Every open application hears of the same changes; the first to call refreshes for all of them and the
+        # others wait for it, then only load the rankings again
+        self.start_leaderboard_refresh(self.reload_leaderboard, time.monotonic() - self.leaderboard_changed_at)
+
+    def start_leaderboard_refresh(self, on_refreshed, changes_age=None):
+        # Recomputing the rankings takes a while on big squads, but readers are never blocked meanwhile
+        self.refresh_leaderboard_btn.setEnabled(False)
+        self.leaderboard_refresh = self.progress.run("refresh_leaderboard", changes_age,
+                                                     message="Refreshing rankings...",
+                                                     on_result=lambda _: on_refreshed(),
+                                                     on_error=self.show_error,
+                                                     on_finished=self.on_leaderboard_refreshed)
 
-    def search_by_last_name(self):
-        last_name, ok = QInputDialog.getText(self, "Search Player", "Enter the last name:")
-        if last_name and ok:
-            result = execute_procedure("search_by_last_name", last_name)
-            self.show_results(result, 'search_by_last_name')
+    def on_leaderboard_refreshed(self):
+        self.leaderboard_refresh = None
+        self.refresh_leaderboard_btn.setEnabled(True)
+
+    def reload_leaderboard(self):
+        # A leaderboard on screen is loaded again; otherwise only the time of the rankings changes
+        if self.export_source is not None and self.export_source[0] == "display_leaderboard":
+            self.run_query("display_leaderboard", *self.export_source[1], table_name='leaderboard')
+        self.update_leaderboard_status()
+
+    def update_leaderboard_status(self):
+        run_in_background(execute_procedure, "display_leaderboard_status", on_result=self.show_leaderboard_status)
+
+    def show_leaderboard_status(self, rows):
+        if rows:
+            self.leaderboard_status_label.setText(f"Rankings as of {rows[0][0].astimezone():%Y-%m-%d %H:%M:%S}")
+
+    def show_season(self):
+        self.view_name = None
+        self.run_query("display_season_statistics", self.season_input.value(), table_name='statistics')
+
+    def show_period(self):
+        date_from = self.period_from_input.text().strip()
+        date_to = self.period_to_input.text().strip()
+        if not is_valid_date(date_from) or not is_valid_date(date_to):
+            QMessageBox.warning(self, "Input Error", "Please enter both dates in the format YYYY-MM-DD.")
+            return
+        self.view_name = None
+        self.run_query("display_statistics_between", date_from, date_to, table_name='statistics')
+
+    def show_player_matches(self):
+        try:
+            player_id = int(self.matches_player_id_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Input Error", "Player ID must be a number.")
+            return
+        self.view_name = None
+        self.run_query("display_player_matches", player_id, self.matches_count_input.value(),
+                       table_name='player_matches')
 
     def display_players_contents(self):
-        result = execute_procedure("display_players_contents")
-        self.show_results(result, 'players')
+        self.open_view('players')
 
     def display_avg_performance(self):
-        result = execute_procedure("display_avg_performance_contents")
-        self.show_results(result, 'avg_performance')
+        self.open_view('avg_performance')
 
     def display_contracts_contents(self):
-        result = execute_procedure("display_contracts_contents")
-        self.show_results(result, 'contracts')
+        self.open_view('contracts')
 
     def display_statistics_contents(self):
-        result = execute_procedure("display_statistics_contents")
-        self.show_results(result, 'statistics')
+        self.open_view('statistics')
 
     def show_results(self, results, table_name):
-        if results:
-            # Set row count and column count
-            self.output_table.setRowCount(len(results))
-            self.output_table.setColumnCount(len(results[0]))
-
-            # Set column names explicitly for different tables
-            if table_name == 'players':
-                column_headers = ["Player ID", "First Name", "Last Name", "Date of Birth", "Nationality",
-                                  "Main Position", "Estimated Market Price"]
-            elif table_name == 'search_by_last_name':
-                column_headers = ["Player ID", "First Name", "Last Name", "Date of Birth", "Nationality",
-                                  "Main Position", "Estimated Market Price", "Matches Played",
-                                  "Total Play Time (minutes)",
-                                  "Goals", "Assists", "Tackles", "Saves", "Yellow Cards", "Red Cards"]
-            elif table_name == 'contracts':
-                column_headers = ["Player ID", "First Name", "Last Name", "Sign Date", "End Date", "Monthly Salary"]
-            elif table_name == 'statistics':
-                column_headers = ["Player ID", "First Name", "Last Name", "Matches Played", "Total Play Time", "Goals",
-                                  "Assists",
-                                  "Tackles", "Saves", "Yellow Cards", "Red Cards"]
-            elif table_name == 'avg_performance':
-                column_headers = ["Player ID", "First Name", "Last Name", "Average Performance"]
-            else:
-                column_headers = ["Unknown Columns"]
-
-            # Set the column headers in the table
-            self.output_table.setHorizontalHeaderLabels(column_headers)
-
-            # Fill the table with data
-            for row_idx, row in enumerate(results):
-                for col_idx, value in enumerate(row):
-                    item = QTableWidgetItem(str(value))
-                    item.setFlags(item.flags() ^ Qt.ItemIsEditable)  # Make cells non-editable
-                    self.output_table.setItem(row_idx, col_idx, item)
-        else:
-            self.output_table.setRowCount(0)
-            self.output_table.setColumnCount(0)
-            QMessageBox.information(self, "Results", "No data found!")
+        stream, rows = results
+        if not rows:
+            stream.close()
+            self.set_model(None)
+            # An empty live search is not worth a dialog while the user is still typing
+            if table_name != 'search_players':
+                QMessageBox.information(self, "Results", "No data found!")
+            return
+
+        self.column_names = [column.name for column in stream.description]
+        if self.view_name is None:
+            # Results of other queries arrive in the order their function returns them
+            self.sort_column, self.descending = None, False
+        column_headers = COLUMN_HEADERS.get(table_name) or self.column_names
+        model = ResultTableModel(column_headers, rows, stream,
+                                 chunk_size=min(self.page_size_input.value(), STREAM_CONFIG['chunk_size']),
+                                 progress=self.progress)
+        model.fetch_failed.connect(self.show_error)
+        self.set_model(model)
+
+    def set_model(self, model):
+        old_model = self.output_table.model()
+        self.output_table.setModel(model)
+        if isinstance(old_model, ResultTableModel):
+            old_model.close()
+            old_model.deleteLater()
+        self.update_paging_controls()
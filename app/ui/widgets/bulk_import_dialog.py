@@ -0,0 +1,42 @@
+from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QFileDialog, QGridLayout, QLabel, QLineEdit, QPushButton, \
+    QVBoxLayout
+
+
+class BulkImportDialog(QDialog):
+    TABLES = ['players', 'contracts', 'statistics']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Bulk Import CSV")
+
+        self.path_inputs = {table: QLineEdit() for table in self.TABLES}
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        grid = QGridLayout()
+
+        for row, table in enumerate(self.TABLES):
+            browse_btn = QPushButton("Browse...")
+            browse_btn.clicked.connect(lambda _, t=table: self.browse(t))
+            grid.addWidget(QLabel(f"{table.capitalize()} CSV:"), row, 0)
+            grid.addWidget(self.path_inputs[table], row, 1)
+            grid.addWidget(browse_btn, row, 2)
+
+        layout.addLayout(grid)
+        layout.addWidget(QLabel("Statistics rows are added to the existing totals, like Update Statistics."))
+
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+        self.setLayout(layout)
+
+    def browse(self, table):
+        path, _ = QFileDialog.getOpenFileName(self, f"Select {table} CSV", "", "CSV files (*.csv);;All files (*)")
+        if path:
+            self.path_inputs[table].setText(path)
+
+    def paths(self):
+        return {table: self.path_inputs[table].text() or None for table in self.TABLES}
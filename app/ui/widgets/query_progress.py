@@ -0,0 +1,66 @@
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QProgressBar, QPushButton
+from app.ui.workers import run_in_background, run_procedure
+
+
+class QueryProgress(QWidget):
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.status_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.cancel_btn = QPushButton("Cancel")
+        self.workers = []
+
+        self.setup_ui()
+        self.hide()
+
+    def setup_ui(self):
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # A zero range turns the bar into a busy indicator
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setTextVisible(False)
+        self.cancel_btn.clicked.connect(self.cancel)
+
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.cancel_btn)
+        self.setLayout(layout)
+
+    def track(self, worker, message):
+        self.workers.append(worker)
+        self.status_label.setText(message)
+        self.cancel_btn.setEnabled(True)
+        worker.signals.finished.connect(lambda: self.untrack(worker))
+        if len(self.workers) == 1:
+            self.show()
+            self.busy_changed.emit(True)
+        return worker
+
+    def untrack(self, worker):
+        if worker in self.workers:
+            self.workers.remove(worker)
+            if not self.workers:
+                self.hide()
+                self.busy_changed.emit(False)
+
+    def run(self, procedure, *params, message=None, **callbacks):
+        worker = run_procedure(procedure, *params, **callbacks)
+        return self.track(worker, message or f"Running {procedure}...")
+
+    def start(self, fn, *args, message="Working...", **kwargs):
+        worker = run_in_background(fn, *args, **kwargs)
+        return self.track(worker, message)
+
+    def set_message(self, message):
+        self.status_label.setText(message)
+
+    def cancel(self):
+        self.status_label.setText("Cancelling...")
+        self.cancel_btn.setEnabled(False)
+        for worker in self.workers:
+            worker.cancel()
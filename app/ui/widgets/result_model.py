@@ -0,0 +1,178 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, pyqtSignal
+from app.config import STREAM_CONFIG
+from app.ui.workers import run_in_background
+
+
+def display_text(value):
+    # Typed results hold NUMERIC as float; show it without a trailing .0 or an exponent, like the value it came from
+    if isinstance(value, float):
+        return f"{value:.15g}"
+    return str(value)
+
+
+class ResultTableModel(QAbstractTableModel):
+    fetch_failed = pyqtSignal(str)
+
+    def __init__(self, headers, rows, stream=None, chunk_size=None, progress=None, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.rows = list(rows)
+        self.stream = stream
+        self.chunk_size = chunk_size or STREAM_CONFIG['chunk_size']
+
+        # Chunks are fetched on a worker thread, shown in progress if given; callbacks wait for the last row
+        self.progress = progress
+        self.fetch_worker = None
+        self.when_loaded = []
+
+        # Give the pooled connection back if the user stops scrolling; the stream reopens on demand
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(STREAM_CONFIG['idle_timeout'] * 1000)
+        self.idle_timer.timeout.connect(self.release_connection)
+        if self.stream is not None and self.stream.is_open:
+            self.idle_timer.start()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return display_text(self.rows[index.row()][index.column()])
+        if role == Qt.TextAlignmentRole:
+            value = self.rows[index.row()][index.column()]
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return section + 1
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.stream is not None and not self.stream.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        # The chunk is appended when it arrives, so a slow fetch or a stream reopening never blocks the view
+        if not self.canFetchMore(parent) or self.fetch_worker is not None:
+            return
+        self.idle_timer.stop()
+        callbacks = dict(on_result=self.on_fetched, on_error=self.on_fetch_failed,
+                         on_cancelled=self.when_loaded.clear, on_finished=self.on_fetch_finished)
+        if self.progress is not None:
+            self.fetch_worker = self.progress.start(self.stream.fetch, self.chunk_size, message="Loading rows...",
+                                                    **callbacks)
+        else:
+            self.fetch_worker = run_in_background(self.stream.fetch, self.chunk_size, **callbacks)
+
+    def on_fetched(self, rows):
+        if self.stream is None or not rows:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def on_fetch_failed(self, message):
+        self.when_loaded.clear()
+        if self.stream is not None:
+            self.stream = None
+            self.fetch_failed.emit(message)
+
+    def on_fetch_finished(self):
+        self.fetch_worker = None
+        if self.stream is None:
+            return
+        if self.stream.is_open:
+            self.idle_timer.start()
+        if self.when_loaded:
+            self.fetch_all()
+
+    def fetch_all(self, then=None):
+        # Fetches the remaining rows chunk by chunk in the background, then calls then
+        if then is not None:
+            self.when_loaded.append(then)
+        if self.fetch_worker is not None:
+            return
+        if self.canFetchMore():
+            self.fetchMore()
+            return
+        callbacks, self.when_loaded = self.when_loaded, []
+        for callback in callbacks:
+            callback()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Sorts the loaded rows on their native values; only meaningful once every row is loaded
+        if column >= len(self.headers) or self.canFetchMore():
+            return
+        self.layoutAboutToBeChanged.emit()
+        # NULLs go last in either direction, the way the database orders them by default
+        positions = [row for row, values in enumerate(self.rows) if values[column] is not None]
+        positions.sort(key=lambda row: self.rows[row][column], reverse=order == Qt.DescendingOrder)
+        positions += [row for row, values in enumerate(self.rows) if values[column] is None]
+        self.rows = [self.rows[row] for row in positions]
+
+        # Keep the selection on the same rows
+        moved = {old: new for new, old in enumerate(positions)}
+        old_indexes = self.persistentIndexList()
+        self.changePersistentIndexList(old_indexes, [self.index(moved[index.row()], index.column())
+                                                     for index in old_indexes])
+        self.layoutChanged.emit()
+
+    def row_data(self, row):
+        return self.rows[row]
+
+    def update_keys(self, rows, column=0):
+        # Replaces the rows whose key matches one of rows in place; returns the keys that were found
+        positions = {values[column]: row for row, values in enumerate(self.rows)}
+        found = set()
+        for values in rows:
+            row = positions.get(values[column])
+            if row is None:
+                continue
+            self.rows[row] = values
+            found.add(values[column])
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+        return found
+
+    def append_rows(self, rows):
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+    def remove_keys(self, keys, column=0):
+        # Removes every row whose key is in keys, one contiguous run at a time from the bottom up
+        keys = set(keys)
+        rows = [row for row, values in enumerate(self.rows) if values[column] in keys]
+        while rows:
+            last = first = rows.pop()
+            while rows and rows[-1] == first - 1:
+                first = rows.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+
+    def release_connection(self):
+        if self.stream is not None:
+            self.stream.close()
+
+    def close(self):
+        self.idle_timer.stop()
+        self.when_loaded = []
+        stream, self.stream = self.stream, None
+        if stream is None:
+            return
+        if self.fetch_worker is not None:
+            # The chunk in flight still uses the connection; it goes back once the worker is done with it
+            self.fetch_worker.signals.finished.connect(stream.close)
+            self.fetch_worker.cancel()
+        else:
+            stream.close()
@@ -0,0 +1,71 @@
+from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QGridLayout, QLabel, QLineEdit, QMessageBox, QVBoxLayout
+from app.utils.helpers import is_valid_date
+
+
+class SignPlayerDialog(QDialog):
+    FIELDS = [
+        ('first_name', "First Name:"),
+        ('last_name', "Last Name:"),
+        ('date_of_birth', "Date of Birth (YYYY-MM-DD):"),
+        ('nationality', "Nationality:"),
+        ('main_position', "Main Position:"),
+        ('estimated_market_price', "Estimated Market Price:"),
+        ('sign_date', "Contract Sign Date (YYYY-MM-DD):"),
+        ('end_date', "Contract End Date (YYYY-MM-DD):"),
+        ('monthly_salary', "Monthly Salary:"),
+    ]
+    DATE_FIELDS = ['date_of_birth', 'sign_date', 'end_date']
+    NUMBER_FIELDS = ['estimated_market_price', 'monthly_salary']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Sign Player")
+
+        self.inputs = {name: QLineEdit() for name, _ in self.FIELDS}
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        grid = QGridLayout()
+
+        for row, (name, label) in enumerate(self.FIELDS):
+            grid.addWidget(QLabel(label), row, 0)
+            grid.addWidget(self.inputs[name], row, 1)
+
+        layout.addLayout(grid)
+        layout.addWidget(QLabel("The player, the contract and an empty statistics record are saved together, "
+                                "or not at all."))
+
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+        self.setLayout(layout)
+
+    def accept(self):
+        # Stay open on invalid input so nothing typed is lost
+        if not all(field.text() for field in self.inputs.values()):
+            QMessageBox.warning(self, "Input Error", "Please fill in all fields before signing a player.")
+            return
+
+        if not all(is_valid_date(self.inputs[name].text()) for name in self.DATE_FIELDS):
+            QMessageBox.warning(self, "Input Error", "Dates must be in the format YYYY-MM-DD.")
+            return
+
+        if self.inputs['end_date'].text() < self.inputs['sign_date'].text():
+            QMessageBox.warning(self, "Input Error", "The contract cannot end before it is signed.")
+            return
+
+        try:
+            for name in self.NUMBER_FIELDS:
+                float(self.inputs[name].text())
+        except ValueError:
+            QMessageBox.warning(self, "Input Error", "Market Price and Monthly Salary must be valid numbers.")
+            return
+
+        super().accept()
+
+    def values(self):
+        return {name: float(self.inputs[name].text()) if name in self.NUMBER_FIELDS else self.inputs[name].text()
+                for name, _ in self.FIELDS}
@@ -0,0 +1,82 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from app.utils.query_handle import QueryHandle
+
+
+class WorkerSignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+    progress = pyqtSignal(object)
+
+
+class Worker(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.handle = QueryHandle()
+        self.signals = WorkerSignals()
+        # Progress is reported from the worker thread; the signal queues it to the GUI thread
+        self.handle.on_progress = self.signals.progress.emit
+        # Called from the worker thread with a result that arrived after cancel() and will never be delivered
+        self.discard = None
+
+    def cancel(self):
+        self.handle.cancel()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, handle=self.handle, **self.kwargs)
+        except Exception as e:
+            if self.handle.cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.error.emit(str(e))
+        else:
+            if self.handle.cancelled:
+                if self.discard is not None:
+                    self.discard(result)
+                self.signals.cancelled.emit()
+            else:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+# Python wrappers must outlive the C++ runnable, so keep them referenced until they finish
+_active_workers = set()
+
+
+def start_worker(worker, on_result=None, on_error=None, on_cancelled=None, on_finished=None, on_progress=None):
+    if on_result is not None:
+        worker.signals.result.connect(on_result)
+    if on_error is not None:
+        worker.signals.error.connect(on_error)
+    if on_cancelled is not None:
+        worker.signals.cancelled.connect(on_cancelled)
+    if on_finished is not None:
+        worker.signals.finished.connect(on_finished)
+    if on_progress is not None:
+        worker.signals.progress.connect(on_progress)
+
+    _active_workers.add(worker)
+    worker.signals.finished.connect(lambda: _active_workers.discard(worker))
+    worker.setAutoDelete(False)
+    QThreadPool.globalInstance().start(worker)
+    return worker
+
+
+def run_in_background(fn, *args, on_result=None, on_error=None, on_cancelled=None, on_finished=None,
+                      on_discard=None, on_progress=None, **kwargs):
+    worker = Worker(fn, *args, **kwargs)
+    worker.discard = on_discard
+    return start_worker(worker, on_result, on_error, on_cancelled, on_finished, on_progress)
+
+
+def run_procedure(procedure, *params, on_result=None, on_error=None, on_cancelled=None, on_finished=None):
+    # Imported on first use so psycopg2 is not loaded before the window is up
+    from app.utils.db_utils import execute_procedure
+    return run_in_background(execute_procedure, procedure, *params, on_result=on_result, on_error=on_error,
+                             on_cancelled=on_cancelled, on_finished=on_finished)
@@ -0,0 +1,267 @@
+import csv
+import os
+import time
+
+from psycopg2 import sql
+from app.utils.db_pool import get_pool
+from app.utils.query_cache import get_cache
+
+
+IMPORT_COLUMNS = {
+    'players': ['player_id', 'first_name', 'last_name', 'date_of_birth', 'nationality', 'main_position',
+                'estimated_market_price'],
+    'contracts': ['player_id', 'sign_date', 'end_date', 'monthly_salary'],
+    'statistics': ['player_id', 'matches_played', 'total_play_time', 'goals', 'assists', 'tackles', 'saves',
+                   'yellow_cards', 'red_cards'],
+}
+
+REQUIRED_COLUMNS = {
+    'players': ['first_name', 'last_name'],
+    'contracts': ['player_id', 'sign_date', 'end_date', 'monthly_salary'],
+    'statistics': ['player_id'],
+}
+
+COUNTER_COLUMNS = IMPORT_COLUMNS['statistics'][1:]
+
+_UNKNOWN_PLAYER = ("NOT EXISTS (SELECT 1 FROM players p WHERE p.player_id = "
+                   "CASE WHEN pg_input_is_valid({stage}.player_id, 'integer') THEN {stage}.player_id::INT END)")
+
+# Every row but the last one for each player_id; runs last, so the remaining ids are valid integers
+_DUPLICATES = ("SELECT row_no FROM (SELECT row_no, row_number() OVER (PARTITION BY player_id::INT "
+               "ORDER BY row_no DESC) AS position FROM {stage} "
+               "WHERE reject_reason IS NULL AND player_id IS NOT NULL) d WHERE position > 1")
+
+# Each check is (reason, SQL condition that marks a staged row as invalid); the first failing check is reported.
+# Conditions guard their own casts because Postgres may evaluate them before "reject_reason IS NULL".
+VALIDATION_RULES = {
+    'players': [
+        ("invalid player_id", "player_id IS NOT NULL AND NOT pg_input_is_valid(player_id, 'integer')"),
+        ("missing last_name", "coalesce(trim(last_name), '') = ''"),
+        ("invalid date_of_birth", "date_of_birth IS NOT NULL AND NOT pg_input_is_valid(date_of_birth, 'date')"),
+        ("invalid estimated_market_price",
+         "estimated_market_price IS NOT NULL AND NOT pg_input_is_valid(estimated_market_price, 'numeric(15,2)')"),
+        ("duplicate player_id", "row_no IN ({})".format(_DUPLICATES.format(stage="stage_players"))),
+    ],
+    'contracts': [
+        ("invalid player_id", "NOT pg_input_is_valid(coalesce(player_id, ''), 'integer')"),
+        ("unknown player_id", _UNKNOWN_PLAYER.format(stage="stage_contracts")),
+        ("invalid sign_date", "NOT pg_input_is_valid(coalesce(sign_date, ''), 'date')"),
+        ("invalid end_date", "NOT pg_input_is_valid(coalesce(end_date, ''), 'date')"),
+        ("end_date before sign_date",
+         "CASE WHEN pg_input_is_valid(sign_date, 'date') AND pg_input_is_valid(end_date, 'date') "
+         "THEN end_date::DATE < sign_date::DATE END"),
+        ("invalid monthly_salary", "NOT pg_input_is_valid(coalesce(monthly_salary, ''), 'numeric(15,2)')"),
+        ("duplicate player_id", "row_no IN ({})".format(_DUPLICATES.format(stage="stage_contracts"))),
+    ],
+    'statistics': [
+        ("invalid player_id", "NOT pg_input_is_valid(coalesce(player_id, ''), 'integer')"),
+        ("unknown player_id", _UNKNOWN_PLAYER.format(stage="stage_statistics")),
+    ] + [
+        (f"invalid {column}",
+         f"{column} IS NOT NULL AND NOT (pg_input_is_valid({column}, 'integer') AND {column}::INT >= 0)")
+        for column in COUNTER_COLUMNS
+    ],
+}
+
+MERGE_STATEMENTS = {
+    'players': [
+        """
+        INSERT INTO players (player_id, first_name, last_name, date_of_birth, nationality, main_position,
+                             estimated_market_price)
+        SELECT player_id::INT, first_name, last_name, date_of_birth::DATE, nationality, main_position,
+               estimated_market_price::DECIMAL
+        FROM stage_players
+        WHERE reject_reason IS NULL AND player_id IS NOT NULL
+        ON CONFLICT (player_id) DO UPDATE
+        SET first_name = EXCLUDED.first_name,
+            last_name = EXCLUDED.last_name,
+            date_of_birth = EXCLUDED.date_of_birth,
+            nationality = EXCLUDED.nationality,
+            main_position = EXCLUDED.main_position,
+            estimated_market_price = EXCLUDED.estimated_market_price
+        """,
+        # The next ID the sequence hands out must be past every imported one; after RESTART IDENTITY it hands out
+        # last_value itself, as is_called is false
+        """
+        SELECT setval(pg_get_serial_sequence('players', 'player_id'), max(player_id))
+        FROM players
+        HAVING max(player_id) >= (SELECT last_value + is_called::INT FROM players_player_id_seq)
+        """,
+        """
+        INSERT INTO players (first_name, last_name, date_of_birth, nationality, main_position, estimated_market_price)
+        SELECT first_name, last_name, date_of_birth::DATE, nationality, main_position, estimated_market_price::DECIMAL
+        FROM stage_players
+        WHERE reject_reason IS NULL AND player_id IS NULL
+        ORDER BY row_no
+        """,
+    ],
+    'contracts': [
+        """
+        INSERT INTO contracts (player_id, sign_date, end_date, monthly_salary)
+        SELECT player_id::INT, sign_date::DATE, end_date::DATE, monthly_salary::DECIMAL
+        FROM stage_contracts
+        WHERE reject_reason IS NULL
+        ON CONFLICT (player_id) DO UPDATE
+        SET sign_date = EXCLUDED.sign_date,
+            end_date = EXCLUDED.end_date,
+            monthly_salary = EXCLUDED.monthly_salary
+        """,
+    ],
+    # Statistics rows are increments, exactly like update_statistics; repeated players are summed first.
+    # The statement-level avg_performance trigger then recomputes the whole batch once.
+    'statistics': [
+        """
+        INSERT INTO statistics (player_id, matches_played, total_play_time, goals, assists, tackles, saves,
+                                yellow_cards, red_cards)
+        SELECT player_id::INT,
+               sum(coalesce(matches_played::INT, 0)), sum(coalesce(total_play_time::INT, 0)),
+               sum(coalesce(goals::INT, 0)), sum(coalesce(assists::INT, 0)), sum(coalesce(tackles::INT, 0)),
+               sum(coalesce(saves::INT, 0)), sum(coalesce(yellow_cards::INT, 0)), sum(coalesce(red_cards::INT, 0))
+        FROM stage_statistics
+        WHERE reject_reason IS NULL
+        GROUP BY player_id::INT
+        ON CONFLICT (player_id) DO UPDATE
+        SET matches_played = statistics.matches_played + EXCLUDED.matches_played,
+            total_play_time = statistics.total_play_time + EXCLUDED.total_play_time,
+            goals = statistics.goals + EXCLUDED.goals,
+            assists = statistics.assists + EXCLUDED.assists,
+            tackles = statistics.tackles + EXCLUDED.tackles,
+            saves = statistics.saves + EXCLUDED.saves,
+            yellow_cards = statistics.yellow_cards + EXCLUDED.yellow_cards,
+            red_cards = statistics.red_cards + EXCLUDED.red_cards
+        """,
+    ],
+}
+
+
+class ImportReport:
+    def __init__(self):
+        self.staged = {}
+        self.merged = {}
+        self.rejected = []
+        self.elapsed = 0.0
+
+    @property
+    def total_rows(self):
+        return sum(self.staged.values())
+
+    @property
+    def rows_per_second(self):
+        return self.total_rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        lines = [
+            f"{table}: {self.merged.get(table, 0)} merged, {self.staged[table] - self.merged.get(table, 0)} rejected"
+            for table in self.staged
+        ]
+        lines.append(f"{self.total_rows} rows in {self.elapsed:.2f}s ({self.rows_per_second:.0f} rows/s)")
+        return "\n".join(lines)
+
+
+def _read_header(table, source):
+    header = next(csv.reader([source.readline()]), [])
+    columns = [column.strip().lower() for column in header]
+
+    unknown = [column for column in columns if column not in IMPORT_COLUMNS[table]]
+    if unknown:
+        raise ValueError(f"{table} CSV has unknown columns: {', '.join(unknown)}")
+    missing = [column for column in REQUIRED_COLUMNS[table] if column not in columns]
+    if missing:
+        raise ValueError(f"{table} CSV is missing columns: {', '.join(missing)}")
+    return columns
+
+
+def _stage(cur, table, source):
+    stage = f"stage_{table}"
+    cur.execute(sql.SQL(
+        "CREATE TEMP TABLE {} (row_no BIGINT GENERATED ALWAYS AS IDENTITY, {}, reject_reason TEXT) ON COMMIT DROP"
+    ).format(
+        sql.Identifier(stage),
+        sql.SQL(", ").join(sql.SQL("{} TEXT").format(sql.Identifier(column)) for column in IMPORT_COLUMNS[table])
+    ))
+
+    columns = _read_header(table, source)
+    cur.copy_expert(sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+        sql.Identifier(stage), sql.SQL(", ").join(map(sql.Identifier, columns))
+    ).as_string(cur), source)
+    staged = cur.rowcount
+
+    # One pass per rule, only over rows that are still valid
+    for reason, condition in VALIDATION_RULES[table]:
+        cur.execute(
+            sql.SQL("UPDATE {} SET reject_reason = %s WHERE reject_reason IS NULL AND ({})").format(
+                sql.Identifier(stage), sql.SQL(condition)
+            ),
+            (reason,)
+        )
+    return staged
+
+
+def _collect_rejects(cur, table, report):
+    cur.execute(sql.SQL("SELECT row_no, reject_reason FROM {} WHERE reject_reason IS NOT NULL ORDER BY row_no").format(
+        sql.Identifier(f"stage_{table}")
+    ))
+    # row_no counts data rows; +1 for the header gives the line in the file
+    rejected = [(table, row_no + 1, reason) for row_no, reason in cur.fetchall()]
+    report.rejected.extend(rejected)
+    return len(rejected)
+
+
+def _open(source):
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, newline="", encoding="utf-8"), True
+    if hasattr(source, "readline"):
+        return source, False
+    raise TypeError(f"Cannot import from {source!r}")
+
+
+def bulk_import(players=None, contracts=None, statistics=None, handle=None):
+    sources = {'players': players, 'contracts': contracts, 'statistics': statistics}
+    report = ImportReport()
+    start = time.perf_counter()
+
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        if handle is not None:
+            handle.attach(conn)
+        try:
+            conn.autocommit = False
+            with conn.cursor() as cur:
+                # Players go first so contracts and statistics can be validated against the merged players
+                for table in ('players', 'contracts', 'statistics'):
+                    if sources[table] is None:
+                        continue
+                    source, owned = _open(sources[table])
+                    try:
+                        report.staged[table] = _stage(cur, table, source)
+                    finally:
+                        if owned:
+                            source.close()
+
+                    rejected = _collect_rejects(cur, table, report)
+                    for statement in MERGE_STATEMENTS[table]:
+                        cur.execute(statement)
+                    report.merged[table] = report.staged[table] - rejected
+            conn.commit()
+        finally:
+            # Before the connection goes back, so a late cancel cannot reach whoever takes it next
+            if handle is not None:
+                handle.detach()
+    except Exception as e:
+        if conn.closed:
+            # The commit may or may not have reached the server
+            get_cache().invalidate()
+        # putconn rolls back the open transaction, staging tables included
+        pool.putconn(conn, discard=bool(conn.closed))
+        if isinstance(e, (ValueError, TypeError, OSError)):
+            raise
+        raise RuntimeError(f"Database error: {e}")
+    pool.putconn(conn)
+
+    # The avg_performance triggers fire on the statistics merge and on players changing position
+    tables = set(report.staged) | ({'avg_performance'} if {'players', 'statistics'} & set(report.staged) else set())
+    get_cache().invalidate(tables)
+
+    report.elapsed = time.perf_counter() - start
+    return report
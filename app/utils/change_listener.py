@@ -0,0 +1,120 @@
+import json
+import select
+import threading
+import time
+
+import psycopg2
+
+from app.config import DB_CONFIG, LISTEN_CONFIG
+from app.utils.query_cache import cascaded_tables, get_cache
+
+# Channel the notify_table_change triggers publish on, and the tables that have them
+CHANGES_CHANNEL = 'table_changes'
+NOTIFYING_TABLES = ('players', 'contracts', 'statistics', 'avg_performance')
+
+
+def merge_change(changes, table, ids):
+    # changes maps a table to the set of changed player IDs, or to None once any change to it listed no IDs
+    if ids is None or (table in changes and changes[table] is None):
+        changes[table] = None
+    else:
+        changes.setdefault(table, set()).update(ids)
+
+
+class ChangeListener:
+    # Listens for table changes on a connection of its own, in a thread of its own. Notifications that arrive
+    # within the coalesce window of the first are merged into one call of on_changes, so a burst of writes costs
+    # the caller one refresh. The cached results of the changed tables are invalidated before the call.
+    def __init__(self, on_changes, coalesce=None, db_config=None):
+        self.on_changes = on_changes
+        self.coalesce = LISTEN_CONFIG['coalesce'] if coalesce is None else coalesce
+        self.db_config = dict(db_config or DB_CONFIG)
+        self.notifications = 0
+        self.batches = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.db_config)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANGES_CHANNEL}")
+        return conn
+
+    def _drain(self, conn, pending, stale):
+        conn.poll()
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                change = json.loads(notify.payload)
+                table, operation, ids = change['table'], change['op'], change['ids']
+            except (ValueError, KeyError, TypeError):
+                continue
+            self.notifications += 1
+            merge_change(pending, table, ids)
+            # Deleted players take their rows in tables that send no notifications with them
+            stale.update(cascaded_tables(table) if operation in ('DELETE', 'TRUNCATE') else {table})
+
+    def _deliver(self, changes, stale):
+        self.batches += 1
+        get_cache().invalidate(stale)
+        self.on_changes(changes)
+
+    def _run(self):
+        conn = None
+        connected_before = False
+        pending = {}
+        stale = set()
+        deadline = None
+        while not self._stop.is_set():
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except psycopg2.Error:
+                    self._stop.wait(LISTEN_CONFIG['reconnect_delay'])
+                    continue
+                if connected_before:
+                    # Changes made while nobody was listening are lost, so everything may be stale
+                    for table in NOTIFYING_TABLES:
+                        merge_change(pending, table, None)
+                        stale.update(cascaded_tables(table))
+                connected_before = True
+
+            if pending and deadline is None:
+                deadline = time.monotonic() + self.coalesce
+            timeout = LISTEN_CONFIG['poll_interval'] if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                if select.select([conn], [], [], timeout)[0]:
+                    self._drain(conn, pending, stale)
+            except (psycopg2.Error, OSError):
+                # Dropped by the server, for instance while a snapshot is restored; reconnect and carry on
+                try:
+                    conn.close()
+                except psycopg2.Error:
+                    pass
+                conn = None
+                continue
+
+            if deadline is not None and time.monotonic() >= deadline:
+                changes, tables = pending, stale
+                pending, stale, deadline = {}, set(), None
+                self._deliver(changes, tables)
+
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,45 @@
+from app.utils.db_utils import open_stream
+
+# Rows pulled per round trip; columnar fetches always read the whole result
+COLUMNAR_CHUNK_SIZE = 10000
+
+# PostgreSQL type OIDs and the NumPy dtype their columns become
+INTEGER_TYPES = {20, 21, 23}
+FLOAT_TYPES = {700, 701, 1700}
+DATE_TYPE = 1082
+
+
+def require_numpy():
+    # NumPy is only needed for analytics, so the GUI starts and runs without it
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("Columnar fetches need NumPy; install it with pip install numpy")
+    return numpy
+
+
+def _array(np, type_code, values):
+    if type_code in INTEGER_TYPES:
+        # NULLs have no integer representation, so a column with any of them becomes float with NaN
+        if None in values:
+            return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        return np.array(values, dtype=np.int64)
+    if type_code in FLOAT_TYPES:
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    if type_code == DATE_TYPE:
+        return np.array(values, dtype='datetime64[D]')
+    return np.array(values, dtype=object)
+
+
+def fetch_columns(procedure, *params, handle=None):
+    # The result of a display_ or search_ function as one NumPy array per column, keyed by column name
+    np = require_numpy()
+    stream, rows = open_stream(procedure, *params, chunk_size=COLUMNAR_CHUNK_SIZE, handle=handle, typed=True)
+    try:
+        while not stream.exhausted:
+            rows.extend(stream.fetch(COLUMNAR_CHUNK_SIZE, handle=handle))
+    finally:
+        stream.close()
+
+    columns = list(zip(*rows)) if rows else [()] * len(stream.description)
+    return {column.name: _array(np, column.type_code, values) for column, values in zip(stream.description, columns)}
@@ -0,0 +1,196 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+from app.config import DB_CONFIG, POOL_CONFIG
+
+
+class PooledConnection(extensions.connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Per-connection caches of composed statements and server-side prepared statement names
+        self.statements = {}
+        self.prepared = {}
+
+
+class ConnectionPool:
+    def __init__(self, db_config, min_size=1, max_size=10, checkout_timeout=30,
+                 health_check_interval=30, max_idle_time=300):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+
+        self.db_config = dict(db_config)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.max_idle_time = max_idle_time
+
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    def _connect(self):
+        conn = psycopg2.connect(connection_factory=PooledConnection, **self.db_config)
+        conn.autocommit = True
+        return conn
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _reserve(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(
+                        f"Timed out after {timeout}s waiting for a database connection "
+                        f"({self.max_size} in use)"
+                    )
+                self._cond.wait(remaining)
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def getconn(self, timeout=None):
+        conn, last_used = self._reserve(self.checkout_timeout if timeout is None else timeout)
+
+        if conn is not None and self._is_healthy(conn, last_used):
+            return conn
+        if conn is not None:
+            self._close_quietly(conn)
+
+        # Open a fresh connection, either for a new slot or to replace a dead one
+        try:
+            return self._connect()
+        except Exception:
+            self._release_slot()
+            raise
+
+    def putconn(self, conn, discard=False):
+        if not discard and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if not conn.autocommit:
+                    conn.autocommit = True
+            except psycopg2.Error:
+                discard = True
+
+        if discard or conn.closed:
+            self._close_quietly(conn)
+            self._release_slot()
+            return
+
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            if self._closed:
+                expired.append(conn)
+                self._size -= 1
+            else:
+                self._idle.append((conn, now))
+                # Trim connections that have sat idle for too long, but never below min_size
+                while self._size > self.min_size and self._idle and \
+                        now - self._idle[0][1] > self.max_idle_time:
+                    expired.append(self._idle.pop(0)[0])
+                    self._size -= 1
+            self._cond.notify()
+
+        for stale in expired:
+            self._close_quietly(stale)
+
+    def fill(self):
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                self._release_slot()
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            self.putconn(conn, discard=bool(conn.closed))
+            raise
+        except BaseException:
+            self.putconn(conn)
+            raise
+        else:
+            self.putconn(conn)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -1,24 +1,485 @@
+import itertools
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
 import psycopg2
-from app.config import DB_CONFIG
+from psycopg2 import extensions, extras, sql
+from app.config import STREAM_CONFIG
+from app.utils.db_pool import get_pool
+from app.utils.metrics import CallRecord, get_metrics
+from app.utils.query_cache import get_cache, read_tables, written_tables
+
+_cursor_ids = itertools.count(1)
+
+# Functions that are SELECTed like display_ and search_ functions although their names say otherwise
+SCALAR_FUNCTIONS = {'calculate_avg_performance', 'season_of'}
+
+
+def _numeric_to_float(value, cur):
+    # NUMERIC arrives as text; anything up to 15 characters has at most 15 significant digits, which a float
+    # holds exactly. Longer values stay Decimal.
+    if value is None:
+        return None
+    return float(value) if len(value) <= 15 else Decimal(value)
+
+
+# Typed fetches decode NUMERIC to float, so results sort and compute natively; int and date columns already
+# arrive as int and datetime.date
+NUMERIC_AS_FLOAT = extensions.new_type(extensions.DECIMAL.values, 'NUMERIC_AS_FLOAT', _numeric_to_float)
+
+
+def is_function(procedure):
+    return procedure.startswith("display_") or procedure.startswith("search_") or procedure in SCALAR_FUNCTIONS
+
+
+def _call_statement(conn, procedure, param_count):
+    key = ("call", procedure, param_count)
+    statement = conn.statements.get(key)
+    if statement is None:
+        statement = sql.SQL("CALL {}({});").format(
+            sql.Identifier(procedure),
+            sql.SQL(", ").join(sql.Placeholder() * param_count)
+        ).as_string(conn)
+        conn.statements[key] = statement
+    return statement
+
+
+def _execute_statement(conn, procedure, param_count):
+    # Functions are prepared once per connection and then run with EXECUTE,
+    # so the server skips parsing and planning on every subsequent call
+    key = (procedure, param_count)
+    statement = conn.prepared.get(key)
+    if statement is None:
+        name = f"fm_{procedure}_{param_count}"
+        args = sql.SQL(", ").join(sql.SQL(f"${i}") for i in range(1, param_count + 1))
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("PREPARE {} AS SELECT * FROM {}({})").format(
+                sql.Identifier(name), sql.Identifier(procedure), args
+            ))
+        placeholders = f"({', '.join(['%s'] * param_count)})" if param_count else ""
+        statement = sql.SQL("EXECUTE {}").format(sql.Identifier(name)).as_string(conn) + placeholders
+        conn.prepared[key] = statement
+    return statement
+
+
+def _deallocate(conn, procedure, param_count):
+    statement = conn.prepared.pop((procedure, param_count), None)
+    if statement is not None:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("DEALLOCATE {}").format(sql.Identifier(f"fm_{procedure}_{param_count}")))
+
+
+def _run(conn, procedure, params, record, commit=True, typed=False):
+    with conn.cursor() as cur:
+        if typed:
+            extensions.register_type(NUMERIC_AS_FLOAT, cur)
+        start = time.perf_counter()
+        if is_function(procedure):
+            try:
+                cur.execute(_execute_statement(conn, procedure, len(params)), params)
+            except psycopg2.errors.FeatureNotSupported:
+                # The function was redefined with a different result type since it was prepared
+                _deallocate(conn, procedure, len(params))
+                cur.execute(_execute_statement(conn, procedure, len(params)), params)
+            fetch_start = time.perf_counter()
+            record.execute += fetch_start - start
+            rows = cur.fetchall() if cur.description else None
+            record.fetch += time.perf_counter() - fetch_start
+            record.rows = len(rows) if rows is not None else None
+            return rows
+
+        cur.execute(_call_statement(conn, procedure, len(params)), params)
+        # Procedures with INOUT parameters return them as a single row
+        rows = cur.fetchall() if cur.description else None
+        if commit and not conn.autocommit:
+            conn.commit()
+        record.execute += time.perf_counter() - start
+        record.rows = len(rows) if rows is not None else None
+        return rows
+
+
+def _execute(procedure, params, record, handle=None, retry=True, typed=False):
+    pool = get_pool()
+    start = time.perf_counter()
+    conn = pool.getconn()
+    record.checkout += time.perf_counter() - start
+    try:
+        if handle is not None:
+            handle.attach(conn)
+        try:
+            result = _run(conn, procedure, params, record, typed=typed)
+        finally:
+            if handle is not None:
+                handle.detach()
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = bool(conn.closed)
+        pool.putconn(conn, discard=broken)
+        # Reads are safe to repeat on a fresh connection; a write may already have been applied
+        if broken and retry and is_function(procedure):
+            return _execute(procedure, params, record, handle, retry=False, typed=typed)
+        raise
+    except Exception:
+        pool.putconn(conn)
+        raise
+    pool.putconn(conn)
+    return result
+
+
+def _cache_key(cache, procedure, params, *suffix):
+    key = cache.key(procedure, params) + suffix
+    try:
+        hash(key)
+    except TypeError:
+        # Array parameters cannot be cached on
+        return None
+    return key
+
+
+def _cached_read(procedure, params, record, handle, typed=False):
+    cache = get_cache()
+    key = _cache_key(cache, procedure, params, *(('typed',) if typed else ()))
+    if key is None:
+        return _execute(procedure, params, record, handle, typed=typed)
+
+    rows = cache.get(key)
+    if rows is None:
+        tables = read_tables(procedure)
+        generation = cache.generation(tables)
+        rows = _execute(procedure, params, record, handle, typed=typed)
+        if rows is None:
+            return None
+        cache.put(key, rows, tables, generation)
+    else:
+        record.cached = True
+        record.rows = len(rows)
+    # Callers own the returned list; the cached one stays untouched
+    return list(rows)
+
+
+def execute_procedure(procedure, *params, handle=None, typed=False):
+    record = CallRecord(procedure, params)
+    try:
+        if is_function(procedure):
+            return _cached_read(procedure, params, record, handle, typed)
+        try:
+            return _execute(procedure, params, record, handle)
+        finally:
+            # Even a failed call may have been applied if the connection broke after the server committed
+            get_cache().invalidate(written_tables(procedure, params))
+    except Exception as e:
+        record.fail(e)
+        raise RuntimeError(f"Database error: {e}")
+    finally:
+        record.finish()
+        get_metrics().record(record)
+
+
+def execute_batch(procedure, param_rows, page_size=100, handle=None):
+    # Pipelines the CALLs page_size at a time per round trip, all in one transaction: every row is applied or none
+    if is_function(procedure):
+        raise ValueError(f"{procedure} is a function; only procedures can be run as a batch")
+    param_rows = [tuple(params) for params in param_rows]
+    if len({len(params) for params in param_rows}) > 1:
+        raise ValueError(f"Every row of a {procedure} batch must have the same number of parameters")
+
+    record = CallRecord(procedure, (), kind='batch')
+    pool = get_pool()
+    start = time.perf_counter()
+    conn = pool.getconn()
+    record.checkout = time.perf_counter() - start
+    try:
+        if handle is not None:
+            handle.attach(conn)
+        try:
+            conn.autocommit = False
+            start = time.perf_counter()
+            if param_rows:
+                statement = _call_statement(conn, procedure, len(param_rows[0]))
+                with conn.cursor() as cur:
+                    for first in range(0, len(param_rows), page_size):
+                        extras.execute_batch(cur, statement, param_rows[first:first + page_size],
+                                             page_size=page_size)
+                        if handle is not None:
+                            handle.report(min(first + page_size, len(param_rows)))
+            conn.commit()
+            record.execute = time.perf_counter() - start
+            record.rows = len(param_rows)
+        finally:
+            if handle is not None:
+                handle.detach()
+    except Exception as e:
+        record.fail(e)
+        pool.putconn(conn, discard=bool(conn.closed))
+        raise RuntimeError(f"Database error: {e}")
+    finally:
+        # Only clean_table writes to different tables depending on its parameters
+        rows = param_rows if procedure == 'clean_table' else param_rows[:1]
+        get_cache().invalidate(set().union(*(written_tables(procedure, params) for params in rows)))
+        record.finish()
+        get_metrics().record(record)
+    pool.putconn(conn)
+    return len(param_rows)
+
+
+# Errors that only mean the step lost a race with another session; running it again can succeed
+RETRYABLE_ERRORS = (psycopg2.extensions.TransactionRollbackError, psycopg2.errors.LockNotAvailable)
+
+
+class Transaction:
+    def __init__(self, conn, record, handle=None):
+        self.conn = conn
+        self.record = record
+        self.handle = handle
+        self.written = set()
+        self.calls = 0
+        # Set when a step failed outside a savepoint; the server then refuses everything up to the rollback
+        self.aborted = False
+        self._savepoints = itertools.count(1)
+
+    def call(self, procedure, *params, retries=0):
+        # A step with retries runs under its own savepoint, so a failed attempt is undone without losing
+        # the steps before it
+        if not retries:
+            return self._call(procedure, params)
+        for attempt in range(retries + 1):
+            try:
+                with self.savepoint():
+                    return self._call(procedure, params)
+            except RuntimeError as e:
+                if attempt == retries or not isinstance(e.__cause__, RETRYABLE_ERRORS):
+                    raise
+
+    def _call(self, procedure, params):
+        if self.aborted:
+            raise RuntimeError("Database error: the transaction was aborted by an earlier failed step")
+        if self.handle is not None and self.handle.cancelled:
+            raise RuntimeError("Database error: the transaction was cancelled")
+        self.calls += 1
+        if not is_function(procedure):
+            self.written |= written_tables(procedure, params)
+        try:
+            return _run(self.conn, procedure, params, self.record, commit=False)
+        except psycopg2.Error as e:
+            self.aborted = True
+            raise RuntimeError(f"Database error: {e}") from e
+
+    @contextmanager
+    def savepoint(self):
+        # Undoes only the work done inside the block when it raises; the transaction carries on
+        name = sql.Identifier(f"fm_savepoint_{next(self._savepoints)}")
+        aborted = self.aborted
+        with self.conn.cursor() as cur:
+            cur.execute(sql.SQL("SAVEPOINT {}").format(name))
+        try:
+            yield self
+        except Exception:
+            with self.conn.cursor() as cur:
+                cur.execute(sql.SQL("ROLLBACK TO SAVEPOINT {}").format(name))
+            self.aborted = aborted
+            raise
+        with self.conn.cursor() as cur:
+            cur.execute(sql.SQL("RELEASE SAVEPOINT {}").format(name))
 
 
-def execute_procedure(procedure, *params):
+@contextmanager
+def transaction(name='transaction', handle=None):
+    # Runs every call made through the yielded Transaction on one connection and commits once at the end;
+    # any exception rolls all of them back. Reads inside see the uncommitted writes and skip the cache.
+    record = CallRecord(name, (), kind='transaction')
+    pool = get_pool()
+    start = time.perf_counter()
+    conn = pool.getconn()
+    record.checkout = time.perf_counter() - start
+    tx = Transaction(conn, record, handle)
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor()
-
-        if procedure.startswith("display_") or procedure.startswith("search_"):
-            cur.callproc(procedure, params)
-            result = cur.fetchall() if cur.description else None
-        else:
-            placeholders = ", ".join(["%s"] * len(params))
-            query = f"CALL {procedure}({placeholders});"
-            cur.execute(query, params)
+        if handle is not None:
+            handle.attach(conn)
+        try:
+            conn.autocommit = False
+            yield tx
+            if tx.aborted:
+                raise RuntimeError("Database error: the transaction was aborted by an earlier failed step")
+            start = time.perf_counter()
             conn.commit()
-            result = None
+            record.execute += time.perf_counter() - start
+        finally:
+            if handle is not None:
+                handle.detach()
+    except psycopg2.Error as e:
+        record.fail(e)
+        pool.putconn(conn, discard=bool(conn.closed))
+        raise RuntimeError(f"Database error: {e}") from e
+    except BaseException as e:
+        record.fail(e.__cause__ or e)
+        # putconn rolls back whatever the failed transaction left open
+        pool.putconn(conn, discard=bool(conn.closed))
+        raise
+    else:
+        pool.putconn(conn)
+    finally:
+        get_cache().invalidate(tx.written)
+        record.rows = tx.calls
+        record.finish()
+        get_metrics().record(record)
 
-        cur.close()
-        conn.close()
-        return result
+
+def explain_procedure(procedure, *params, handle=None):
+    # Runs a function under EXPLAIN (ANALYZE, BUFFERS) and returns the plan text; the transaction is rolled back
+    if not is_function(procedure):
+        raise ValueError(f"{procedure} is a procedure; EXPLAIN only covers display_ and search_ functions")
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        if handle is not None:
+            handle.attach(conn)
+        try:
+            conn.autocommit = False
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM {}({})").format(
+                    sql.Identifier(procedure),
+                    sql.SQL(", ").join(sql.Placeholder() * len(params))
+                ), params)
+                plan = "\n".join(row[0] for row in cur.fetchall())
+        finally:
+            if handle is not None:
+                handle.detach()
     except Exception as e:
+        pool.putconn(conn, discard=bool(conn.closed))
         raise RuntimeError(f"Database error: {e}")
+    pool.putconn(conn)
+    return plan
+
+
+class ResultStream:
+    def __init__(self, procedure, *params, typed=False):
+        self.procedure = procedure
+        self.params = params
+        self.typed = typed
+        self.description = None
+        self.position = 0
+        self.exhausted = False
+        self._conn = None
+        self._cursor = None
+        self._pool = None
+
+    @property
+    def is_open(self):
+        return self._cursor is not None
+
+    def _open(self, handle, record):
+        pool = get_pool()
+        start = time.perf_counter()
+        conn = pool.getconn()
+        record.checkout += time.perf_counter() - start
+        try:
+            if handle is not None:
+                handle.attach(conn)
+            try:
+                # A holdable cursor outlives the transaction that declared it, so a stream left half read holds no
+                # locks: in autocommit mode the result is materialized on the server as the cursor is declared and
+                # rows are then pulled from it on demand
+                start = time.perf_counter()
+                cursor = conn.cursor(name=f"fm_stream_{next(_cursor_ids)}", withhold=True)
+                if self.typed:
+                    extensions.register_type(NUMERIC_AS_FLOAT, cursor)
+                cursor.execute(sql.SQL("SELECT * FROM {}({})").format(
+                    sql.Identifier(self.procedure),
+                    sql.SQL(", ").join(sql.Placeholder() * len(self.params))
+                ), self.params)
+                if self.position:
+                    # Reopened after an idle release: skip rows already delivered without transferring them
+                    cursor.scroll(self.position)
+                record.execute += time.perf_counter() - start
+            finally:
+                if handle is not None:
+                    handle.detach()
+        except Exception:
+            pool.putconn(conn, discard=bool(conn.closed))
+            raise
+        # A snapshot restore may replace the pool while the stream is open; the connection goes back to its own
+        self._pool = pool
+        self._conn = conn
+        self._cursor = cursor
+
+    def fetch(self, size, handle=None, record=None):
+        if self.exhausted:
+            return []
+        # Later chunks pulled by the table model are recorded as calls of their own
+        own_record = record is None
+        if own_record:
+            record = CallRecord(self.procedure, self.params, kind='fetch')
+        try:
+            if self._cursor is None:
+                self._open(handle, record)
+            if handle is not None:
+                handle.attach(self._conn)
+            try:
+                start = time.perf_counter()
+                rows = self._cursor.fetchmany(size)
+                record.fetch += time.perf_counter() - start
+                record.rows = len(rows)
+            finally:
+                if handle is not None:
+                    handle.detach()
+            if self.description is None:
+                self.description = self._cursor.description
+        except Exception as e:
+            record.fail(e)
+            self.close()
+            raise RuntimeError(f"Database error: {e}")
+        finally:
+            if own_record:
+                record.finish()
+                get_metrics().record(record)
+
+        self.position += len(rows)
+        if len(rows) < size:
+            self.exhausted = True
+            self.close()
+        return rows
+
+    def close(self):
+        conn, cursor, pool = self._conn, self._cursor, self._pool
+        self._conn = self._cursor = self._pool = None
+        if conn is None:
+            return
+        try:
+            cursor.close()
+        except psycopg2.Error:
+            pass
+        pool.putconn(conn, discard=bool(conn.closed))
+
+
+def open_stream(procedure, *params, chunk_size=None, handle=None, typed=False):
+    record = CallRecord(procedure, params, kind='stream')
+    try:
+        return _open_stream(procedure, params, chunk_size, handle, record, typed)
+    finally:
+        record.finish()
+        get_metrics().record(record)
+
+
+def _open_stream(procedure, params, chunk_size, handle, record, typed=False):
+    cache = get_cache()
+    key = _cache_key(cache, procedure, params, 'stream', *(('typed',) if typed else ()))
+    cached = cache.get(key) if key is not None else None
+    if cached is not None:
+        # Served from memory: a stream that is already exhausted and holds no connection
+        description, rows = cached
+        stream = ResultStream(procedure, *params, typed=typed)
+        stream.description = description
+        stream.position = len(rows)
+        stream.exhausted = True
+        record.cached = True
+        record.rows = len(rows)
+        return stream, list(rows)
+
+    tables = read_tables(procedure)
+    generation = cache.generation(tables)
+    stream = ResultStream(procedure, *params, typed=typed)
+    rows = stream.fetch(chunk_size or STREAM_CONFIG['chunk_size'], handle=handle, record=record)
+    # Only results that fit in the first chunk are complete enough to cache
+    if key is not None and stream.exhausted:
+        cache.put(key, (stream.description, rows), tables, generation)
+    return stream, rows
@@ -0,0 +1,114 @@
+import os
+import time
+
+from psycopg2 import sql
+from app.utils.db_pool import get_pool
+from app.utils.db_utils import is_function
+from app.utils.metrics import CallRecord, get_metrics
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+# Seconds between progress reports, so huge exports do not flood the UI with updates
+PROGRESS_INTERVAL = 0.2
+
+
+class ExportReport:
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (f"{self.rows} rows ({self.bytes / 1024 / 1024:.1f} MiB) written to {self.path} "
+                f"in {self.elapsed:.2f}s ({self.rows_per_second:.0f} rows/s)")
+
+
+class _CountingWriter:
+    # Binary sink for copy_expert: counts bytes and lines as COPY streams them, nothing is buffered here.
+    # Lines only drive progress; a quoted value can hold newlines, so the row count comes from COPY itself.
+    def __init__(self, target, report, header, handle):
+        self.target = target
+        self.report = report
+        self.lines = -header
+        self.handle = handle
+        self.last_report = time.perf_counter()
+
+    def write(self, data):
+        self.target.write(data)
+        self.report.bytes += len(data)
+        self.lines += data.count(b"\n")
+        now = time.perf_counter()
+        if self.handle is not None and now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            self.handle.report(max(self.lines, 0))
+
+
+def _copy_statement(cur, procedure, params, fmt, header):
+    query = sql.SQL("SELECT * FROM {}({})").format(
+        sql.Identifier(procedure),
+        sql.SQL(", ").join(sql.Literal(param) for param in params)
+    )
+    if fmt == 'csv':
+        options = sql.SQL("FORMAT csv, HEADER {}").format(sql.SQL("true" if header else "false"))
+        return sql.SQL("COPY ({}) TO STDOUT WITH ({})").format(query, options).as_string(cur)
+
+    # One JSON object per line. CSV format with quote and delimiter characters that JSON always escapes
+    # writes the text untouched, where text format would double every backslash.
+    query = sql.SQL("SELECT row_to_json(r) FROM ({}) r").format(query)
+    return sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')").format(
+        query
+    ).as_string(cur)
+
+
+def export_result(procedure, *params, path, fmt='csv', header=True, handle=None):
+    if not is_function(procedure):
+        raise ValueError(f"Only display_ and search_ functions can be exported, not {procedure}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+
+    header = header and fmt == 'csv'
+    report = ExportReport(path)
+    record = CallRecord(procedure, params, kind='export')
+    start = time.perf_counter()
+
+    pool = get_pool()
+    conn = pool.getconn()
+    record.checkout = time.perf_counter() - start
+    created = False
+    try:
+        if handle is not None:
+            handle.attach(conn)
+        try:
+            with open(path, 'wb') as target, conn.cursor() as cur:
+                created = True
+                cur.copy_expert(_copy_statement(cur, procedure, params, fmt, header),
+                                _CountingWriter(target, report, header, handle))
+                report.rows = cur.rowcount
+        finally:
+            if handle is not None:
+                handle.detach()
+    except Exception as e:
+        record.fail(e)
+        pool.putconn(conn, discard=bool(conn.closed))
+        # Do not leave a truncated file behind that looks like a complete export
+        if created and os.path.exists(path):
+            os.remove(path)
+        if isinstance(e, OSError):
+            raise
+        raise RuntimeError(f"Database error: {e}")
+    finally:
+        record.finish()
+        record.execute = record.total - record.checkout
+        record.rows = report.rows
+        get_metrics().record(record)
+    pool.putconn(conn)
+
+    report.elapsed = time.perf_counter() - start
+    if handle is not None:
+        handle.report(report.rows)
+    return report
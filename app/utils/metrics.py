@@ -0,0 +1,202 @@
+import bisect
+import datetime
+import json
+import threading
+import time
+from collections import deque
+
+from app.config import METRICS_CONFIG
+
+# Histogram bucket upper bounds in milliseconds: 0.05 ms growing by ~19% per bucket up to about 14 minutes
+BUCKET_BOUNDS = [0.05 * 2 ** (i / 4) for i in range(97)]
+
+
+class CallRecord:
+    def __init__(self, procedure, params=(), kind='call'):
+        self.procedure = procedure
+        self.params = params
+        self.kind = kind
+        self.timestamp = time.time()
+        self.checkout = 0.0
+        self.execute = 0.0
+        self.fetch = 0.0
+        self.total = 0.0
+        self.rows = None
+        self.cached = False
+        self.error = None
+        self._start = time.perf_counter()
+
+    @property
+    def label(self):
+        # Stream opens and follow-up fetches are timed separately from plain calls of the same procedure
+        return self.procedure if self.kind == 'call' else f"{self.procedure} [{self.kind}]"
+
+    def finish(self):
+        self.total = time.perf_counter() - self._start
+
+    def fail(self, error):
+        # psycopg2 errors carry the SQLSTATE, which says more than the class name alone
+        code = getattr(error, 'pgcode', None)
+        self.error = f"{type(error).__name__} ({code})" if code else type(error).__name__
+
+    def as_dict(self):
+        return {
+            'time': datetime.datetime.fromtimestamp(self.timestamp).isoformat(timespec='milliseconds'),
+            'procedure': self.procedure,
+            'kind': self.kind,
+            'checkout_ms': round(self.checkout * 1000, 3),
+            'execute_ms': round(self.execute * 1000, 3),
+            'fetch_ms': round(self.fetch * 1000, 3),
+            'total_ms': round(self.total * 1000, 3),
+            'rows': self.rows,
+            'cached': self.cached,
+            'error': self.error,
+        }
+
+
+class RollingHistogram:
+    # Bucketed latencies split into time slices; slices older than the window drop out of the percentiles
+    def __init__(self, window=300, slices=10):
+        self.slice_length = window / slices
+        self.slices = deque(maxlen=slices)
+
+    def _current(self, now):
+        start = now - now % self.slice_length
+        if not self.slices or self.slices[-1][0] != start:
+            self.slices.append((start, [0] * (len(BUCKET_BOUNDS) + 1)))
+        return self.slices[-1][1]
+
+    def add(self, milliseconds, now=None):
+        counts = self._current(time.time() if now is None else now)
+        counts[bisect.bisect_left(BUCKET_BOUNDS, milliseconds)] += 1
+
+    def counts(self, now=None):
+        oldest = (time.time() if now is None else now) - self.slice_length * self.slices.maxlen
+        totals = [0] * (len(BUCKET_BOUNDS) + 1)
+        for start, counts in self.slices:
+            if start >= oldest:
+                totals = [total + count for total, count in zip(totals, counts)]
+        return totals
+
+    def percentile(self, fraction, counts=None):
+        counts = self.counts() if counts is None else counts
+        total = sum(counts)
+        if not total:
+            return None
+        # Reported as the upper bound of the bucket holding the requested rank
+        rank = fraction * total
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return BUCKET_BOUNDS[bucket] if bucket < len(BUCKET_BOUNDS) else float('inf')
+        return float('inf')
+
+
+class JsonLinesExporter:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record.as_dict())
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as log:
+                log.write(line + "\n")
+
+
+class Metrics:
+    def __init__(self, capacity=1000, window=300):
+        self.window = window
+        self._lock = threading.Lock()
+        self.records = deque(maxlen=capacity)
+        self.histograms = {}
+        self.totals = {}
+        self.exporters = []
+
+    def record(self, record):
+        with self._lock:
+            self.records.append(record)
+            totals = self.totals.setdefault(record.label, {'calls': 0, 'errors': 0, 'cached': 0, 'rows': 0})
+            totals['calls'] += 1
+            totals['rows'] += record.rows or 0
+            if record.error:
+                totals['errors'] += 1
+            if record.cached:
+                # Cache hits never reach the database and would drown its latencies
+                totals['cached'] += 1
+            else:
+                histogram = self.histograms.get(record.label)
+                if histogram is None:
+                    histogram = self.histograms[record.label] = RollingHistogram(self.window)
+                histogram.add(record.total * 1000)
+            exporters = list(self.exporters)
+
+        for exporter in exporters:
+            try:
+                exporter(record)
+            except Exception:
+                # Diagnostics must never break the call being measured
+                pass
+
+    def summary(self):
+        with self._lock:
+            rows = []
+            for label, totals in sorted(self.totals.items()):
+                histogram = self.histograms.get(label)
+                counts = histogram.counts() if histogram is not None else []
+                rows.append({
+                    'procedure': label,
+                    'calls': totals['calls'],
+                    'errors': totals['errors'],
+                    'cached': totals['cached'],
+                    'avg_rows': totals['rows'] / totals['calls'],
+                    'p50_ms': histogram.percentile(0.50, counts) if histogram is not None else None,
+                    'p95_ms': histogram.percentile(0.95, counts) if histogram is not None else None,
+                    'p99_ms': histogram.percentile(0.99, counts) if histogram is not None else None,
+                })
+            return rows
+
+    def slowest(self, count=20):
+        with self._lock:
+            records = list(self.records)
+        return sorted(records, key=lambda record: record.total, reverse=True)[:count]
+
+    def add_exporter(self, exporter):
+        with self._lock:
+            self.exporters.append(exporter)
+        return exporter
+
+    def remove_exporter(self, exporter):
+        with self._lock:
+            if exporter in self.exporters:
+                self.exporters.remove(exporter)
+
+    def export(self, path):
+        # Writes the calls still in the ring buffer, e.g. to attach to a bug report
+        with self._lock:
+            records = list(self.records)
+        with open(path, 'w', encoding='utf-8') as log:
+            for record in records:
+                log.write(json.dumps(record.as_dict()) + "\n")
+        return len(records)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.histograms.clear()
+            self.totals.clear()
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(METRICS_CONFIG['capacity'], METRICS_CONFIG['window'])
+            if METRICS_CONFIG['log_file']:
+                _metrics.add_exporter(JsonLinesExporter(METRICS_CONFIG['log_file']))
+        return _metrics
@@ -0,0 +1,200 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import CACHE_CONFIG
+
+
+ALL_TABLES = frozenset({'players', 'contracts', 'statistics', 'avg_performance', 'player_rankings', 'match_events',
+                        'season_statistics', 'performance_weights'})
+
+# Every other table references players with ON DELETE CASCADE
+_CASCADE = {'players': ALL_TABLES}
+
+# Tables each read function selects from; reads missing here depend on every table
+READ_DEPENDENCIES = {
+    'display_players_contents': {'players'},
+    'display_contracts_contents': {'players', 'contracts'},
+    'display_statistics_contents': {'players', 'statistics'},
+    'display_avg_performance_contents': {'players', 'avg_performance'},
+    # The salary filter looks players up in contracts
+    'display_players_page': {'players', 'contracts'},
+    'display_contracts_page': {'players', 'contracts'},
+    'display_statistics_page': {'players', 'contracts', 'statistics'},
+    'display_avg_performance_page': {'players', 'contracts', 'avg_performance'},
+    'display_players_by_ids': {'players', 'contracts'},
+    'display_contracts_by_ids': {'players', 'contracts'},
+    'display_statistics_by_ids': {'players', 'contracts', 'statistics'},
+    'display_avg_performance_by_ids': {'players', 'contracts', 'avg_performance'},
+    'search_by_last_name': {'players', 'statistics'},
+    'search_players': {'players', 'statistics'},
+    # A materialized view: it only changes when refresh_leaderboard runs
+    'display_leaderboard': {'player_rankings'},
+    # Written by refresh_leaderboard alone, which invalidates player_rankings
+    'display_leaderboard_status': {'player_rankings'},
+    'display_player_matches': {'match_events'},
+    'display_recent_form': {'players', 'match_events'},
+    'display_statistics_between': {'players', 'match_events'},
+    'display_season_statistics': {'players', 'season_statistics'},
+    'display_performance_weights': {'performance_weights'},
+    'display_scoring_inputs': {'players', 'statistics', 'avg_performance'},
+    'calculate_avg_performance': {'performance_weights'},
+    'display_expiring_contracts': {'players', 'contracts'},
+    'display_payroll_projection': {'contracts'},
+    'display_payroll_by_group': {'players', 'contracts'},
+    # A pure computation over its argument
+    'season_of': set(),
+}
+
+# Tables each write procedure modifies, triggers and cascades included; unknown writes invalidate everything
+WRITE_DEPENDENCIES = {
+    'add_player': {'players'},
+    # Changing position rescores the player
+    'update_player': {'players', 'avg_performance'},
+    'update_contract': {'contracts'},
+    'update_statistics': {'statistics', 'avg_performance'},
+    'update_statistics_batch': {'statistics', 'avg_performance'},
+    'record_match_events': {'match_events', 'season_statistics', 'statistics', 'avg_performance'},
+    'correct_match_event': {'match_events', 'season_statistics', 'statistics', 'avg_performance'},
+    'delete_by_id': ALL_TABLES,
+    'delete_by_ids': ALL_TABLES,
+    'delete_player': ALL_TABLES,
+    'clean_all_tables': ALL_TABLES,
+    'refresh_leaderboard': {'player_rankings'},
+    'save_performance_weights': {'performance_weights', 'avg_performance'},
+}
+
+
+def read_tables(procedure):
+    return frozenset(READ_DEPENDENCIES.get(procedure, ALL_TABLES))
+
+
+def cascaded_tables(table):
+    # The table and every table whose rows go with it when its rows are deleted
+    return frozenset(_CASCADE.get(table, {table}))
+
+
+def written_tables(procedure, params=()):
+    if procedure == 'clean_table' and params and params[0] in ALL_TABLES:
+        return cascaded_tables(params[0])
+    return frozenset(WRITE_DEPENDENCIES.get(procedure, ALL_TABLES))
+
+
+def estimate_size(value):
+    # Rough deep size of a result: the containers plus every row and value they hold
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+
+class _Entry:
+    __slots__ = ('value', 'tables', 'size', 'expires')
+
+    def __init__(self, value, tables, size, expires):
+        self.value = value
+        self.tables = tables
+        self.size = size
+        self.expires = expires
+
+
+class QueryCache:
+    def __init__(self, max_entries=256, max_bytes=16 * 1024 * 1024, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generations = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(procedure, params):
+        return procedure, tuple(params)
+
+    def generation(self, tables):
+        # Snapshot taken before a read hits the database; put() drops the result if a write happened since
+        with self._lock:
+            return tuple(self._generations.get(table, 0) for table in sorted(tables))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key, value, tables, generation=None):
+        if self.max_entries <= 0:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and \
+                    generation != tuple(self._generations.get(table, 0) for table in sorted(tables)):
+                return
+            if key in self._entries:
+                self._remove(key)
+            expires = time.monotonic() + self.ttl if self.ttl else None
+            self._entries[key] = _Entry(value, tables, size, expires)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tables=ALL_TABLES):
+        tables = frozenset(tables)
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [key for key, entry in self._entries.items() if entry.tables & tables]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryCache(**CACHE_CONFIG)
+        return _cache
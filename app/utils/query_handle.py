@@ -0,0 +1,37 @@
+import threading
+
+
+# Kept free of psycopg2 imports so workers can be created before the database layer is loaded
+class QueryHandle:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self.cancelled = False
+        # Set by whoever runs the call to receive progress reports from long operations
+        self.on_progress = None
+
+    def attach(self, conn):
+        with self._lock:
+            if self.cancelled:
+                from psycopg2 import extensions
+                raise extensions.QueryCanceledError("canceling statement due to user request")
+            self._conn = conn
+
+    def detach(self):
+        with self._lock:
+            self._conn = None
+
+    def report(self, progress):
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    def cancel(self):
+        # Holding the lock keeps the connection from going back to the pool while the cancel request is sent
+        with self._lock:
+            self.cancelled = True
+            if self._conn is not None and not self._conn.closed:
+                import psycopg2
+                try:
+                    self._conn.cancel()
+                except psycopg2.Error:
+                    pass
@@ -0,0 +1,71 @@
+from app.utils.columnar import fetch_columns, require_numpy
+from app.utils.db_utils import execute_procedure
+
+# Statistics the score weighs, in the column order of performance_weights
+COUNTERS = ['goals', 'assists', 'tackles', 'saves', 'yellow_cards', 'red_cards']
+
+# Position key of the weights used for every position without weights of its own
+ALL_POSITIONS = '*'
+
+
+def load_weights(version=None, handle=None):
+    # The version (the one in force when None) and its weights as {position: [weight per counter]}
+    rows = execute_procedure("display_performance_weights", version, handle=handle, typed=True)
+    if not rows:
+        raise RuntimeError(f"Database error: no performance weights with version {version}")
+    return rows[0][0], {row[1]: list(row[2:2 + len(COUNTERS)]) for row in rows}
+
+
+def load_squad(handle=None):
+    # Counters, position and current score of every player with statistics, one NumPy array per column
+    return fetch_columns("display_scoring_inputs", handle=handle)
+
+
+def save_weights(weights, handle=None):
+    # Saves the weights as a new version and rescores every player with it; returns the new version
+    if ALL_POSITIONS not in weights:
+        raise ValueError("The weights for all positions are required")
+    positions = list(weights)
+    columns = [[float(weights[position][i]) for position in positions] for i in range(len(COUNTERS))]
+    result = execute_procedure("save_performance_weights", positions, *columns, handle=handle)
+    return result[0][0]
+
+
+def evaluate(squad, weights):
+    # Scores of the whole squad under candidate weights: weighted_performance from init.sql, in floating point
+    np = require_numpy()
+    counters = np.nan_to_num(np.column_stack([squad[name] for name in COUNTERS]).astype(np.float64))
+    player_weights = np.empty_like(counters)
+    player_weights[:] = weights[ALL_POSITIONS]
+    for position, values in weights.items():
+        if position != ALL_POSITIONS:
+            player_weights[squad['main_position'] == position] = values
+
+    totals = 10 * (counters * player_weights).sum(axis=1)
+    play_time = squad['total_play_time'].astype(np.float64)
+    scores = np.divide(totals, play_time, out=np.zeros_like(totals), where=play_time > 0)
+    return np.round(scores, 5)
+
+
+def ranks(scores):
+    # 1 for the best score, ties share a rank and leave a gap after them, like rank() OVER (ORDER BY score DESC)
+    np = require_numpy()
+    descending = np.sort(-scores)
+    return np.searchsorted(descending, -scores, side='left') + 1
+
+
+def compare(squad, scores, limit=50):
+    # The best players under the candidate scores, next to their current score and rank
+    np = require_numpy()
+    current = np.nan_to_num(squad['avg_performance'].astype(np.float64))
+    current_ranks = ranks(current)
+    candidate_ranks = ranks(scores)
+
+    top = np.argpartition(-scores, limit - 1)[:limit] if limit < len(scores) else np.arange(len(scores))
+    top = top[np.lexsort((squad['player_id'][top], -scores[top]))]
+    return [
+        (int(squad['player_id'][i]), squad['first_name'][i], squad['last_name'][i], squad['main_position'][i],
+         float(current[i]), float(scores[i]), int(current_ranks[i]), int(candidate_ranks[i]),
+         int(current_ranks[i] - candidate_ranks[i]))
+        for i in top
+    ]
@@ -0,0 +1,13 @@
+from app.utils.db_utils import transaction
+
+
+def sign_player(first_name, last_name, date_of_birth, nationality, main_position, estimated_market_price,
+                sign_date, end_date, monthly_salary, retries=0, handle=None):
+    # The player, the contract and an empty statistics record are written on one connection and committed once:
+    # a failure at any step leaves nothing behind. retries re-runs a step that lost a lock race under a savepoint.
+    with transaction('sign_player', handle=handle) as tx:
+        player_id = tx.call('add_player', first_name, last_name, date_of_birth, nationality, main_position,
+                            estimated_market_price, retries=retries)[0][0]
+        tx.call('update_contract', player_id, sign_date, end_date, monthly_salary, retries=retries)
+        tx.call('update_statistics', player_id, 0, 0, 0, 0, 0, 0, 0, 0, retries=retries)
+    return player_id
@@ -0,0 +1,158 @@
+import datetime
+import re
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import errors, sql
+
+from app.config import ADMIN_DB_CONFIG, DB_CONFIG, SNAPSHOT_CONFIG
+from app.utils.db_pool import close_pool
+from app.utils.query_cache import get_cache
+
+# Snapshots are databases named <database>_snapshot_<name>, next to the database they were taken of
+SNAPSHOT_PREFIX = f"{DB_CONFIG['dbname']}_snapshot_"
+
+# Keeps the database name within PostgreSQL's 63 characters and free of quoting
+SNAPSHOT_NAME = re.compile(r'^[a-z0-9_]{1,30}$')
+
+_TERMINATE = "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = %s AND pid <> pg_backend_pid()"
+
+
+def snapshot_database(name):
+    if not SNAPSHOT_NAME.match(name or ''):
+        raise ValueError(f"Invalid snapshot name {name!r}: use up to 30 lowercase letters, digits and underscores")
+    return SNAPSHOT_PREFIX + name
+
+
+@contextmanager
+def _admin_cursor(handle=None):
+    # CREATE and DROP DATABASE cannot run inside a transaction block
+    try:
+        conn = psycopg2.connect(**ADMIN_DB_CONFIG)
+    except psycopg2.Error as e:
+        raise RuntimeError(f"Database error: {e}")
+    conn.autocommit = True
+    try:
+        if handle is not None:
+            handle.attach(conn)
+        with conn.cursor() as cur:
+            yield cur
+    except psycopg2.Error as e:
+        raise RuntimeError(f"Database error: {e}")
+    finally:
+        if handle is not None:
+            handle.detach()
+        conn.close()
+
+
+def _exists(cur, dbname):
+    cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (dbname,))
+    return cur.fetchone() is not None
+
+
+def _exclusive(cur, dbname, statement):
+    # Runs a statement that needs dbname to have no other sessions. The pool is closed first so the application
+    # does not reconnect on its own; anyone connecting in between is disconnected again and the statement retried.
+    close_pool()
+    attempts = SNAPSHOT_CONFIG['disconnect_attempts']
+    for attempt in range(attempts):
+        cur.execute(_TERMINATE, (dbname,))
+        try:
+            cur.execute(statement)
+            return
+        except errors.ObjectInUse:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(SNAPSHOT_CONFIG['retry_delay'])
+
+
+def _copy_database(cur, source, target):
+    # FILE_COPY copies the data files instead of WAL-logging every block, which is far faster for a seeded
+    # database; servers before PostgreSQL 15 always copy files
+    statement = sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(sql.Identifier(target), sql.Identifier(source))
+    if cur.connection.server_version >= 150000:
+        statement += sql.SQL(" STRATEGY FILE_COPY")
+    _exclusive(cur, source, statement)
+
+
+def _drop_database(cur, dbname):
+    _exclusive(cur, dbname, sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(dbname)))
+
+
+def _rename(dbname, new_name):
+    return sql.SQL("ALTER DATABASE {} RENAME TO {}").format(sql.Identifier(dbname), sql.Identifier(new_name))
+
+
+def list_snapshots(handle=None):
+    # (name, taken at, size in bytes) of every snapshot, oldest name first
+    with _admin_cursor(handle) as cur:
+        cur.execute(
+            "SELECT substr(d.datname, %s), shobj_description(d.oid, 'pg_database'), pg_database_size(d.oid) "
+            "FROM pg_database d WHERE left(d.datname, %s) = %s ORDER BY d.datname",
+            (len(SNAPSHOT_PREFIX) + 1, len(SNAPSHOT_PREFIX), SNAPSHOT_PREFIX)
+        )
+        return cur.fetchall()
+
+
+def create_snapshot(name, replace=False, handle=None):
+    # Copies the database as it is now; every open connection to it is closed for the duration of the copy
+    snapshot = snapshot_database(name)
+    with _admin_cursor(handle) as cur:
+        if _exists(cur, snapshot):
+            if not replace:
+                raise ValueError(f"Snapshot {name!r} already exists")
+            _drop_database(cur, snapshot)
+        _copy_database(cur, DB_CONFIG['dbname'], snapshot)
+        # Nobody works in a snapshot, so it stays as taken and can always serve as a template
+        cur.execute(sql.SQL("ALTER DATABASE {} WITH ALLOW_CONNECTIONS false").format(sql.Identifier(snapshot)))
+        cur.execute(sql.SQL("COMMENT ON DATABASE {} IS {}").format(
+            sql.Identifier(snapshot), sql.Literal(datetime.datetime.now().isoformat(timespec='seconds'))))
+
+
+def restore_snapshot(name, handle=None):
+    # Copies the snapshot under a scratch name and swaps it in by renaming, so the database is only dropped once
+    # its replacement is in place; a failed copy or rename leaves it as it was. The snapshot is kept.
+    snapshot = snapshot_database(name)
+    target = DB_CONFIG['dbname']
+    restoring, replaced = f"{target}_restoring", f"{target}_replaced"
+    with _admin_cursor(handle) as cur:
+        if not _exists(cur, snapshot):
+            raise ValueError(f"No snapshot named {name!r}")
+        # Either may be left over from a restore that was interrupted
+        _drop_database(cur, restoring)
+        _drop_database(cur, replaced)
+        _copy_database(cur, snapshot, restoring)
+        try:
+            # Database-level grants live in pg_database and are not copied with the template
+            cur.execute(sql.SQL("GRANT CONNECT ON DATABASE {} TO {}").format(
+                sql.Identifier(restoring), sql.Identifier(DB_CONFIG['user'])))
+            had_target = _exists(cur, target)
+            if had_target:
+                _exclusive(cur, target, _rename(target, replaced))
+            try:
+                cur.execute(_rename(restoring, target))
+            except psycopg2.Error:
+                if had_target:
+                    cur.execute(_rename(replaced, target))
+                raise
+        except psycopg2.Error:
+            _drop_database(cur, restoring)
+            raise
+        _drop_database(cur, replaced)
+    get_cache().invalidate()
+
+
+def delete_snapshot(name, handle=None):
+    snapshot = snapshot_database(name)
+    with _admin_cursor(handle) as cur:
+        if not _exists(cur, snapshot):
+            raise ValueError(f"No snapshot named {name!r}")
+        cur.execute(sql.SQL("DROP DATABASE {}").format(sql.Identifier(snapshot)))
+
+
+def drop_database(handle=None):
+    # Drops the application database; a snapshot can bring it back without re-running init.sql
+    with _admin_cursor(handle) as cur:
+        _drop_database(cur, DB_CONFIG['dbname'])
+    get_cache().invalidate()
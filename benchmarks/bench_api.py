@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import api
+from app.config import POOL_CONFIG
+from app.utils.db_utils import execute_procedure
+from app.utils.query_cache import get_cache
+from benchmarks.datagen import EVENT_PLAYERS
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def sequential(calls):
+    for procedure, *params in calls:
+        execute_procedure(procedure, *params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a nightly-style refresh one call at a time and through the "
+                                                 "batched and concurrent API")
+    parser.add_argument("--players", type=int, default=3000, help="players whose statistics are written")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=POOL_CONFIG['max_size'])
+    args = parser.parse_args()
+
+    # Measure the round trips, not the result cache
+    get_cache().max_entries = 0
+
+    # Zero deltas: every row is written, but the totals stay as they were
+    writes = [('update_statistics', player_id, 0, 0, 0, 0, 0, 0, 0, 0) for player_id in range(1, args.players + 1)]
+    reads = [('display_player_matches', player_id, 5) for player_id in range(1, EVENT_PLAYERS + 1)]
+
+    # Warm up the pool and the prepared statements
+    api.run_concurrently(reads[:args.workers], workers=args.workers)
+    execute_procedure(*writes[0])
+
+    results = [
+        (f"update_statistics x {len(writes)}", timed(sequential, writes),
+         timed(api.call_batch, 'update_statistics', [params for _, *params in writes], page_size=args.page_size)),
+        (f"display_player_matches x {len(reads)}", timed(sequential, reads),
+         timed(api.run_concurrently, reads, workers=args.workers)),
+    ]
+    api.close()
+
+    print(f"{'workload':<36}{'one by one (s)':>16}{'api (s)':>12}{'speedup':>10}")
+    for name, before, after in results:
+        print(f"{name:<36}{before:>16.2f}{after:>12.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
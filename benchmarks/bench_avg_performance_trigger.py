@@ -0,0 +1,125 @@
+import argparse
+import os
+import sys
+import time
+
+import psycopg2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import DB_CONFIG
+
+
+# The FOR EACH ROW trigger avg_performance was maintained with before the statement-level rework
+LEGACY_TRIGGER_FUNCTION = """
+CREATE FUNCTION pg_temp.legacy_update_avg_performance()
+RETURNS TRIGGER AS $$
+DECLARE
+    total_time INT;
+    goals_column INT;
+    assists_column INT;
+    tackles_column INT;
+    saves_column INT;
+    yellow_cards_column INT;
+    red_cards_column INT;
+    new_avg_performance DECIMAL(10, 5);
+BEGIN
+    SELECT s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards, s.red_cards
+    INTO total_time, goals_column, assists_column, tackles_column, saves_column, yellow_cards_column, red_cards_column
+    FROM statistics s
+    WHERE s.player_id = NEW.player_id;
+
+    IF total_time > 0 THEN
+        new_avg_performance :=
+            10 * ((goals_column::DECIMAL * 4) + (assists_column::DECIMAL * 3) + (tackles_column::DECIMAL * 2) + (saves_column::DECIMAL * 15) -
+                  (yellow_cards_column::DECIMAL * 1) - (red_cards_column::DECIMAL * 2)) / total_time::DECIMAL;
+    ELSE
+        new_avg_performance := 0;
+    END IF;
+
+    INSERT INTO avg_performance (player_id, avg_performance)
+    VALUES (NEW.player_id, new_avg_performance)
+    ON CONFLICT (player_id)
+    DO UPDATE SET avg_performance = EXCLUDED.avg_performance;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+VARIANT_TRIGGERS = {
+    'row': [
+        "CREATE TRIGGER trg_legacy AFTER INSERT OR UPDATE ON pg_temp.statistics "
+        "FOR EACH ROW EXECUTE FUNCTION pg_temp.legacy_update_avg_performance()",
+    ],
+    'statement': [
+        "CREATE TRIGGER trg_insert AFTER INSERT ON pg_temp.statistics REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION public.update_avg_performance()",
+        "CREATE TRIGGER trg_update AFTER UPDATE ON pg_temp.statistics REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION public.update_avg_performance()",
+    ],
+}
+
+SCENARIOS = [
+    ("insert", "INSERT INTO statistics (player_id, matches_played, total_play_time, goals, assists, tackles, saves, "
+               "yellow_cards, red_cards) SELECT g, 1, 90, g %% 3, g %% 2, g %% 5, 0, g %% 4 / 3, 0 "
+               "FROM generate_series(1, %(rows)s) g"),
+    ("update", "UPDATE statistics SET matches_played = matches_played + 1, total_play_time = total_play_time + 90, "
+               "goals = goals + player_id %% 2"),
+    ("upsert", "INSERT INTO statistics (player_id, matches_played, total_play_time, goals) "
+               "SELECT g, 1, 90, 1 FROM generate_series(1, %(rows)s) g "
+               "ON CONFLICT (player_id) DO UPDATE SET matches_played = statistics.matches_played + 1, "
+               "total_play_time = statistics.total_play_time + 90, goals = statistics.goals + 1"),
+]
+
+
+def run_variant(conn, variant, rows):
+    timings = {}
+    with conn.cursor() as cur:
+        # Temporary tables shadow the real ones for this session, so the production trigger function runs unchanged
+        cur.execute("DROP TABLE IF EXISTS pg_temp.statistics, pg_temp.avg_performance")
+        cur.execute("CREATE TEMP TABLE statistics (LIKE public.statistics INCLUDING ALL)")
+        cur.execute("CREATE TEMP TABLE avg_performance (LIKE public.avg_performance INCLUDING ALL)")
+        for statement in VARIANT_TRIGGERS[variant]:
+            cur.execute(statement)
+        conn.commit()
+
+        for name, statement in SCENARIOS:
+            start = time.perf_counter()
+            cur.execute(statement, {'rows': rows})
+            conn.commit()
+            timings[name] = time.perf_counter() - start
+
+        cur.execute("SELECT sum(avg_performance) FROM avg_performance")
+        checksum = cur.fetchone()[0]
+        cur.execute("DROP TABLE pg_temp.statistics, pg_temp.avg_performance")
+        conn.commit()
+    return timings, checksum
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-row and statement-level avg_performance triggers")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(LEGACY_TRIGGER_FUNCTION)
+        conn.commit()
+
+        results = {variant: run_variant(conn, variant, args.rows) for variant in ('row', 'statement')}
+    finally:
+        conn.close()
+
+    print(f"statistics maintenance over {args.rows} rows")
+    print(f"  {'scenario':<10}{'per-row':>12}{'per-statement':>16}{'speedup':>10}")
+    for name, _ in SCENARIOS:
+        before, after = results['row'][0][name], results['statement'][0][name]
+        print(f"  {name:<10}{before:>11.3f}s{after:>15.3f}s{before / after:>9.1f}x")
+
+    if results['row'][1] != results['statement'][1]:
+        print(f"  WARNING: avg_performance differs ({results['row'][1]} vs {results['statement'][1]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import DB_CONFIG
+from app.utils.db_pool import close_pool
+from app.utils.db_utils import execute_procedure
+from app.utils.query_cache import get_cache
+
+
+def legacy_execute_procedure(procedure, *params):
+    # The connect-per-call implementation execute_procedure used before the pool
+    conn = psycopg2.connect(**DB_CONFIG)
+    cur = conn.cursor()
+    if procedure.startswith("display_") or procedure.startswith("search_"):
+        cur.callproc(procedure, params)
+        result = cur.fetchall() if cur.description else None
+    else:
+        placeholders = ", ".join(["%s"] * len(params))
+        cur.execute(f"CALL {procedure}({placeholders});", params)
+        conn.commit()
+        result = None
+    cur.close()
+    conn.close()
+    return result
+
+
+def measure(func, procedure, params, calls, threads):
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(calls):
+            func(procedure, *params)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda _: func(procedure, *params), range(calls)))
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare execute_procedure throughput with and without the pool")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--procedure", default="search_by_last_name")
+    parser.add_argument("params", nargs="*", default=["__benchmark__"])
+    args = parser.parse_args()
+
+    # Measure the round trip, not the result cache
+    get_cache().max_entries = 0
+
+    # Warm up both paths so one-off costs (first connection, PREPARE) are not measured
+    legacy_execute_procedure(args.procedure, *args.params)
+    execute_procedure(args.procedure, *args.params)
+
+    before = measure(legacy_execute_procedure, args.procedure, args.params, args.calls, args.threads)
+    after = measure(execute_procedure, args.procedure, args.params, args.calls, args.threads)
+    close_pool()
+
+    print(f"{args.procedure} x {args.calls} calls, {args.threads} thread(s)")
+    print(f"  connect per call: {before:10.1f} calls/s")
+    print(f"  pooled:           {after:10.1f} calls/s")
+    print(f"  speedup:          {after / before:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
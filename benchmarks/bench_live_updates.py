@@ -0,0 +1,83 @@
+import argparse
+import os
+import queue
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.utils.change_listener import ChangeListener
+from app.utils.db_pool import close_pool
+from app.utils.db_utils import execute_procedure
+from app.utils.query_cache import get_cache
+
+
+def best_of(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def touch_statistics(player_id):
+    row = execute_procedure("display_statistics_by_ids", [player_id])[0]
+    execute_procedure("update_statistics", *row[:1], *row[3:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time change notifications, their coalescing and row patching "
+                                                 "against reloading the view")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--burst", type=int, default=500, help="single-row writes committed back to back")
+    parser.add_argument("--changed", type=int, default=20, help="rows patched at once")
+    args = parser.parse_args()
+
+    # Measure the database, not the result cache
+    get_cache().max_entries = 0
+
+    batches = queue.Queue()
+    listener = ChangeListener(lambda changes: batches.put((time.perf_counter(), changes)))
+    listener.start()
+    # The listener has to be listening before the first write
+    time.sleep(1)
+
+    page = execute_procedure("display_statistics_page", 1000)
+    player_ids = [row[0] for row in page]
+    try:
+        # Commit to callback: includes the coalesce window the listener waits for more changes in
+        latencies = []
+        for player_id in player_ids[:args.runs]:
+            start = time.perf_counter()
+            touch_statistics(player_id)
+            delivered, _ = batches.get(timeout=10)
+            latencies.append((delivered - start) * 1000)
+
+        # A burst of separate transactions reaches the view as a handful of batches
+        received = listener.batches
+        start = time.perf_counter()
+        for player_id in player_ids[:args.burst]:
+            touch_statistics(player_id)
+        written = time.perf_counter() - start
+        time.sleep(listener.coalesce + 1)
+        burst_batches = listener.batches - received
+
+        changed = player_ids[:args.changed]
+        patch = best_of(lambda: execute_procedure("display_statistics_by_ids", changed, typed=True), args.runs)
+        reload = best_of(lambda: execute_procedure("display_statistics_page", 1000, typed=True), args.runs)
+    finally:
+        listener.stop()
+        close_pool()
+
+    results = [
+        (f"commit to callback (coalesce {listener.coalesce * 1000:.0f} ms):", f"{min(latencies):10.1f} ms"),
+        (f"burst of {args.burst} commits in {written:.2f} s:", f"{burst_batches:10d} batches"),
+        (f"patch {args.changed} changed rows:", f"{patch:10.1f} ms"),
+        ("reload the 1000-row page instead:", f"{reload:10.1f} ms"),
+    ]
+    for label, value in results:
+        print(f"  {label:<42}{value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import psycopg2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import DB_CONFIG
+from app.utils.db_pool import close_pool
+from app.utils.db_utils import execute_procedure
+from app.utils.query_cache import get_cache
+
+# What a projection costs without the running sum: every generated month joined to every contract it overlaps
+NAIVE_PROJECTION = """
+SELECT m.month::DATE, count(c.player_id), coalesce(sum(c.monthly_salary), 0)
+FROM generate_series(date_trunc('month', %(from)s::DATE), date_trunc('month', %(to)s::DATE),
+                     INTERVAL '1 month') m(month)
+LEFT JOIN contracts c
+    ON daterange(c.sign_date, c.end_date, '[]') * daterange(%(from)s, %(to)s, '[]')
+       && daterange(m.month::DATE, (m.month + INTERVAL '1 month')::DATE)
+GROUP BY m.month
+ORDER BY m.month
+"""
+
+
+def best_of(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the contract expiry and payroll functions at several horizons")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--from-date", default=datetime.date.today().isoformat())
+    parser.add_argument("--horizons", default="90,365,1095,1825", help="Comma-separated horizons in days")
+    parser.add_argument("--skip-naive", action="store_true", help="Leave out the month-by-contract join")
+    args = parser.parse_args()
+
+    # Measure the database, not the result cache
+    get_cache().max_entries = 0
+
+    start = datetime.date.fromisoformat(args.from_date)
+    conn = None if args.skip_naive else psycopg2.connect(**DB_CONFIG)
+
+    print(f"{'horizon (days)':>15}{'expiring (ms)':>15}{'projection (ms)':>17}{'by position (ms)':>18}"
+          f"{'naive projection (ms)':>23}")
+    for days in (int(value) for value in args.horizons.split(",")):
+        end = start + datetime.timedelta(days=days)
+        expiring = best_of(lambda: execute_procedure("display_expiring_contracts", days, start), args.runs)
+        projection = best_of(lambda: execute_procedure("display_payroll_projection", start, end), args.runs)
+        by_group = best_of(lambda: execute_procedure("display_payroll_by_group", 'position', start, end), args.runs)
+        naive = "-"
+        if conn is not None:
+            def run_naive():
+                with conn.cursor() as cur:
+                    cur.execute(NAIVE_PROJECTION, {'from': start, 'to': end})
+                    cur.fetchall()
+            naive = f"{best_of(run_naive, 1):.1f}"
+        print(f"{days:>15}{expiring:>15.1f}{projection:>17.1f}{by_group:>18.1f}{naive:>23}")
+
+    if conn is not None:
+        conn.close()
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
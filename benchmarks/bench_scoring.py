@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.utils.db_pool import close_pool
+from app.utils.db_utils import execute_procedure
+from app.utils.query_cache import get_cache
+from app.utils.scoring import ALL_POSITIONS, compare, evaluate, load_squad, load_weights
+
+
+def best_of(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the set-based rescore and the client-side what-if scoring")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Measure the database, not the result cache
+    get_cache().max_entries = 0
+
+    version, weights = load_weights()
+    squad = load_squad()
+    # A candidate that gives strikers weights of their own, as a scout would try
+    candidate = dict(weights, ST=[8, 3, 1, 0, -1, -2])
+
+    load = best_of(load_squad, args.runs)
+    what_if = best_of(lambda: compare(squad, evaluate(squad, candidate)), args.runs)
+    # Every row already holds its score, so this is the cost of the scan and the comparison alone
+    recompute = best_of(lambda: execute_procedure("refresh_avg_performance"), args.runs)
+    close_pool()
+
+    positions = ", ".join(sorted(position for position in weights if position != ALL_POSITIONS)) or "none"
+    print(f"weights version {version} (position overrides: {positions}), {len(squad['player_id']):,} players")
+    print(f"  load squad (once per session):      {load:10.1f} ms")
+    print(f"  what-if score and rank (per edit):  {what_if:10.1f} ms")
+    print(f"  set-based recompute on the server:  {recompute:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
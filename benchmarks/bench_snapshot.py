@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.utils.db_pool import close_pool
+from app.utils.db_utils import execute_procedure
+from app.utils.snapshots import create_snapshot, delete_snapshot, restore_snapshot
+
+# The four statements clean_all_tables issued before it became one TRUNCATE
+LEGACY_CLEAN = ['players', 'avg_performance', 'contracts', 'statistics']
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def legacy_clean():
+    for table in LEGACY_CLEAN:
+        execute_procedure("clean_table", table)
+    execute_procedure("refresh_leaderboard")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time snapshot and restore against emptying the tables. The "
+                                                 "database is left as it was found.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--name", default="benchmark", help="scratch snapshot, replaced and deleted afterwards")
+    args = parser.parse_args()
+
+    snapshot = min(timed(lambda: create_snapshot(args.name, replace=True)) for _ in range(args.runs))
+    restore = []
+    single = []
+    legacy = []
+    try:
+        for _ in range(args.runs):
+            restore.append(timed(lambda: restore_snapshot(args.name)))
+            single.append(timed(lambda: execute_procedure("clean_all_tables")))
+            restore.append(timed(lambda: restore_snapshot(args.name)))
+            legacy.append(timed(legacy_clean))
+    finally:
+        restore_snapshot(args.name)
+        delete_snapshot(args.name)
+        close_pool()
+
+    print(f"  take snapshot:                        {snapshot:10.1f} ms")
+    print(f"  restore snapshot:                     {min(restore):10.1f} ms")
+    print(f"  clean_all_tables, one TRUNCATE:       {min(single):10.1f} ms")
+    print(f"  clean_all_tables, four TRUNCATEs:     {min(legacy):10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
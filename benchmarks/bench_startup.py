@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The first page the Utilities tab asks for when it opens the players view
+FIRST_QUERY = ("display_players_page", 100)
+
+
+def measure_once():
+    # Runs in a fresh interpreter, so module imports are paid for exactly as on a real start
+    started = float(os.environ['BENCH_STARTUP_T0'])
+    eager = os.environ.get('BENCH_STARTUP_EAGER') == '1'
+
+    sys.path.append(ROOT)
+    from PyQt5.QtCore import QThreadPool
+    from PyQt5.QtWidgets import QApplication
+    from app.ui.main_window import TABS, DatabaseApp
+    from app.ui.workers import run_procedure
+
+    app = QApplication(sys.argv)
+    window = DatabaseApp()
+    if eager:
+        # What startup cost before tabs were built on first activation
+        for index in range(len(TABS)):
+            window.build_tab(index)
+    window.show()
+    # Checked before any queued event runs, the pool pre-warm included
+    result = {'psycopg2_at_show': 'psycopg2' in sys.modules}
+    app.processEvents()
+    result['window_shown_ms'] = (time.time() - started) * 1000
+
+    def on_result(_):
+        result['first_query_ms'] = (time.time() - started) * 1000
+        app.quit()
+
+    def on_error(error):
+        result['error'] = error
+        app.quit()
+
+    run_procedure(*FIRST_QUERY, on_result=on_result, on_error=on_error)
+    app.exec_()
+    # The pool pre-warm may still be connecting; exiting under a running worker aborts the process
+    QThreadPool.globalInstance().waitForDone()
+    print(json.dumps(result))
+
+
+def spawn(eager):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', BENCH_STARTUP_EAGER='1' if eager else '0')
+    env['BENCH_STARTUP_T0'] = repr(time.time())
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to window shown and to the first query result")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true", help="also measure with every tab built up front")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_once()
+        return
+
+    modes = [('lazy', False)] + ([('eager', True)] if args.eager else [])
+    print(f"{'mode':<8}{'window shown (ms)':>20}{'first query (ms)':>20}  psycopg2 at show")
+    for name, eager in modes:
+        # One discarded run so the OS file cache is warm for every measured one
+        spawn(eager)
+        runs = [spawn(eager) for _ in range(args.runs)]
+        errors = [run['error'] for run in runs if 'error' in run]
+        if errors:
+            print(f"{name:<8}error: {errors[0]}")
+            continue
+        shown = statistics.median(run['window_shown_ms'] for run in runs)
+        first_query = statistics.median(run['first_query_ms'] for run in runs)
+        loaded = "yes" if any(run['psycopg2_at_show'] for run in runs) else "no"
+        print(f"{name:<8}{shown:>20.1f}{first_query:>20.1f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.utils.db_pool import close_pool
+from app.utils.db_utils import execute_procedure
+from app.utils.signing import sign_player
+
+PLAYER = ('Bench', '__benchmark__', '2000-01-01', 'Spain', 'CM', 1000000)
+CONTRACT = ('2024-07-01', '2027-06-30', 50000)
+
+
+def separate_calls():
+    # What signing cost before: three calls, three commits, and no way to undo the first two
+    player_id = execute_procedure('add_player', *PLAYER)[0][0]
+    execute_procedure('update_contract', player_id, *CONTRACT)
+    execute_procedure('update_statistics', player_id, 0, 0, 0, 0, 0, 0, 0, 0)
+    return player_id
+
+
+def one_transaction():
+    return sign_player(*PLAYER, *CONTRACT)
+
+
+def measure(func, count):
+    start = time.perf_counter()
+    player_ids = [func() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    execute_procedure('delete_by_ids', player_ids)
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare signing players with separate calls and in one "
+                                                 "transaction")
+    parser.add_argument("--signings", type=int, default=500)
+    args = parser.parse_args()
+
+    # Warm up the pool and the cached statements of both paths
+    measure(separate_calls, 5)
+    measure(one_transaction, 5)
+
+    before = measure(separate_calls, args.signings)
+    after = measure(one_transaction, args.signings)
+    close_pool()
+
+    print(f"sign player x {args.signings}")
+    print(f"  separate calls:  {before:10.1f} signings/s")
+    print(f"  one transaction: {after:10.1f} signings/s")
+    print(f"  speedup:         {after / before:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
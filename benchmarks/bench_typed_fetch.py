@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.utils.columnar import fetch_columns
+from app.utils.db_pool import close_pool
+from app.utils.db_utils import execute_procedure
+from app.utils.query_cache import get_cache
+
+PROCEDURES = ["display_statistics_contents", "display_avg_performance_contents"]
+
+
+def decimal_rows(procedure):
+    # What analysis cost before: Decimal cells, then a second pass to turn them into floats
+    rows = execute_procedure(procedure)
+    return [[float(value) if value is not None and not isinstance(value, str) else value for value in row]
+            for row in rows]
+
+
+def typed_rows(procedure):
+    return execute_procedure(procedure, typed=True)
+
+
+def columns(procedure):
+    return fetch_columns(procedure)
+
+
+def best_of(func, procedure, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(procedure)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Decimal, typed and columnar fetches of the analytics "
+                                                 "display functions")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Measure the fetch and decode, not the result cache
+    get_cache().max_entries = 0
+
+    print(f"{'function':<36}{'rows':>8}{'decimal + pass (ms)':>22}{'typed (ms)':>12}{'columnar (ms)':>15}")
+    for procedure in PROCEDURES:
+        rows = len(typed_rows(procedure))
+        before = best_of(decimal_rows, procedure, args.runs)
+        typed = best_of(typed_rows, procedure, args.runs)
+        columnar = best_of(columns, procedure, args.runs)
+        print(f"{procedure:<36}{rows:>8}{before:>22.1f}{typed:>12.1f}{columnar:>15.1f}")
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
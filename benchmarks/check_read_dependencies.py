@@ -0,0 +1,54 @@
+import os
+import re
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from app.utils.query_cache import ALL_TABLES, READ_DEPENDENCIES
+
+FUNCTION = re.compile(r'CREATE OR REPLACE FUNCTION (\w+)\s*\(.*?\bAS \$\$(.*?)\$\$;', re.S)
+TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)', re.I)
+
+
+def function_bodies(path):
+    bodies = {}
+    with open(path) as f:
+        for name, body in FUNCTION.findall(f.read()):
+            # Overloads share one entry in the cache's maps, so their bodies are checked together
+            bodies[name] = bodies.get(name, '') + body
+    return bodies
+
+
+def tables_read(name, bodies, seen=None):
+    # Tables named in the body, dynamic SQL included, and in every function of the file it calls
+    seen = set() if seen is None else seen
+    seen.add(name)
+    body = bodies[name]
+    tables = {table for table in TABLE_REFERENCE.findall(body) if table in ALL_TABLES}
+    for callee in bodies:
+        if callee not in seen and re.search(rf'\b{callee}\s*\(', body):
+            tables |= tables_read(callee, bodies, seen)
+    return tables
+
+
+def main():
+    # Fails when a read function selects from a table its READ_DEPENDENCIES entry leaves out, which would let
+    # writes to that table leave stale results in the cache
+    bodies = function_bodies(os.path.join(ROOT, 'init.sql'))
+    failures = 0
+    for procedure, listed in sorted(READ_DEPENDENCIES.items()):
+        if procedure not in bodies:
+            print(f"  {procedure}: not defined in init.sql")
+            failures += 1
+            continue
+        missing = tables_read(procedure, bodies) - listed
+        if missing:
+            print(f"  {procedure}: reads {', '.join(sorted(missing))} but does not list it")
+            failures += 1
+    checked = len(READ_DEPENDENCIES)
+    print(f"  {checked - failures} of {checked} read functions list every table they read")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+import psycopg2
+
+INIT_SQL = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'init.sql'))
+
+
+class ThrowawayCluster:
+    # A private Postgres cluster in a temporary directory, initialised with init.sql the way docker-compose does.
+    # Needs initdb and pg_ctl on PATH and, like any Postgres server, cannot run as root.
+    def __init__(self, port=5544, superuser='admin', dbname='football_management'):
+        self.port = port
+        self.superuser = superuser
+        self.dbname = dbname
+        self.directory = None
+
+    @property
+    def data_directory(self):
+        return os.path.join(self.directory, 'data')
+
+    def start(self):
+        for binary in ('initdb', 'pg_ctl'):
+            if shutil.which(binary) is None:
+                raise RuntimeError(f"{binary} was not found on PATH")
+
+        self.directory = tempfile.mkdtemp(prefix='fm_bench_')
+        try:
+            subprocess.run(['initdb', '-D', self.data_directory, '-U', self.superuser, '--auth=trust',
+                            '--encoding=UTF8', '--no-sync'], check=True, stdout=subprocess.DEVNULL)
+            subprocess.run(['pg_ctl', '-D', self.data_directory, '-l', os.path.join(self.directory, 'server.log'),
+                            '-o', f"-p {self.port} -k {self.directory} -c listen_addresses=localhost -c fsync=off",
+                            '-w', 'start'], check=True, stdout=subprocess.DEVNULL)
+            self._initialise()
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def _initialise(self):
+        conn = psycopg2.connect(dbname='postgres', user=self.superuser, host='localhost', port=self.port)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE DATABASE {self.dbname}")
+        conn.close()
+
+        with open(INIT_SQL, encoding='utf-8') as source:
+            script = source.read()
+        conn = psycopg2.connect(dbname=self.dbname, user=self.superuser, host='localhost', port=self.port)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(script)
+        conn.close()
+
+    def stop(self):
+        if self.directory is None:
+            return
+        if os.path.exists(os.path.join(self.data_directory, 'postmaster.pid')):
+            subprocess.run(['pg_ctl', '-D', self.data_directory, '-m', 'fast', '-w', 'stop'],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,209 @@
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+import psycopg2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import DB_CONFIG
+
+
+SCALES = {
+    '1k': 1000,
+    '100k': 100000,
+    '1m': 1000000,
+}
+
+FIRST_NAMES = ["James", "Lucas", "Mateo", "Luka", "Ivan", "Marco", "Pedro", "Diego", "Karim", "Kylian", "Erling",
+               "Harry", "Jude", "Bukayo", "Phil", "Kevin", "Bruno", "Joao", "Rafael", "Sergio", "Thiago", "Toni",
+               "Manuel", "Marc", "Jan", "Virgil", "Ruben", "Antonio", "Federico", "Nicolo", "Alessandro", "Pablo",
+               "Alvaro", "Dani", "Mohamed", "Sadio", "Achraf", "Son", "Takumi", "Aleksandr"]
+
+# Last names are built from two syllables, which gives a few thousand distinct names with shared prefixes
+LAST_NAME_STARTS = ["Ka", "Ro", "Mi", "Sil", "Fer", "Gon", "Mar", "San", "Her", "Smi", "Mu", "Kov", "Pet", "Bel",
+                    "Dia", "Lor", "Van", "Ber", "Cas", "Tor", "Ne", "Ol", "Zu", "Ha", "Jo", "Le", "Wa", "Bra",
+                    "Cha", "Dor"]
+LAST_NAME_ENDS = ["va", "ez", "rov", "ller", "son", "lini", "tti", "dic", "ski", "ovic", "nez", "ira", "ton",
+                  "ard", "ens", "mann", "rin", "sen", "ero", "akis", "ley", "doza", "aldo", "etti", "ov", "ins",
+                  "ec", "bauer", "anu", "ell"]
+
+NATIONALITIES = ["Spain", "England", "France", "Germany", "Italy", "Brazil", "Argentina", "Portugal",
+                 "Netherlands", "Belgium", "Croatia", "Serbia", "Russia", "Norway", "Morocco", "Senegal", "Japan",
+                 "Korea", "USA", "Mexico"]
+
+POSITIONS = ["GK", "CB", "LB", "RB", "CDM", "CM", "CAM", "LW", "RW", "ST"]
+
+# Share of players that have a contract and a statistics record
+CONTRACT_SHARE = 0.9
+STATISTICS_SHARE = 0.8
+
+# Match history: the first EVENT_PLAYERS players play a weekly league over fixed seasons
+EVENT_PLAYERS = 500
+EVENT_SEASONS = range(2015, 2025)
+MATCHES_PER_SEASON = 38
+APPEARANCE_SHARE = 0.7
+
+
+def player_count(scale):
+    return SCALES[scale] if scale in SCALES else int(scale)
+
+
+def _rng(seed, table):
+    # One generator per table, so each table is reproducible on its own
+    return random.Random(f"{seed}:{table}")
+
+
+def generate_players(count, seed=42):
+    rng = _rng(seed, 'players')
+    for player_id in range(1, count + 1):
+        yield (
+            player_id,
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAME_STARTS) + rng.choice(LAST_NAME_ENDS),
+            datetime.date(1985, 1, 1) + datetime.timedelta(days=rng.randrange(22 * 365)),
+            rng.choice(NATIONALITIES),
+            rng.choice(POSITIONS),
+            round(10 ** rng.uniform(5, 8), -3),
+        )
+
+
+def generate_contracts(count, seed=42):
+    rng = _rng(seed, 'contracts')
+    for player_id in range(1, count + 1):
+        if rng.random() >= CONTRACT_SHARE:
+            continue
+        sign_date = datetime.date(2018, 1, 1) + datetime.timedelta(days=rng.randrange(7 * 365))
+        yield (
+            player_id,
+            sign_date,
+            sign_date + datetime.timedelta(days=365 * rng.randint(1, 5)),
+            round(10 ** rng.uniform(3.5, 6), 2),
+        )
+
+
+def generate_statistics(count, seed=42):
+    rng = _rng(seed, 'statistics')
+    for player_id in range(1, count + 1):
+        if rng.random() >= STATISTICS_SHARE:
+            continue
+        matches = rng.randint(0, 300)
+        yield (
+            player_id,
+            matches,
+            matches * rng.randint(20, 90),
+            rng.randint(0, matches // 2),
+            rng.randint(0, matches // 3),
+            rng.randint(0, matches * 2),
+            rng.randint(0, matches // 10),
+            rng.randint(0, matches // 5),
+            rng.randint(0, matches // 40),
+        )
+
+
+def match_dates():
+    for season in EVENT_SEASONS:
+        first = datetime.date(season, 8, 15)
+        for week in range(MATCHES_PER_SEASON):
+            yield first + datetime.timedelta(weeks=week)
+
+
+def generate_match_events(count, seed=42):
+    rng = _rng(seed, 'match_events')
+    for match_date in match_dates():
+        for player_id in range(1, min(count, EVENT_PLAYERS) + 1):
+            if rng.random() >= APPEARANCE_SHARE:
+                continue
+            yield (
+                player_id,
+                match_date,
+                rng.randint(1, 90),
+                int(rng.random() < 0.15),
+                int(rng.random() < 0.1),
+                rng.randint(0, 6),
+                rng.randint(0, 1),
+                int(rng.random() < 0.1),
+                int(rng.random() < 0.01),
+            )
+
+
+TABLES = [
+    ('players', ['player_id', 'first_name', 'last_name', 'date_of_birth', 'nationality', 'main_position',
+                 'estimated_market_price'], generate_players),
+    ('contracts', ['player_id', 'sign_date', 'end_date', 'monthly_salary'], generate_contracts),
+    ('statistics', ['player_id', 'matches_played', 'total_play_time', 'goals', 'assists', 'tackles', 'saves',
+                    'yellow_cards', 'red_cards'], generate_statistics),
+    # Loaded through the parent, so the rollup trigger adds the history onto statistics and season_statistics
+    ('match_events', ['player_id', 'match_date', 'play_time', 'goals', 'assists', 'tackles', 'saves',
+                      'yellow_cards', 'red_cards'], generate_match_events),
+]
+
+
+class _RowReader:
+    # File-like object that renders rows as COPY text lazily, so 1M rows never sit in memory at once
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = ""
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.buffer += "\t".join(str(value) for value in row) + "\n"
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+    readline = read
+
+
+def load(conn, count, seed=42):
+    timings = {}
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE players, contracts, statistics, avg_performance RESTART IDENTITY CASCADE")
+        cur.execute("CALL ensure_match_event_partitions(%s)", (list(match_dates()),))
+        for table, columns, generate in TABLES:
+            start = time.perf_counter()
+            cur.copy_from(_RowReader(generate(count, seed)), table, columns=columns, size=65536)
+            timings[table] = time.perf_counter() - start
+        cur.execute("SELECT setval(pg_get_serial_sequence('players', 'player_id'), %s)", (max(count, 1),))
+        cur.execute("REFRESH MATERIALIZED VIEW player_rankings")
+        cur.execute("ANALYZE players, contracts, statistics, avg_performance, player_rankings, match_events, "
+                    "season_statistics")
+    conn.commit()
+    return timings
+
+
+def loaded_count(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM players")
+        count = cur.fetchone()[0]
+    conn.rollback()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load deterministic synthetic players, contracts, statistics and match history")
+    parser.add_argument("--scale", default="1k", help=f"one of {', '.join(SCALES)} or a player count")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    count = player_count(args.scale)
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        timings = load(conn, count, args.seed)
+    finally:
+        conn.close()
+
+    print(f"loaded {count} players (seed {args.seed})")
+    for table, elapsed in timings.items():
+        print(f"  {table:<12}{elapsed:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import psycopg2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import DB_CONFIG
+from app.utils.db_pool import close_pool
+from benchmarks import datagen
+from benchmarks.cluster import ThrowawayCluster
+from benchmarks.scenarios import HEAVY_ITERATIONS, Context, all_scenarios
+
+
+def percentile(samples, fraction):
+    # Linear interpolation between the closest ranks
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    milliseconds = [sample * 1000 for sample in samples]
+    return {
+        'count': len(milliseconds),
+        'mean_ms': sum(milliseconds) / len(milliseconds),
+        'min_ms': min(milliseconds),
+        'p50_ms': percentile(milliseconds, 0.50),
+        'p95_ms': percentile(milliseconds, 0.95),
+        'p99_ms': percentile(milliseconds, 0.99),
+        'max_ms': max(milliseconds),
+    }
+
+
+def run_scenario(scenario, ctx, iterations, warmup):
+    rng = random.Random(f"{ctx.seed}:{scenario.name}")
+    if scenario.heavy:
+        iterations, warmup = min(iterations, HEAVY_ITERATIONS), min(warmup, 1)
+
+    if scenario.setup is not None:
+        scenario.setup(ctx)
+    samples = []
+    try:
+        for iteration in range(warmup + iterations):
+            start = time.perf_counter()
+            scenario.run(ctx, rng)
+            elapsed = time.perf_counter() - start
+            if scenario.cleanup is not None:
+                scenario.cleanup(ctx)
+            if iteration >= warmup:
+                samples.append(elapsed)
+    finally:
+        if scenario.teardown is not None:
+            scenario.teardown(ctx)
+    return summarize(samples)
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    # A scenario regresses when its median is slower by more than the tolerance and by an absolute margin,
+    # so sub-millisecond noise on fast scenarios is not reported
+    rows = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None or 'error' in current or 'error' in previous:
+            continue
+        change = current['p50_ms'] / previous['p50_ms'] - 1 if previous['p50_ms'] else 0.0
+        regressed = change > tolerance and current['p50_ms'] - previous['p50_ms'] > min_delta_ms
+        improved = change < -tolerance and previous['p50_ms'] - current['p50_ms'] > min_delta_ms
+        rows.append((name, previous['p50_ms'], current['p50_ms'], change,
+                     'REGRESSION' if regressed else 'improved' if improved else ''))
+    return rows
+
+
+def server_version(conn):
+    with conn.cursor() as cur:
+        cur.execute("SHOW server_version")
+        version = cur.fetchone()[0]
+    conn.rollback()
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark scenarios and report p50/p95/p99 latencies")
+    parser.add_argument("--scale", default="1k", help=f"one of {', '.join(datagen.SCALES)} or a player count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", action="append", default=[], help="run scenarios whose name contains this text")
+    parser.add_argument("--group", action="append", choices=['sql', 'client', 'ui'], help="run only these groups")
+    parser.add_argument("--reload", action="store_true", help="regenerate the data even if the scale matches")
+    parser.add_argument("--throwaway", action="store_true",
+                        help="start a temporary cluster instead of using the database in app.config")
+    parser.add_argument("--port", type=int, default=5544, help="port of the throwaway cluster")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved earlier with --output")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="relative p50 slowdown reported as regression")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    players = datagen.player_count(args.scale)
+    scenarios = [
+        scenario for scenario in all_scenarios()
+        if (not args.group or scenario.group in args.group)
+        and (not args.only or any(text in scenario.name for text in args.only))
+    ]
+
+    with contextlib.ExitStack() as stack:
+        if args.throwaway:
+            cluster = stack.enter_context(ThrowawayCluster(port=args.port))
+            DB_CONFIG.update(host='localhost', port=str(cluster.port))
+        stack.callback(close_pool)
+
+        conn = psycopg2.connect(**DB_CONFIG)
+        stack.callback(conn.close)
+        if args.reload or datagen.loaded_count(conn) != players:
+            print(f"loading {players} players...")
+            datagen.load(conn, players, args.seed)
+
+        results = {
+            'meta': {
+                'scale': args.scale,
+                'players': players,
+                'seed': args.seed,
+                'iterations': args.iterations,
+                'warmup': args.warmup,
+                'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+                'server_version': server_version(conn),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+            },
+            'scenarios': {},
+        }
+
+        ctx = Context(conn, players, args.seed)
+        for scenario in scenarios:
+            try:
+                summary = run_scenario(scenario, ctx, args.iterations, args.warmup)
+            except Exception as e:
+                conn.rollback()
+                summary = {'error': str(e).strip()}
+            results['scenarios'][scenario.name] = summary
+            if 'error' in summary:
+                print(f"{scenario.name:<42} ERROR {summary['error']}")
+            else:
+                print(f"{scenario.name:<42} p50 {summary['p50_ms']:9.2f} ms   p95 {summary['p95_ms']:9.2f} ms   "
+                      f"p99 {summary['p99_ms']:9.2f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as source:
+            baseline = json.load(source)
+        if baseline.get('meta', {}).get('players') != players:
+            print(f"WARNING: baseline was recorded with {baseline.get('meta', {}).get('players')} players")
+        rows = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        print(f"\n{'scenario':<42}{'baseline p50':>14}{'current p50':>14}{'change':>9}")
+        for name, before, after, change, status in rows:
+            print(f"{name:<42}{before:>11.2f} ms{after:>11.2f} ms{change:>+8.0%}  {status}")
+        if any(status == 'REGRESSION' for *_, status in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import os
+
+from benchmarks.datagen import EVENT_PLAYERS, EVENT_SEASONS, FIRST_NAMES, LAST_NAME_STARTS, LAST_NAME_ENDS, \
+    NATIONALITIES, POSITIONS
+from app.utils.db_pool import get_pool
+from app.utils.db_utils import ResultStream, execute_procedure
+from app.utils.query_cache import get_cache
+
+# Iterations for scenarios that read or rewrite whole tables
+HEAVY_ITERATIONS = 3
+
+SQUAD_SIZE = 25
+
+
+class Context:
+    def __init__(self, conn, players, seed):
+        # A dedicated connection outside the pool; SQL scenarios roll back after every iteration
+        self.conn = conn
+        self.players = players
+        self.seed = seed
+        self.state = {}
+
+    def player_id(self, rng):
+        return rng.randint(1, self.players)
+
+    def player_ids(self, rng, count):
+        return rng.sample(range(1, self.players + 1), min(count, self.players))
+
+    def event_player_ids(self, rng, count):
+        # Only the first EVENT_PLAYERS players have a match history
+        players = min(self.players, EVENT_PLAYERS)
+        return rng.sample(range(1, players + 1), min(count, players))
+
+
+class Scenario:
+    def __init__(self, name, run, group, setup=None, cleanup=None, teardown=None, heavy=False):
+        self.name = name
+        self.run = run
+        self.group = group
+        self.setup = setup
+        self.cleanup = cleanup
+        self.teardown = teardown
+        self.heavy = heavy
+
+
+def _last_name(rng):
+    return rng.choice(LAST_NAME_STARTS) + rng.choice(LAST_NAME_ENDS)
+
+
+def _misspelled(rng):
+    name = _last_name(rng).lower()
+    position = rng.randrange(len(name))
+    return name[:position] + name[position + 1:]
+
+
+def _player_fields(rng):
+    return (rng.choice(FIRST_NAMES), _last_name(rng), f"{rng.randint(1985, 2006)}-06-15",
+            rng.choice(NATIONALITIES), rng.choice(POSITIONS), rng.randint(100, 100000) * 1000)
+
+
+def _counters(rng):
+    matches = rng.randint(0, 1)
+    return [matches, matches * rng.randint(0, 90), rng.randint(0, 2), rng.randint(0, 2), rng.randint(0, 5),
+            rng.randint(0, 3), rng.randint(0, 1), 0]
+
+
+def _after_player(ctx, rng):
+    player_id = ctx.player_id(rng)
+    return str(player_id), player_id
+
+
+def _statistics_batch(ctx, rng):
+    ids = ctx.player_ids(rng, SQUAD_SIZE)
+    rows = [_counters(rng) for _ in ids]
+    return (ids,) + tuple(list(column) for column in zip(*rows))
+
+
+def _match_events(ctx, rng):
+    # A date inside the last generated season, so the partition already exists and no DDL is measured
+    player_ids = ctx.event_player_ids(rng, SQUAD_SIZE)
+    play_time = [rng.randint(0, 90) for _ in player_ids]
+    counters = [[rng.randint(0, 2) for _ in player_ids] for _ in range(6)]
+    return (f"{EVENT_SEASONS[-1]}-08-16", player_ids, play_time, *counters)
+
+
+def _month(rng):
+    season = rng.choice(EVENT_SEASONS)
+    month = rng.choice([9, 10, 11, 12])
+    return (f"{season}-{month:02d}-01", f"{season}-{month:02d}-28")
+
+
+# (name, statement, parameter factory, heavy). Parameters are drawn from a generator seeded per scenario,
+# so every run issues the same sequence of calls.
+SQL_SCENARIOS = [
+    ("display_players_contents", "SELECT * FROM display_players_contents()", None, True),
+    ("display_contracts_contents", "SELECT * FROM display_contracts_contents()", None, True),
+    ("display_statistics_contents", "SELECT * FROM display_statistics_contents()", None, True),
+    ("display_avg_performance_contents", "SELECT * FROM display_avg_performance_contents()", None, True),
+    ("display_players_page/first", "SELECT * FROM display_players_page(100)", None, False),
+    ("display_players_page/last_name_desc", "SELECT * FROM display_players_page(100, 'last_name', TRUE)", None,
+     False),
+    ("display_players_page/deep", "SELECT * FROM display_players_page(100, 'player_id', FALSE, %s, %s)",
+     _after_player, False),
+    ("display_players_page/filtered",
+     "SELECT * FROM display_players_page(100, 'estimated_market_price', TRUE, NULL, NULL, %s, %s)",
+     lambda ctx, rng: (rng.choice(NATIONALITIES), rng.choice(POSITIONS)), False),
+    ("display_contracts_page/salary_range",
+     "SELECT * FROM display_contracts_page(100, 'monthly_salary', TRUE, NULL, NULL, NULL, NULL, %s, %s)",
+     lambda ctx, rng: (10000, 50000), False),
+    ("display_statistics_page/goals", "SELECT * FROM display_statistics_page(100, 'goals', TRUE)", None, False),
+    ("display_avg_performance_page/first", "SELECT * FROM display_avg_performance_page(100)", None, False),
+    ("display_leaderboard/overall", "SELECT * FROM display_leaderboard('overall', 50)", None, False),
+    ("display_leaderboard/position", "SELECT * FROM display_leaderboard('position', 50, %s)",
+     lambda ctx, rng: (rng.choice(POSITIONS),), False),
+    ("display_leaderboard/every_nationality", "SELECT * FROM display_leaderboard('nationality', 10)", None, False),
+    ("refresh_leaderboard", "CALL refresh_leaderboard()", None, True),
+    ("search_by_last_name", "SELECT * FROM search_by_last_name(%s)", lambda ctx, rng: (_last_name(rng),), False),
+    ("search_players/prefix", "SELECT * FROM search_players(%s, 'prefix', 50)",
+     lambda ctx, rng: (_last_name(rng)[:3],), False),
+    ("search_players/exact", "SELECT * FROM search_players(%s, 'exact', 50)",
+     lambda ctx, rng: (rng.choice([_last_name(rng), rng.choice(FIRST_NAMES)]),), False),
+    ("search_players/fuzzy", "SELECT * FROM search_players(%s, 'fuzzy', 20)",
+     lambda ctx, rng: (_misspelled(rng),), False),
+    ("calculate_avg_performance", "SELECT calculate_avg_performance(%s, %s, %s, %s, %s, %s, %s)",
+     lambda ctx, rng: tuple(rng.randint(0, 5000) for _ in range(7)), False),
+    ("refresh_avg_performance/squad", "CALL refresh_avg_performance(%s)",
+     lambda ctx, rng: (ctx.player_ids(rng, SQUAD_SIZE),), False),
+    ("refresh_avg_performance/all", "CALL refresh_avg_performance()", None, True),
+    ("add_player", "CALL add_player(%s, %s, %s, %s, %s, %s)", lambda ctx, rng: _player_fields(rng), False),
+    ("update_player", "CALL update_player(%s, %s, %s, %s, %s, %s, %s)",
+     lambda ctx, rng: (ctx.player_id(rng),) + _player_fields(rng), False),
+    ("update_contract", "CALL update_contract(%s, %s, %s, %s)",
+     lambda ctx, rng: (ctx.player_id(rng), '2024-07-01', '2028-06-30', rng.randint(5000, 500000)), False),
+    ("update_statistics", "CALL update_statistics(%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+     lambda ctx, rng: tuple([ctx.player_id(rng)] + _counters(rng)), False),
+    ("update_statistics_batch/squad", "CALL update_statistics_batch(%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+     _statistics_batch, False),
+    ("display_player_matches/last5", "SELECT * FROM display_player_matches(%s, 5)",
+     lambda ctx, rng: (ctx.event_player_ids(rng, 1)[0],), False),
+    ("display_recent_form/squad", "SELECT * FROM display_recent_form(%s, 5)",
+     lambda ctx, rng: (ctx.event_player_ids(rng, SQUAD_SIZE),), False),
+    ("display_statistics_between/month", "SELECT * FROM display_statistics_between(%s, %s)",
+     lambda ctx, rng: _month(rng), False),
+    ("display_season_statistics", "SELECT * FROM display_season_statistics(%s)",
+     lambda ctx, rng: (rng.choice(EVENT_SEASONS),), False),
+    ("record_match_events/squad", "CALL record_match_events(%s, %s, %s, %s, %s, %s, %s, %s, %s)", _match_events,
+     False),
+    ("delete_by_id", "CALL delete_by_id(%s)", lambda ctx, rng: (ctx.player_id(rng),), False),
+    ("delete_by_ids/squad", "CALL delete_by_ids(%s)", lambda ctx, rng: (ctx.player_ids(rng, SQUAD_SIZE),), False),
+    ("delete_player", "CALL delete_player(%s)", lambda ctx, rng: (_last_name(rng),), False),
+    ("clean_table/contracts", "CALL clean_table('contracts')", None, True),
+    ("clean_all_tables", "CALL clean_all_tables()", None, True),
+]
+
+
+def _sql_scenario(name, statement, make_params, heavy):
+    def run(ctx, rng):
+        with ctx.conn.cursor() as cur:
+            cur.execute(statement, make_params(ctx, rng) if make_params else None)
+            if cur.description:
+                cur.fetchall()
+
+    return Scenario(name, run, 'sql', cleanup=lambda ctx: ctx.conn.rollback(), heavy=heavy)
+
+
+# Client-side overhead of the application's data access layer, against a raw cursor on a pooled connection
+PAGE_QUERY = ("display_players_page", 20, 'player_id', False, None, None, None, None, None, None)
+
+
+def _raw_cursor(ctx, rng):
+    with get_pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM display_players_page(%s, %s, %s, %s, %s, %s, %s, %s, %s)", PAGE_QUERY[1:])
+            cur.fetchall()
+
+
+def _execute_procedure_miss(ctx, rng):
+    get_cache().clear()
+    execute_procedure(*PAGE_QUERY)
+
+
+def _execute_procedure_hit(ctx, rng):
+    execute_procedure(*PAGE_QUERY)
+
+
+def _remember_player(ctx):
+    # update_player is called with the player's current values, so the data set is left as generated
+    with ctx.conn.cursor() as cur:
+        cur.execute("SELECT * FROM players WHERE player_id = 1")
+        ctx.state['player'] = cur.fetchone()
+    ctx.conn.rollback()
+
+
+def _execute_procedure_call(ctx, rng):
+    execute_procedure("update_player", *ctx.state['player'])
+
+
+CLIENT_SCENARIOS = [
+    Scenario("client/raw_cursor", _raw_cursor, 'client'),
+    Scenario("client/execute_procedure_miss", _execute_procedure_miss, 'client'),
+    Scenario("client/execute_procedure_hit", _execute_procedure_hit, 'client'),
+    Scenario("client/execute_procedure_call", _execute_procedure_call, 'client', setup=_remember_player),
+]
+
+
+# UtilitiesTab.show_results: model construction, view reset and one paint of the visible rows
+def _ui_setup(page_size):
+    def setup(ctx):
+        os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+        from PyQt5.QtWidgets import QApplication
+        from app.ui.tabs.utilities_tab import UtilitiesTab
+
+        ctx.state['app'] = QApplication.instance() or QApplication([])
+        tab = UtilitiesTab()
+        tab.resize(1280, 800)
+        tab.show()
+        ctx.state['tab'] = tab
+        with ctx.conn.cursor() as cur:
+            cur.execute("SELECT * FROM display_players_page(%s)", (page_size,))
+            ctx.state['rows'] = cur.fetchall()
+            ctx.state['description'] = cur.description
+        ctx.conn.rollback()
+
+    return setup
+
+
+def _ui_show_results(ctx, rng):
+    stream = ResultStream("display_players_page")
+    stream.description = ctx.state['description']
+    stream.exhausted = True
+    tab = ctx.state['tab']
+    tab.show_results((stream, list(ctx.state['rows'])), 'players')
+    tab.output_table.viewport().grab()
+    ctx.state['app'].processEvents()
+
+
+def _ui_teardown(ctx):
+    tab = ctx.state.pop('tab')
+    tab.set_model(None)
+    tab.close()
+    tab.deleteLater()
+    ctx.state['app'].processEvents()
+
+
+UI_SCENARIOS = [
+    Scenario(f"ui/show_results/{page_size}", _ui_show_results, 'ui', setup=_ui_setup(page_size),
+             teardown=_ui_teardown)
+    for page_size in (100, 1000, 10000)
+]
+
+
+def all_scenarios():
+    return [_sql_scenario(*scenario) for scenario in SQL_SCENARIOS] + CLIENT_SCENARIOS + UI_SCENARIOS
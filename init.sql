@@ -23,7 +23,9 @@ CREATE TABLE IF NOT EXISTS contracts (
 
 
 
--- Updated Statistics table, including performance metrics and normalization by total play time
+-- Updated Statistics table, including performance metrics and normalization by total play time.
+-- It is the authority on career totals: recorded match events add to it, but update_statistics,
+-- update_statistics_batch and bulk imports set it directly, so it need not equal the sum of match_events.
 CREATE TABLE IF NOT EXISTS statistics (
     player_id INT PRIMARY KEY REFERENCES players(player_id) ON DELETE CASCADE,
     matches_played INT DEFAULT 0,
@@ -41,6 +43,26 @@ CREATE TABLE IF NOT EXISTS avg_performance (
     avg_performance DECIMAL(10, 5) DEFAULT 0
 );
 
+-- Weights of the performance score. Every save adds a complete new version and the highest version is the one
+-- in force; main_position '*' holds the weights of every position without a row of its own.
+CREATE TABLE IF NOT EXISTS performance_weights (
+    version INT NOT NULL,
+    main_position VARCHAR(50) NOT NULL,
+    goals DECIMAL NOT NULL,
+    assists DECIMAL NOT NULL,
+    tackles DECIMAL NOT NULL,
+    saves DECIMAL NOT NULL,
+    yellow_cards DECIMAL NOT NULL,
+    red_cards DECIMAL NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (version, main_position)
+);
+
+-- Version 1 holds the weights the score has always used
+INSERT INTO performance_weights (version, main_position, goals, assists, tackles, saves, yellow_cards, red_cards)
+VALUES (1, '*', 4, 3, 2, 15, -1, -2)
+ON CONFLICT DO NOTHING;
+
 CREATE OR REPLACE PROCEDURE delete_by_id(p_player_id INT)
 AS $$
 BEGIN
@@ -48,6 +70,67 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Procedure to delete several players in one statement; contracts, statistics and ratings follow through
+-- ON DELETE CASCADE. p_deleted returns how many players were actually removed.
+CREATE OR REPLACE PROCEDURE delete_by_ids(p_player_ids INT[], INOUT p_deleted INT DEFAULT NULL)
+AS $$
+BEGIN
+    DELETE FROM players WHERE player_id = ANY(p_player_ids);
+    GET DIAGNOSTICS p_deleted = ROW_COUNT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Procedure to apply a whole matchday of statistics increments in one statement.
+-- The arrays are parallel (one element per player); repeated players are summed before the upsert.
+CREATE OR REPLACE PROCEDURE update_statistics_batch(
+    p_player_ids INT[],
+    p_matches_played INT[],
+    p_total_play_time INT[],
+    p_goals INT[],
+    p_assists INT[],
+    p_tackles INT[],
+    p_saves INT[],
+    p_yellow_cards INT[],
+    p_red_cards INT[]
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    player_count INT := coalesce(cardinality(p_player_ids), 0);
+BEGIN
+    IF player_count <> coalesce(cardinality(p_matches_played), 0)
+        OR player_count <> coalesce(cardinality(p_total_play_time), 0)
+        OR player_count <> coalesce(cardinality(p_goals), 0)
+        OR player_count <> coalesce(cardinality(p_assists), 0)
+        OR player_count <> coalesce(cardinality(p_tackles), 0)
+        OR player_count <> coalesce(cardinality(p_saves), 0)
+        OR player_count <> coalesce(cardinality(p_yellow_cards), 0)
+        OR player_count <> coalesce(cardinality(p_red_cards), 0) THEN
+        RAISE EXCEPTION 'All statistics arrays must have % elements', player_count;
+    END IF;
+
+    INSERT INTO statistics (
+        player_id, matches_played, total_play_time, goals, assists, tackles, saves, yellow_cards, red_cards
+    )
+    SELECT u.player_id, sum(coalesce(u.matches_played, 0)), sum(coalesce(u.total_play_time, 0)),
+           sum(coalesce(u.goals, 0)), sum(coalesce(u.assists, 0)), sum(coalesce(u.tackles, 0)),
+           sum(coalesce(u.saves, 0)), sum(coalesce(u.yellow_cards, 0)), sum(coalesce(u.red_cards, 0))
+    FROM unnest(p_player_ids, p_matches_played, p_total_play_time, p_goals, p_assists, p_tackles, p_saves,
+                p_yellow_cards, p_red_cards)
+         AS u(player_id, matches_played, total_play_time, goals, assists, tackles, saves, yellow_cards, red_cards)
+    GROUP BY u.player_id
+    ON CONFLICT (player_id) DO UPDATE
+    SET matches_played = statistics.matches_played + EXCLUDED.matches_played,
+        total_play_time = statistics.total_play_time + EXCLUDED.total_play_time,
+        goals = statistics.goals + EXCLUDED.goals,
+        assists = statistics.assists + EXCLUDED.assists,
+        tackles = statistics.tackles + EXCLUDED.tackles,
+        saves = statistics.saves + EXCLUDED.saves,
+        yellow_cards = statistics.yellow_cards + EXCLUDED.yellow_cards,
+        red_cards = statistics.red_cards + EXCLUDED.red_cards;
+END;
+$$;
+
 -- Procedure to update player statistics
 CREATE OR REPLACE PROCEDURE update_statistics(
     p_player_id INTEGER,
@@ -63,29 +146,11 @@ CREATE OR REPLACE PROCEDURE update_statistics(
 LANGUAGE plpgsql
 AS $$
 BEGIN
-    -- Check if a record exists for the given player_id
-    IF EXISTS (SELECT 1 FROM statistics WHERE player_id = p_player_id) THEN
-        -- Update current statistics by adding new data
-        UPDATE statistics
-        SET matches_played = matches_played + p_matches_played,
-            total_play_time = total_play_time + p_total_play_time,
-            goals = goals + p_goals,
-            assists = assists + p_assists,
-            tackles = tackles + p_tackles,
-            saves = saves + p_saves,
-            yellow_cards = yellow_cards + p_yellow_cards,
-            red_cards = red_cards + p_red_cards
-        WHERE player_id = p_player_id;
-    ELSE
-        -- Insert a new record if no data exists for the player
-        INSERT INTO statistics (
-            player_id, matches_played, total_play_time, goals, assists, tackles, saves, yellow_cards, red_cards
-        ) VALUES (
-            p_player_id, p_matches_played, p_total_play_time, p_goals, p_assists, p_tackles, p_saves, p_yellow_cards, p_red_cards
-        );
-    END IF;
-
-
+    -- A single-player batch: one upsert that adds onto the existing totals or inserts a new record
+    CALL update_statistics_batch(
+        ARRAY[p_player_id], ARRAY[p_matches_played], ARRAY[p_total_play_time], ARRAY[p_goals], ARRAY[p_assists],
+        ARRAY[p_tackles], ARRAY[p_saves], ARRAY[p_yellow_cards], ARRAY[p_red_cards]
+    );
 END;
 $$;
 
@@ -117,118 +182,1136 @@ BEGIN
 END;
 $$;
 
--- Function to update avg_performance in the avg_performance table
+-- Weights in force: every row of the latest version
+CREATE OR REPLACE FUNCTION current_performance_weights()
+RETURNS SETOF performance_weights
+LANGUAGE sql STABLE
+AS $$
+    SELECT * FROM performance_weights WHERE version = (SELECT max(version) FROM performance_weights);
+$$;
+
+-- Weights in force for one position: its own row in the latest version, else the '*' row
+CREATE OR REPLACE FUNCTION performance_weights_for(p_main_position VARCHAR)
+RETURNS performance_weights
+LANGUAGE sql STABLE
+AS $$
+    SELECT w FROM current_performance_weights() w
+    WHERE w.main_position IN ('*', p_main_position)
+    ORDER BY w.main_position = '*'
+    LIMIT 1;
+$$;
+
+-- Performance score of a statistics line under the given weights, shared by the avg_performance trigger and the
+-- set-based recompute
+CREATE OR REPLACE FUNCTION weighted_performance(
+    p_total_play_time INT,
+    p_goals INT,
+    p_assists INT,
+    p_tackles INT,
+    p_saves INT,
+    p_yellow_cards INT,
+    p_red_cards INT,
+    p_weights performance_weights
+)
+RETURNS DECIMAL
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT CASE
+        WHEN p_total_play_time > 0 THEN
+            (10 * (p_goals * p_weights.goals + p_assists * p_weights.assists + p_tackles * p_weights.tackles +
+                   p_saves * p_weights.saves + p_yellow_cards * p_weights.yellow_cards +
+                   p_red_cards * p_weights.red_cards) / p_total_play_time::DECIMAL)::DECIMAL(10, 5)
+        ELSE 0
+    END;
+$$;
+
+-- Performance score with the weights in force for a position (the '*' weights when NULL).
+-- A routine that gains a defaulted parameter has its old signature dropped first, here and below: CREATE OR
+-- REPLACE would add an overload instead, and calls leaving the new parameter out would be ambiguous.
+DROP FUNCTION IF EXISTS calculate_avg_performance(INT, INT, INT, INT, INT, INT, INT);
+CREATE OR REPLACE FUNCTION calculate_avg_performance(
+    p_total_play_time INT,
+    p_goals INT,
+    p_assists INT,
+    p_tackles INT,
+    p_saves INT,
+    p_yellow_cards INT,
+    p_red_cards INT,
+    p_main_position VARCHAR DEFAULT NULL
+)
+RETURNS DECIMAL
+LANGUAGE sql STABLE
+AS $$
+    SELECT weighted_performance(p_total_play_time, p_goals, p_assists, p_tackles, p_saves, p_yellow_cards,
+                                p_red_cards, performance_weights_for(p_main_position));
+$$;
+
+-- Recomputes avg_performance for the given players (all players when NULL) in one statement. Each player is
+-- scored with the weights of their position, or the '*' weights when the position has none of its own.
+CREATE OR REPLACE PROCEDURE refresh_avg_performance(p_player_ids INT[] DEFAULT NULL)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF p_player_ids IS NULL THEN
+        INSERT INTO avg_performance (player_id, avg_performance)
+        SELECT s.player_id,
+               weighted_performance(s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards,
+                                    s.red_cards, coalesce(pw, dw))
+        FROM statistics s
+        JOIN players p USING (player_id)
+        JOIN current_performance_weights() dw ON dw.main_position = '*'
+        LEFT JOIN current_performance_weights() pw ON pw.main_position = p.main_position
+        ON CONFLICT (player_id)
+        DO UPDATE SET avg_performance = EXCLUDED.avg_performance
+        WHERE avg_performance.avg_performance IS DISTINCT FROM EXCLUDED.avg_performance;
+    ELSE
+        -- Joining the unnested ids lets large id lists use a hash join instead of a per-row array scan
+        INSERT INTO avg_performance (player_id, avg_performance)
+        SELECT s.player_id,
+               weighted_performance(s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards,
+                                    s.red_cards, coalesce(pw, dw))
+        FROM statistics s
+        JOIN (SELECT DISTINCT unnest(p_player_ids) AS player_id) ids USING (player_id)
+        JOIN players p USING (player_id)
+        JOIN current_performance_weights() dw ON dw.main_position = '*'
+        LEFT JOIN current_performance_weights() pw ON pw.main_position = p.main_position
+        ON CONFLICT (player_id)
+        DO UPDATE SET avg_performance = EXCLUDED.avg_performance
+        WHERE avg_performance.avg_performance IS DISTINCT FROM EXCLUDED.avg_performance;
+    END IF;
+END;
+$$;
+
+-- Function to update avg_performance in the avg_performance table.
+-- Runs once per statement over the transition table, so a bulk update is a single set-based upsert.
 CREATE OR REPLACE FUNCTION update_avg_performance()
 RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO avg_performance (player_id, avg_performance)
+    SELECT n.player_id,
+           weighted_performance(n.total_play_time, n.goals, n.assists, n.tackles, n.saves, n.yellow_cards,
+                                n.red_cards, coalesce(pw, dw))
+    FROM new_rows n
+    JOIN players p USING (player_id)
+    JOIN current_performance_weights() dw ON dw.main_position = '*'
+    LEFT JOIN current_performance_weights() pw ON pw.main_position = p.main_position
+    ON CONFLICT (player_id)
+    DO UPDATE SET avg_performance = EXCLUDED.avg_performance
+    WHERE avg_performance.avg_performance IS DISTINCT FROM EXCLUDED.avg_performance;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+
+-- Triggers to update avg_performance after INSERT or UPDATE on statistics
+-- (a trigger with a transition table can only have one event, hence two of them)
+CREATE TRIGGER trg_update_avg_performance_insert
+AFTER INSERT ON statistics
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION update_avg_performance();
+
+CREATE TRIGGER trg_update_avg_performance_update
+AFTER UPDATE ON statistics
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION update_avg_performance();
+
+-- A player who changes position is rescored with the weights of the new position
+CREATE OR REPLACE FUNCTION rescore_moved_players()
+RETURNS TRIGGER AS $$
 DECLARE
-    total_time INT;
-    goals_column INT;
-    assists_column INT;
-    tackles_column INT;
-    saves_column INT;
-    yellow_cards_column INT;
-    red_cards_column INT;
-    new_avg_performance DECIMAL(10, 5);
+    -- EXCEPT compares the transition tables by hashing, where a join on them can plan as a nested loop
+    -- because they carry no statistics
+    moved_ids INT[] := ARRAY(
+        SELECT moved.player_id
+        FROM (
+            SELECT player_id, main_position FROM new_players
+            EXCEPT
+            SELECT player_id, main_position FROM old_players
+        ) moved
+    );
 BEGIN
+    IF cardinality(moved_ids) > 0 THEN
+        CALL refresh_avg_performance(moved_ids);
+    END IF;
 
-    SELECT s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards, s.red_cards
-    INTO total_time, goals_column, assists_column, tackles_column, saves_column, yellow_cards_column, red_cards_column
-    FROM statistics s
-    WHERE s.player_id = NEW.player_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
 
+CREATE TRIGGER trg_rescore_moved_players
+AFTER UPDATE ON players
+REFERENCING OLD TABLE AS old_players NEW TABLE AS new_players
+FOR EACH STATEMENT EXECUTE FUNCTION rescore_moved_players();
 
-    IF total_time > 0 THEN
-        new_avg_performance :=
-            10 * ((goals_column::DECIMAL * 4) + (assists_column::DECIMAL * 3) + (tackles_column::DECIMAL * 2) + (saves_column::DECIMAL * 15) -
-                  (yellow_cards_column::DECIMAL * 1) - (red_cards_column::DECIMAL * 2)) / total_time::DECIMAL;
-    ELSE
-        new_avg_performance := 0;
+-- Change notifications for live views: one NOTIFY per statement on channel table_changes, with the table, the
+-- operation and the IDs of the players whose rows changed. A statement that changes more rows than one
+-- notification can list sends no IDs, which tells listeners to reload. Notifications are delivered on commit,
+-- so rolled back changes are never announced.
+CREATE OR REPLACE FUNCTION notify_table_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    -- Keeps the payload well under the 8000 bytes a notification can carry
+    max_ids CONSTANT INT := 500;
+    changed_ids INT[];
+BEGIN
+    IF TG_OP <> 'TRUNCATE' THEN
+        -- player_id is the key of every notifying table, so each player appears at most once
+        changed_ids := ARRAY(SELECT c.player_id FROM changed_rows c LIMIT max_ids + 1);
+        IF cardinality(changed_ids) = 0 THEN
+            RETURN NULL;
+        END IF;
+        IF cardinality(changed_ids) > max_ids THEN
+            changed_ids := NULL;
+        END IF;
     END IF;
 
+    PERFORM pg_notify('table_changes',
+                      json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'ids', changed_ids)::TEXT);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
 
-    INSERT INTO avg_performance (player_id, avg_performance)
-    VALUES (NEW.player_id, new_avg_performance)
-    ON CONFLICT (player_id)
-    DO UPDATE SET avg_performance = EXCLUDED.avg_performance;
+-- One trigger per table and event, as a trigger with a transition table can only have one event
+DO $$
+DECLARE
+    table_name TEXT;
+BEGIN
+    FOREACH table_name IN ARRAY ARRAY['players', 'contracts', 'statistics', 'avg_performance'] LOOP
+        EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS changed_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change()',
+                       'trg_notify_' || table_name || '_insert', table_name);
+        EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING NEW TABLE AS changed_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change()',
+                       'trg_notify_' || table_name || '_update', table_name);
+        EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS changed_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change()',
+                       'trg_notify_' || table_name || '_delete', table_name);
+        EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %I '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change()',
+                       'trg_notify_' || table_name || '_truncate', table_name);
+    END LOOP;
+END;
+$$;
+
+-- Saves a complete set of weights as a new version and rescores every player with it. The arrays run in
+-- parallel, one entry per position, and must include '*'; p_version returns the new version.
+CREATE OR REPLACE PROCEDURE save_performance_weights(
+    p_positions VARCHAR[],
+    p_goals DECIMAL[],
+    p_assists DECIMAL[],
+    p_tackles DECIMAL[],
+    p_saves DECIMAL[],
+    p_yellow_cards DECIMAL[],
+    p_red_cards DECIMAL[],
+    INOUT p_version INT DEFAULT NULL
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    position_count INT := coalesce(cardinality(p_positions), 0);
+BEGIN
+    IF position_count <> coalesce(cardinality(p_goals), 0)
+        OR position_count <> coalesce(cardinality(p_assists), 0)
+        OR position_count <> coalesce(cardinality(p_tackles), 0)
+        OR position_count <> coalesce(cardinality(p_saves), 0)
+        OR position_count <> coalesce(cardinality(p_yellow_cards), 0)
+        OR position_count <> coalesce(cardinality(p_red_cards), 0) THEN
+        RAISE EXCEPTION 'All weight arrays must have % elements', position_count;
+    END IF;
+    IF NOT '*' = ANY(p_positions) THEN
+        RAISE EXCEPTION 'The weights for all positions (''*'') are required';
+    END IF;
+
+    -- Concurrent saves queue up here instead of colliding on the same version number
+    LOCK TABLE performance_weights IN EXCLUSIVE MODE;
+    SELECT coalesce(max(version), 0) + 1 INTO p_version FROM performance_weights;
+
+    INSERT INTO performance_weights (version, main_position, goals, assists, tackles, saves, yellow_cards, red_cards)
+    SELECT p_version, u.*
+    FROM unnest(p_positions, p_goals, p_assists, p_tackles, p_saves, p_yellow_cards, p_red_cards) AS u;
+
+    CALL refresh_avg_performance();
+END;
+$$;
+
+-- Weights of one version (the one in force when NULL), the '*' row first
+CREATE OR REPLACE FUNCTION display_performance_weights(p_version INT DEFAULT NULL)
+RETURNS TABLE(version INT, main_position VARCHAR, goals DECIMAL, assists DECIMAL, tackles DECIMAL, saves DECIMAL,
+              yellow_cards DECIMAL, red_cards DECIMAL, created_at TIMESTAMPTZ)
+LANGUAGE sql STABLE
+AS $$
+    SELECT w.version, w.main_position, w.goals, w.assists, w.tackles, w.saves, w.yellow_cards, w.red_cards,
+           w.created_at
+    FROM performance_weights w
+    WHERE w.version = coalesce(p_version, (SELECT max(version) FROM performance_weights))
+    ORDER BY w.main_position <> '*', w.main_position;
+$$;
+
+-- Everything the score is computed from, for every player with statistics, so candidate weights can be tried
+-- out client-side
+CREATE OR REPLACE FUNCTION display_scoring_inputs()
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, main_position VARCHAR, total_play_time INT,
+              goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT,
+              avg_performance DECIMAL)
+LANGUAGE sql STABLE
+AS $$
+    SELECT p.player_id, p.first_name, p.last_name, p.main_position, s.total_play_time, s.goals, s.assists,
+           s.tackles, s.saves, s.yellow_cards, s.red_cards, a.avg_performance
+    FROM statistics s
+    JOIN players p USING (player_id)
+    LEFT JOIN avg_performance a USING (player_id);
+$$;
+
+
+-- Season a match date belongs to, named by the year it starts in (seasons run from 1 July to 30 June)
+CREATE OR REPLACE FUNCTION season_of(p_date DATE)
+RETURNS INT
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT (extract(year FROM p_date) - CASE WHEN extract(month FROM p_date) < 7 THEN 1 ELSE 0 END)::INT;
+$$;
+
+-- Append-only per-match statistics: one row per player and match, range-partitioned by season.
+-- A correction never updates a row; it appends a reversal (appearances -1, negated counters) and a replacement,
+-- both pointing at the event they correct and at the appearance's first event (original_event_id, NULL on it).
+-- The history covers recorded matches only; statistics keeps the career totals.
+CREATE TABLE IF NOT EXISTS match_events (
+    event_id BIGSERIAL,
+    player_id INT NOT NULL REFERENCES players(player_id) ON DELETE CASCADE,
+    match_date DATE NOT NULL,
+    appearances INT NOT NULL DEFAULT 1,
+    play_time INT NOT NULL DEFAULT 0,
+    goals INT NOT NULL DEFAULT 0,
+    assists INT NOT NULL DEFAULT 0,
+    tackles INT NOT NULL DEFAULT 0,
+    saves INT NOT NULL DEFAULT 0,
+    yellow_cards INT NOT NULL DEFAULT 0,
+    red_cards INT NOT NULL DEFAULT 0,
+    corrects_event_id BIGINT,
+    original_event_id BIGINT,
+    recorded_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (event_id, match_date)
+) PARTITION BY RANGE (match_date);
+
+-- Last-N-matches walks (player_id, match_date) backwards and stops early; date ranges prune whole seasons and
+-- BRIN covers team-wide ranges inside a season, as events arrive roughly in date order
+CREATE INDEX IF NOT EXISTS idx_match_events_player_date ON match_events (player_id, match_date);
+CREATE INDEX IF NOT EXISTS idx_match_events_date ON match_events USING brin (match_date);
+CREATE INDEX IF NOT EXISTS idx_match_events_corrects ON match_events (corrects_event_id)
+    WHERE corrects_event_id IS NOT NULL;
+
+-- Per-season totals, maintained together with statistics as events arrive
+CREATE TABLE IF NOT EXISTS season_statistics (
+    player_id INT REFERENCES players(player_id) ON DELETE CASCADE,
+    season INT,
+    matches_played INT DEFAULT 0,
+    total_play_time INT DEFAULT 0,
+    goals INT DEFAULT 0,
+    assists INT DEFAULT 0,
+    tackles INT DEFAULT 0,
+    saves INT DEFAULT 0,
+    yellow_cards INT DEFAULT 0,
+    red_cards INT DEFAULT 0,
+    PRIMARY KEY (player_id, season)
+);
+
+CREATE INDEX IF NOT EXISTS idx_season_statistics_season_id ON season_statistics (season, player_id);
+
+-- Procedure to create the season partitions of match_events that the given dates fall into.
+-- It runs as its owner, so the application creates partitions without the right to create tables itself.
+CREATE OR REPLACE PROCEDURE ensure_match_event_partitions(p_dates DATE[])
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    season INT;
+BEGIN
+    FOR season IN SELECT DISTINCT season_of(d) FROM unnest(p_dates) AS d WHERE d IS NOT NULL LOOP
+        IF to_regclass(format('match_events_%s', season)) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I PARTITION OF match_events FOR VALUES FROM (%L) TO (%L)',
+                           format('match_events_%s', season), make_date(season, 7, 1), make_date(season + 1, 7, 1));
+            EXECUTE format('ALTER TABLE %I OWNER TO %s', format('match_events_%s', season),
+                           (SELECT relowner::REGROLE FROM pg_class WHERE oid = 'match_events'::REGCLASS));
+        END IF;
+    END LOOP;
+END;
+$$;
+
+CALL ensure_match_event_partitions(ARRAY[current_date]);
+
+-- Function to roll new events up into season_statistics and statistics.
+-- Runs once per statement over the transition table; the career totals go through update_statistics_batch,
+-- so avg_performance follows through its own trigger.
+CREATE OR REPLACE FUNCTION roll_up_match_events()
+RETURNS TRIGGER AS $$
+DECLARE
+    totals RECORD;
+BEGIN
+    INSERT INTO season_statistics (
+        player_id, season, matches_played, total_play_time, goals, assists, tackles, saves, yellow_cards, red_cards
+    )
+    SELECT e.player_id, season_of(e.match_date), sum(e.appearances), sum(e.play_time), sum(e.goals),
+           sum(e.assists), sum(e.tackles), sum(e.saves), sum(e.yellow_cards), sum(e.red_cards)
+    FROM new_events e
+    GROUP BY e.player_id, season_of(e.match_date)
+    ON CONFLICT (player_id, season) DO UPDATE
+    SET matches_played = season_statistics.matches_played + EXCLUDED.matches_played,
+        total_play_time = season_statistics.total_play_time + EXCLUDED.total_play_time,
+        goals = season_statistics.goals + EXCLUDED.goals,
+        assists = season_statistics.assists + EXCLUDED.assists,
+        tackles = season_statistics.tackles + EXCLUDED.tackles,
+        saves = season_statistics.saves + EXCLUDED.saves,
+        yellow_cards = season_statistics.yellow_cards + EXCLUDED.yellow_cards,
+        red_cards = season_statistics.red_cards + EXCLUDED.red_cards;
+
+    SELECT array_agg(t.player_id) AS player_ids, array_agg(t.appearances) AS appearances,
+           array_agg(t.play_time) AS play_time, array_agg(t.goals) AS goals, array_agg(t.assists) AS assists,
+           array_agg(t.tackles) AS tackles, array_agg(t.saves) AS saves, array_agg(t.yellow_cards) AS yellow_cards,
+           array_agg(t.red_cards) AS red_cards
+    INTO totals
+    FROM (
+        SELECT e.player_id, sum(e.appearances)::INT AS appearances, sum(e.play_time)::INT AS play_time,
+               sum(e.goals)::INT AS goals, sum(e.assists)::INT AS assists, sum(e.tackles)::INT AS tackles,
+               sum(e.saves)::INT AS saves, sum(e.yellow_cards)::INT AS yellow_cards,
+               sum(e.red_cards)::INT AS red_cards
+        FROM new_events e
+        GROUP BY e.player_id
+    ) t;
+
+    IF totals.player_ids IS NOT NULL THEN
+        CALL update_statistics_batch(totals.player_ids, totals.appearances, totals.play_time, totals.goals,
+                                     totals.assists, totals.tackles, totals.saves, totals.yellow_cards,
+                                     totals.red_cards);
+    END IF;
 
-    RETURN NEW;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
+CREATE TRIGGER trg_roll_up_match_events
+AFTER INSERT ON match_events
+REFERENCING NEW TABLE AS new_events
+FOR EACH STATEMENT EXECUTE FUNCTION roll_up_match_events();
 
+-- Procedure to record one match for several players in a single INSERT.
+-- The arrays are parallel, as in update_statistics_batch; every player counts one appearance.
+CREATE OR REPLACE PROCEDURE record_match_events(
+    p_match_date DATE,
+    p_player_ids INT[],
+    p_play_time INT[],
+    p_goals INT[],
+    p_assists INT[],
+    p_tackles INT[],
+    p_saves INT[],
+    p_yellow_cards INT[],
+    p_red_cards INT[]
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    player_count INT := coalesce(cardinality(p_player_ids), 0);
+BEGIN
+    IF player_count <> coalesce(cardinality(p_play_time), 0)
+        OR player_count <> coalesce(cardinality(p_goals), 0)
+        OR player_count <> coalesce(cardinality(p_assists), 0)
+        OR player_count <> coalesce(cardinality(p_tackles), 0)
+        OR player_count <> coalesce(cardinality(p_saves), 0)
+        OR player_count <> coalesce(cardinality(p_yellow_cards), 0)
+        OR player_count <> coalesce(cardinality(p_red_cards), 0) THEN
+        RAISE EXCEPTION 'All statistics arrays must have % elements', player_count;
+    END IF;
+    IF (SELECT count(DISTINCT id) FROM unnest(p_player_ids) AS id) <> player_count THEN
+        RAISE EXCEPTION 'A player can only be recorded once per match';
+    END IF;
 
--- Trigger to update avg_performance after INSERT or UPDATE on statistics
-CREATE TRIGGER trg_update_avg_performance
-AFTER INSERT OR UPDATE ON statistics
-FOR EACH ROW EXECUTE FUNCTION update_avg_performance();
+    CALL ensure_match_event_partitions(ARRAY[p_match_date]);
 
+    INSERT INTO match_events (
+        player_id, match_date, play_time, goals, assists, tackles, saves, yellow_cards, red_cards
+    )
+    SELECT u.player_id, p_match_date, coalesce(u.play_time, 0), coalesce(u.goals, 0), coalesce(u.assists, 0),
+           coalesce(u.tackles, 0), coalesce(u.saves, 0), coalesce(u.yellow_cards, 0), coalesce(u.red_cards, 0)
+    FROM unnest(p_player_ids, p_play_time, p_goals, p_assists, p_tackles, p_saves, p_yellow_cards, p_red_cards)
+         AS u(player_id, play_time, goals, assists, tackles, saves, yellow_cards, red_cards);
+END;
+$$;
+
+-- Procedure to correct a recorded event: appends its reversal and the corrected values in one INSERT,
+-- so the rollups move by the difference. Only the latest version of an event can be corrected.
+CREATE OR REPLACE PROCEDURE correct_match_event(
+    p_event_id BIGINT,
+    p_play_time INT,
+    p_goals INT,
+    p_assists INT,
+    p_tackles INT,
+    p_saves INT,
+    p_yellow_cards INT,
+    p_red_cards INT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    original match_events%ROWTYPE;
+BEGIN
+    -- The lock makes concurrent corrections of one event take turns, so the check below sees the earlier one
+    SELECT * INTO original FROM match_events WHERE event_id = p_event_id AND appearances > 0 FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Match event % does not exist', p_event_id;
+    END IF;
+    IF EXISTS (SELECT 1 FROM match_events WHERE corrects_event_id = p_event_id) THEN
+        RAISE EXCEPTION 'Match event % has already been corrected; correct its replacement instead', p_event_id;
+    END IF;
+
+    INSERT INTO match_events (
+        player_id, match_date, appearances, play_time, goals, assists, tackles, saves, yellow_cards, red_cards,
+        corrects_event_id, original_event_id
+    )
+    VALUES (original.player_id, original.match_date, -1, -original.play_time, -original.goals,
+            -original.assists, -original.tackles, -original.saves, -original.yellow_cards, -original.red_cards,
+            p_event_id, coalesce(original.original_event_id, p_event_id)),
+           (original.player_id, original.match_date, 1, p_play_time, p_goals, p_assists, p_tackles, p_saves,
+            p_yellow_cards, p_red_cards, p_event_id, coalesce(original.original_event_id, p_event_id));
+END;
+$$;
+
+-- Function to display a player's last p_matches matches, newest first, with corrections applied.
+-- Events are grouped by the appearance's first event, so a reversed event and its replacement collapse into one
+-- row while two matches on the same day stay apart.
+CREATE OR REPLACE FUNCTION display_player_matches(p_player_id INT, p_matches INT DEFAULT 5)
+RETURNS TABLE(match_date DATE, season INT, play_time INT, goals INT, assists INT, tackles INT, saves INT,
+              yellow_cards INT, red_cards INT, last_event_id BIGINT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT e.match_date, season_of(e.match_date), sum(e.play_time)::INT, sum(e.goals)::INT, sum(e.assists)::INT,
+           sum(e.tackles)::INT, sum(e.saves)::INT, sum(e.yellow_cards)::INT, sum(e.red_cards)::INT,
+           max(e.event_id)
+    FROM match_events e
+    WHERE e.player_id = p_player_id
+    GROUP BY e.match_date, coalesce(e.original_event_id, e.event_id)
+    HAVING sum(e.appearances) > 0
+    ORDER BY e.match_date DESC, coalesce(e.original_event_id, e.event_id) DESC
+    LIMIT p_matches;
+$$;
+
+-- Function to display each player's totals over their own last p_matches matches
+CREATE OR REPLACE FUNCTION display_recent_form(p_player_ids INT[], p_matches INT DEFAULT 5)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, matches_played INT, total_play_time INT,
+              goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT p.player_id, p.first_name, p.last_name, count(m.match_date)::INT, coalesce(sum(m.play_time), 0)::INT,
+           coalesce(sum(m.goals), 0)::INT, coalesce(sum(m.assists), 0)::INT, coalesce(sum(m.tackles), 0)::INT,
+           coalesce(sum(m.saves), 0)::INT, coalesce(sum(m.yellow_cards), 0)::INT, coalesce(sum(m.red_cards), 0)::INT
+    FROM players p
+    LEFT JOIN LATERAL display_player_matches(p.player_id, p_matches) m ON TRUE
+    WHERE p.player_id = ANY(p_player_ids)
+    GROUP BY p.player_id, p.first_name, p.last_name
+    ORDER BY p.player_id;
+$$;
+
+-- Function to display per-player totals for matches played between two dates (inclusive)
+CREATE OR REPLACE FUNCTION display_statistics_between(p_from DATE, p_to DATE)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, matches_played INT, total_play_time INT,
+              goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT p.player_id, p.first_name, p.last_name, t.matches_played, t.total_play_time, t.goals, t.assists,
+           t.tackles, t.saves, t.yellow_cards, t.red_cards
+    FROM (
+        SELECT e.player_id, sum(e.appearances)::INT AS matches_played, sum(e.play_time)::INT AS total_play_time,
+               sum(e.goals)::INT AS goals, sum(e.assists)::INT AS assists, sum(e.tackles)::INT AS tackles,
+               sum(e.saves)::INT AS saves, sum(e.yellow_cards)::INT AS yellow_cards,
+               sum(e.red_cards)::INT AS red_cards
+        FROM match_events e
+        WHERE e.match_date BETWEEN p_from AND p_to
+        GROUP BY e.player_id
+        HAVING sum(e.appearances) > 0
+    ) t
+    JOIN players p USING (player_id)
+    ORDER BY p.player_id;
+$$;
+
+-- Function to display the season totals kept in season_statistics (season 2024 is 2024/25)
+CREATE OR REPLACE FUNCTION display_season_statistics(p_season INT)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, matches_played INT, total_play_time INT,
+              goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT p.player_id, p.first_name, p.last_name, s.matches_played, s.total_play_time, s.goals, s.assists,
+           s.tackles, s.saves, s.yellow_cards, s.red_cards
+    FROM season_statistics s
+    JOIN players p USING (player_id)
+    WHERE s.season = p_season AND s.matches_played > 0
+    ORDER BY s.player_id;
+$$;
 
 -- Function to display the contents of the Players table
+-- (display functions are plain STABLE SQL so the planner inlines them and cursors over them stream rows)
 CREATE OR REPLACE FUNCTION display_players_contents()
 RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, date_of_birth DATE, nationality VARCHAR, main_position VARCHAR, estimated_market_price DECIMAL)
-LANGUAGE plpgsql
+LANGUAGE sql STABLE
 AS $$
-BEGIN
-    RETURN QUERY
     SELECT p.player_id, p.first_name, p.last_name, p.date_of_birth, p.nationality, p.main_position, p.estimated_market_price
     FROM players p;
-END;
 $$;
 
 CREATE OR REPLACE FUNCTION display_avg_performance_contents()
 RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, avg_performance DECIMAL)
-LANGUAGE plpgsql
+LANGUAGE sql STABLE
 AS $$
-BEGIN
-    RETURN QUERY
     SELECT p.player_id, p.first_name, p.last_name, a.avg_performance
     FROM avg_performance a
     JOIN players p USING (player_id)
     ORDER BY avg_performance DESC;
-END;
 $$;
 
 
 -- Function to display the contents of the Contracts table
 CREATE OR REPLACE FUNCTION display_contracts_contents()
 RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, sign_date DATE, end_date DATE, monthly_salary DECIMAL)
-LANGUAGE plpgsql
+LANGUAGE sql STABLE
 AS $$
-BEGIN
-    RETURN QUERY
     SELECT p.player_id, p.first_name, p.last_name, c.sign_date, c.end_date, c.monthly_salary
     FROM contracts c
     JOIN players p USING (player_id);
-END;
 $$;
 
 -- Function to display the contents of the Statistics table
 CREATE OR REPLACE FUNCTION display_statistics_contents()
 RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, matches_played INT, total_play_time INT, goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT)
-LANGUAGE plpgsql
+LANGUAGE sql STABLE
 AS $$
-BEGIN
-    RETURN QUERY
     SELECT p.player_id, p.first_name, p.last_name, s.matches_played, s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards, s.red_cards
     FROM statistics s
     JOIN players p USING (player_id);
+$$;
+
+-- Indexes backing the keyset-paginated display functions: (sort column, player_id) so each page is an index range scan
+CREATE INDEX IF NOT EXISTS idx_players_first_name_id ON players (first_name, player_id);
+CREATE INDEX IF NOT EXISTS idx_players_last_name_id ON players (last_name, player_id);
+CREATE INDEX IF NOT EXISTS idx_players_date_of_birth_id ON players (date_of_birth, player_id);
+CREATE INDEX IF NOT EXISTS idx_players_nationality_id ON players (nationality, player_id);
+CREATE INDEX IF NOT EXISTS idx_players_main_position_id ON players (main_position, player_id);
+CREATE INDEX IF NOT EXISTS idx_players_market_price_id ON players (estimated_market_price, player_id);
+CREATE INDEX IF NOT EXISTS idx_contracts_sign_date_id ON contracts (sign_date, player_id);
+-- The payroll functions only read contracts still running at the start of their window; carrying the dates and
+-- salary in the end_date index lets them skip years of finished contracts with an index-only range scan
+CREATE INDEX IF NOT EXISTS idx_contracts_end_date_id ON contracts (end_date, player_id)
+    INCLUDE (sign_date, monthly_salary);
+CREATE INDEX IF NOT EXISTS idx_contracts_monthly_salary_id ON contracts (monthly_salary, player_id);
+-- statistics is rewritten on every matchday, so only the most common sort keys are indexed there
+CREATE INDEX IF NOT EXISTS idx_statistics_goals_id ON statistics (goals, player_id);
+CREATE INDEX IF NOT EXISTS idx_statistics_assists_id ON statistics (assists, player_id);
+CREATE INDEX IF NOT EXISTS idx_statistics_matches_played_id ON statistics (matches_played, player_id);
+CREATE INDEX IF NOT EXISTS idx_avg_performance_value_id ON avg_performance (avg_performance, player_id);
+
+-- Builds one phase of a keyset-paginated query.
+-- Parameters of the returned query: $1 after value (text), $2 after player_id, $3 nationality, $4 position,
+-- $5 min salary, $6 max salary, $7 page size.
+-- The 'values' phase walks rows whose sort key is not NULL; the 'nulls' phase then walks the NULL keys by player_id.
+CREATE OR REPLACE FUNCTION keyset_page_query(
+    p_select TEXT,
+    p_sort_expr TEXT,
+    p_sort_type TEXT,
+    p_descending BOOLEAN,
+    p_salary_column TEXT,
+    p_phase TEXT
+)
+RETURNS TEXT
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+DECLARE
+    direction TEXT := CASE WHEN p_descending THEN 'DESC' ELSE 'ASC' END;
+    comparison TEXT := CASE WHEN p_descending THEN '<' ELSE '>' END;
+    salary_filter TEXT;
+BEGIN
+    IF p_salary_column IS NOT NULL THEN
+        salary_filter := format('($5::DECIMAL IS NULL OR %1$s >= $5) AND ($6::DECIMAL IS NULL OR %1$s <= $6)',
+                                p_salary_column);
+    ELSE
+        salary_filter := '(($5::DECIMAL IS NULL AND $6::DECIMAL IS NULL) OR EXISTS ('
+                         'SELECT 1 FROM contracts sc WHERE sc.player_id = p.player_id '
+                         'AND ($5::DECIMAL IS NULL OR sc.monthly_salary >= $5) '
+                         'AND ($6::DECIMAL IS NULL OR sc.monthly_salary <= $6)))';
+    END IF;
+
+    IF p_phase = 'values' THEN
+        RETURN format(
+            '%s WHERE ($3::VARCHAR IS NULL OR p.nationality = $3) AND ($4::VARCHAR IS NULL OR p.main_position = $4) '
+            'AND %s AND %s IS NOT NULL AND ($2::INT IS NULL OR (%s, p.player_id) %s ($1::%s, $2)) '
+            'ORDER BY %s %s, p.player_id %s LIMIT $7',
+            p_select, salary_filter, p_sort_expr, p_sort_expr, comparison, p_sort_type,
+            p_sort_expr, direction, direction
+        );
+    END IF;
+
+    RETURN format(
+        '%s WHERE ($3::VARCHAR IS NULL OR p.nationality = $3) AND ($4::VARCHAR IS NULL OR p.main_position = $4) '
+        'AND %s AND %s IS NULL AND ($2::INT IS NULL OR p.player_id %s $2) '
+        'ORDER BY p.player_id %s LIMIT $7',
+        p_select, salary_filter, p_sort_expr, comparison, direction
+    );
+END;
+$$;
+
+-- Runs both phases of a keyset page; p_after_id IS NOT NULL with p_after_value IS NULL means the previous
+-- page ended inside the NULL-key tail.
+CREATE OR REPLACE FUNCTION keyset_page(
+    p_select TEXT,
+    p_columns TEXT[],
+    p_sort_column TEXT,
+    p_descending BOOLEAN,
+    p_salary_column TEXT,
+    p_page_size INT,
+    p_after_value TEXT,
+    p_after_id INT,
+    p_nationality VARCHAR,
+    p_position VARCHAR,
+    p_min_salary DECIMAL,
+    p_max_salary DECIMAL
+)
+RETURNS SETOF RECORD
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    sort_expr TEXT;
+    sort_type TEXT;
+    fetched INT := 0;
+    in_null_tail BOOLEAN := p_after_value IS NULL AND p_after_id IS NOT NULL;
+BEGIN
+    SELECT c.expr, c.type INTO sort_expr, sort_type
+    FROM unnest(p_columns) AS entry
+    CROSS JOIN LATERAL (
+        SELECT split_part(entry, ':', 1) AS name, split_part(entry, ':', 2) AS expr, split_part(entry, ':', 3) AS type
+    ) c
+    WHERE c.name = p_sort_column;
+
+    IF sort_expr IS NULL THEN
+        RAISE EXCEPTION 'Unsupported sort column: %', p_sort_column;
+    END IF;
+
+    IF p_page_size IS NULL OR p_page_size < 1 THEN
+        RAISE EXCEPTION 'Page size must be a positive number';
+    END IF;
+
+    IF NOT in_null_tail THEN
+        RETURN QUERY EXECUTE keyset_page_query(p_select, sort_expr, sort_type, p_descending, p_salary_column, 'values')
+            USING p_after_value, p_after_id, p_nationality, p_position, p_min_salary, p_max_salary, p_page_size;
+        GET DIAGNOSTICS fetched = ROW_COUNT;
+    END IF;
+
+    IF fetched < p_page_size THEN
+        RETURN QUERY EXECUTE keyset_page_query(p_select, sort_expr, sort_type, p_descending, p_salary_column, 'nulls')
+            USING NULL::TEXT, CASE WHEN in_null_tail THEN p_after_id END, p_nationality, p_position,
+                  p_min_salary, p_max_salary, p_page_size - fetched;
+    END IF;
 END;
 $$;
 
--- Procedure to add a new player
+-- Keyset-paginated, sortable and filterable variants of the display functions
+CREATE OR REPLACE FUNCTION display_players_page(
+    p_page_size INT DEFAULT 100,
+    p_sort_column TEXT DEFAULT 'player_id',
+    p_descending BOOLEAN DEFAULT FALSE,
+    p_after_value TEXT DEFAULT NULL,
+    p_after_id INT DEFAULT NULL,
+    p_nationality VARCHAR DEFAULT NULL,
+    p_position VARCHAR DEFAULT NULL,
+    p_min_salary DECIMAL DEFAULT NULL,
+    p_max_salary DECIMAL DEFAULT NULL
+)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, date_of_birth DATE, nationality VARCHAR, main_position VARCHAR, estimated_market_price DECIMAL)
+LANGUAGE sql STABLE
+AS $$
+    SELECT * FROM keyset_page(
+        'SELECT p.player_id, p.first_name, p.last_name, p.date_of_birth, p.nationality, p.main_position, p.estimated_market_price '
+        'FROM players p',
+        ARRAY['player_id:p.player_id:INT', 'first_name:p.first_name:VARCHAR', 'last_name:p.last_name:VARCHAR',
+              'date_of_birth:p.date_of_birth:DATE', 'nationality:p.nationality:VARCHAR',
+              'main_position:p.main_position:VARCHAR', 'estimated_market_price:p.estimated_market_price:DECIMAL'],
+        p_sort_column, p_descending, NULL, p_page_size, p_after_value, p_after_id,
+        p_nationality, p_position, p_min_salary, p_max_salary
+    ) AS t(player_id INT, first_name VARCHAR, last_name VARCHAR, date_of_birth DATE, nationality VARCHAR, main_position VARCHAR, estimated_market_price DECIMAL);
+$$;
+
+CREATE OR REPLACE FUNCTION display_contracts_page(
+    p_page_size INT DEFAULT 100,
+    p_sort_column TEXT DEFAULT 'player_id',
+    p_descending BOOLEAN DEFAULT FALSE,
+    p_after_value TEXT DEFAULT NULL,
+    p_after_id INT DEFAULT NULL,
+    p_nationality VARCHAR DEFAULT NULL,
+    p_position VARCHAR DEFAULT NULL,
+    p_min_salary DECIMAL DEFAULT NULL,
+    p_max_salary DECIMAL DEFAULT NULL
+)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, sign_date DATE, end_date DATE, monthly_salary DECIMAL)
+LANGUAGE sql STABLE
+AS $$
+    SELECT * FROM keyset_page(
+        'SELECT p.player_id, p.first_name, p.last_name, c.sign_date, c.end_date, c.monthly_salary '
+        'FROM contracts c JOIN players p USING (player_id)',
+        ARRAY['player_id:p.player_id:INT', 'first_name:p.first_name:VARCHAR', 'last_name:p.last_name:VARCHAR',
+              'sign_date:c.sign_date:DATE', 'end_date:c.end_date:DATE', 'monthly_salary:c.monthly_salary:DECIMAL'],
+        p_sort_column, p_descending, 'c.monthly_salary', p_page_size, p_after_value, p_after_id,
+        p_nationality, p_position, p_min_salary, p_max_salary
+    ) AS t(player_id INT, first_name VARCHAR, last_name VARCHAR, sign_date DATE, end_date DATE, monthly_salary DECIMAL);
+$$;
+
+CREATE OR REPLACE FUNCTION display_statistics_page(
+    p_page_size INT DEFAULT 100,
+    p_sort_column TEXT DEFAULT 'player_id',
+    p_descending BOOLEAN DEFAULT FALSE,
+    p_after_value TEXT DEFAULT NULL,
+    p_after_id INT DEFAULT NULL,
+    p_nationality VARCHAR DEFAULT NULL,
+    p_position VARCHAR DEFAULT NULL,
+    p_min_salary DECIMAL DEFAULT NULL,
+    p_max_salary DECIMAL DEFAULT NULL
+)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, matches_played INT, total_play_time INT, goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT * FROM keyset_page(
+        'SELECT p.player_id, p.first_name, p.last_name, s.matches_played, s.total_play_time, s.goals, s.assists, '
+        's.tackles, s.saves, s.yellow_cards, s.red_cards FROM statistics s JOIN players p USING (player_id)',
+        ARRAY['player_id:p.player_id:INT', 'first_name:p.first_name:VARCHAR', 'last_name:p.last_name:VARCHAR',
+              'matches_played:s.matches_played:INT', 'total_play_time:s.total_play_time:INT', 'goals:s.goals:INT',
+              'assists:s.assists:INT', 'tackles:s.tackles:INT', 'saves:s.saves:INT',
+              'yellow_cards:s.yellow_cards:INT', 'red_cards:s.red_cards:INT'],
+        p_sort_column, p_descending, NULL, p_page_size, p_after_value, p_after_id,
+        p_nationality, p_position, p_min_salary, p_max_salary
+    ) AS t(player_id INT, first_name VARCHAR, last_name VARCHAR, matches_played INT, total_play_time INT, goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT);
+$$;
+
+CREATE OR REPLACE FUNCTION display_avg_performance_page(
+    p_page_size INT DEFAULT 100,
+    p_sort_column TEXT DEFAULT 'avg_performance',
+    p_descending BOOLEAN DEFAULT TRUE,
+    p_after_value TEXT DEFAULT NULL,
+    p_after_id INT DEFAULT NULL,
+    p_nationality VARCHAR DEFAULT NULL,
+    p_position VARCHAR DEFAULT NULL,
+    p_min_salary DECIMAL DEFAULT NULL,
+    p_max_salary DECIMAL DEFAULT NULL
+)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, avg_performance DECIMAL)
+LANGUAGE sql STABLE
+AS $$
+    SELECT * FROM keyset_page(
+        'SELECT p.player_id, p.first_name, p.last_name, a.avg_performance '
+        'FROM avg_performance a JOIN players p USING (player_id)',
+        ARRAY['player_id:p.player_id:INT', 'first_name:p.first_name:VARCHAR', 'last_name:p.last_name:VARCHAR',
+              'avg_performance:a.avg_performance:DECIMAL'],
+        p_sort_column, p_descending, NULL, p_page_size, p_after_value, p_after_id,
+        p_nationality, p_position, p_min_salary, p_max_salary
+    ) AS t(player_id INT, first_name VARCHAR, last_name VARCHAR, avg_performance DECIMAL);
+$$;
+
+-- Rows of the paginated display functions for the given players only, filtered the same way, so a view can
+-- refresh the rows that changed instead of loading the page again. A player missing from the result no longer
+-- belongs in the view.
+CREATE OR REPLACE FUNCTION display_players_by_ids(
+    p_player_ids INT[],
+    p_nationality VARCHAR DEFAULT NULL,
+    p_position VARCHAR DEFAULT NULL,
+    p_min_salary DECIMAL DEFAULT NULL,
+    p_max_salary DECIMAL DEFAULT NULL
+)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, date_of_birth DATE, nationality VARCHAR,
+              main_position VARCHAR, estimated_market_price DECIMAL)
+LANGUAGE sql STABLE
+AS $$
+    SELECT p.player_id, p.first_name, p.last_name, p.date_of_birth, p.nationality, p.main_position,
+           p.estimated_market_price
+    FROM players p
+    WHERE p.player_id = ANY(p_player_ids)
+      AND (p_nationality IS NULL OR p.nationality = p_nationality)
+      AND (p_position IS NULL OR p.main_position = p_position)
+      AND ((p_min_salary IS NULL AND p_max_salary IS NULL) OR EXISTS (
+          SELECT 1 FROM contracts sc WHERE sc.player_id = p.player_id
+              AND (p_min_salary IS NULL OR sc.monthly_salary >= p_min_salary)
+              AND (p_max_salary IS NULL OR sc.monthly_salary <= p_max_salary)))
+    ORDER BY p.player_id;
+$$;
+
+CREATE OR REPLACE FUNCTION display_contracts_by_ids(
+    p_player_ids INT[],
+    p_nationality VARCHAR DEFAULT NULL,
+    p_position VARCHAR DEFAULT NULL,
+    p_min_salary DECIMAL DEFAULT NULL,
+    p_max_salary DECIMAL DEFAULT NULL
+)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, sign_date DATE, end_date DATE,
+              monthly_salary DECIMAL)
+LANGUAGE sql STABLE
+AS $$
+    SELECT p.player_id, p.first_name, p.last_name, c.sign_date, c.end_date, c.monthly_salary
+    FROM contracts c
+    JOIN players p USING (player_id)
+    WHERE c.player_id = ANY(p_player_ids)
+      AND (p_nationality IS NULL OR p.nationality = p_nationality)
+      AND (p_position IS NULL OR p.main_position = p_position)
+      AND (p_min_salary IS NULL OR c.monthly_salary >= p_min_salary)
+      AND (p_max_salary IS NULL OR c.monthly_salary <= p_max_salary)
+    ORDER BY p.player_id;
+$$;
+
+CREATE OR REPLACE FUNCTION display_statistics_by_ids(
+    p_player_ids INT[],
+    p_nationality VARCHAR DEFAULT NULL,
+    p_position VARCHAR DEFAULT NULL,
+    p_min_salary DECIMAL DEFAULT NULL,
+    p_max_salary DECIMAL DEFAULT NULL
+)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, matches_played INT, total_play_time INT,
+              goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT p.player_id, p.first_name, p.last_name, s.matches_played, s.total_play_time, s.goals, s.assists,
+           s.tackles, s.saves, s.yellow_cards, s.red_cards
+    FROM statistics s
+    JOIN players p USING (player_id)
+    WHERE s.player_id = ANY(p_player_ids)
+      AND (p_nationality IS NULL OR p.nationality = p_nationality)
+      AND (p_position IS NULL OR p.main_position = p_position)
+      AND ((p_min_salary IS NULL AND p_max_salary IS NULL) OR EXISTS (
+          SELECT 1 FROM contracts sc WHERE sc.player_id = p.player_id
+              AND (p_min_salary IS NULL OR sc.monthly_salary >= p_min_salary)
+              AND (p_max_salary IS NULL OR sc.monthly_salary <= p_max_salary)))
+    ORDER BY p.player_id;
+$$;
+
+CREATE OR REPLACE FUNCTION display_avg_performance_by_ids(
+    p_player_ids INT[],
+    p_nationality VARCHAR DEFAULT NULL,
+    p_position VARCHAR DEFAULT NULL,
+    p_min_salary DECIMAL DEFAULT NULL,
+    p_max_salary DECIMAL DEFAULT NULL
+)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, avg_performance DECIMAL)
+LANGUAGE sql STABLE
+AS $$
+    SELECT p.player_id, p.first_name, p.last_name, a.avg_performance
+    FROM avg_performance a
+    JOIN players p USING (player_id)
+    WHERE a.player_id = ANY(p_player_ids)
+      AND (p_nationality IS NULL OR p.nationality = p_nationality)
+      AND (p_position IS NULL OR p.main_position = p_position)
+      AND ((p_min_salary IS NULL AND p_max_salary IS NULL) OR EXISTS (
+          SELECT 1 FROM contracts sc WHERE sc.player_id = p.player_id
+              AND (p_min_salary IS NULL OR sc.monthly_salary >= p_min_salary)
+              AND (p_max_salary IS NULL OR sc.monthly_salary <= p_max_salary)))
+    ORDER BY p.player_id;
+$$;
+
+-- Materialized ranking behind the leaderboards: overall, per position and per nationality.
+-- Ties share a rank; percentile is the share of ranked players the player is ahead of.
+CREATE MATERIALIZED VIEW IF NOT EXISTS player_rankings AS
+SELECT a.player_id, p.first_name, p.last_name, p.main_position, p.nationality, a.avg_performance,
+       rank() OVER (ORDER BY a.avg_performance DESC) AS overall_rank,
+       rank() OVER (PARTITION BY p.main_position ORDER BY a.avg_performance DESC) AS position_rank,
+       rank() OVER (PARTITION BY p.nationality ORDER BY a.avg_performance DESC) AS nationality_rank,
+       round((100 * percent_rank() OVER (ORDER BY a.avg_performance))::NUMERIC, 1) AS percentile
+FROM avg_performance a
+JOIN players p USING (player_id);
+
+-- The unique index is what allows REFRESH ... CONCURRENTLY; the rest turn top-N into short index range scans
+CREATE UNIQUE INDEX IF NOT EXISTS idx_player_rankings_player_id ON player_rankings (player_id);
+CREATE INDEX IF NOT EXISTS idx_player_rankings_overall ON player_rankings (overall_rank);
+CREATE INDEX IF NOT EXISTS idx_player_rankings_position ON player_rankings (main_position, position_rank);
+CREATE INDEX IF NOT EXISTS idx_player_rankings_position_rank ON player_rankings (position_rank);
+CREATE INDEX IF NOT EXISTS idx_player_rankings_nationality ON player_rankings (nationality, nationality_rank);
+CREATE INDEX IF NOT EXISTS idx_player_rankings_nationality_rank ON player_rankings (nationality_rank);
+
+-- When the rankings were last recomputed. Writes to players and avg_performance do not refresh them: the
+-- application refreshes them a few seconds after such changes reach it, and the leaderboards show this time.
+CREATE TABLE IF NOT EXISTS leaderboard_status (
+    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+    refreshed_at TIMESTAMPTZ NOT NULL
+);
+
+INSERT INTO leaderboard_status (refreshed_at) VALUES (now()) ON CONFLICT (singleton) DO NOTHING;
+
+-- Procedure to recompute the rankings without blocking readers of the leaderboards. Every application session
+-- refreshes after the changes it hears of, so refreshes take turns, and p_changes_age skips the ones already done:
+-- when the changes to cover were committed at least that many seconds before the call, a refresh started since
+-- then has them. Replaces the signature without p_changes_age.
+DROP PROCEDURE IF EXISTS refresh_leaderboard();
+CREATE OR REPLACE PROCEDURE refresh_leaderboard(p_changes_age DOUBLE PRECISION DEFAULT NULL)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    started TIMESTAMPTZ;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('refresh_leaderboard'));
+    IF p_changes_age IS NOT NULL AND (SELECT refreshed_at FROM leaderboard_status) >=
+            statement_timestamp() - make_interval(secs => p_changes_age) THEN
+        RETURN;
+    END IF;
+    -- The refresh sees every change committed before it starts
+    started := clock_timestamp();
+    REFRESH MATERIALIZED VIEW CONCURRENTLY player_rankings;
+    -- Fresh statistics keep the planner on the rank indexes; a refresh can change the row count by orders of magnitude
+    ANALYZE player_rankings;
+    UPDATE leaderboard_status SET refreshed_at = started;
+END;
+$$;
+
+-- Function to display when the rankings behind the leaderboards were last recomputed
+CREATE OR REPLACE FUNCTION display_leaderboard_status()
+RETURNS TABLE(refreshed_at TIMESTAMPTZ)
+LANGUAGE sql STABLE
+AS $$
+    SELECT s.refreshed_at FROM leaderboard_status s;
+$$;
+
+-- Function to display the top p_limit players overall ('overall'), per position ('position') or per nationality
+-- ('nationality'). With a grouping, p_group_value narrows it to one group; NULL returns the top of every group.
+CREATE OR REPLACE FUNCTION display_leaderboard(
+    p_group TEXT DEFAULT 'overall',
+    p_limit INT DEFAULT 50,
+    p_group_value VARCHAR DEFAULT NULL
+)
+RETURNS TABLE(player_id INT, rank BIGINT, group_value VARCHAR, first_name VARCHAR, last_name VARCHAR,
+              main_position VARCHAR, nationality VARCHAR, avg_performance DECIMAL, percentile NUMERIC)
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    rank_column TEXT;
+    group_column TEXT;
+BEGIN
+    CASE p_group
+        WHEN 'overall' THEN rank_column := 'overall_rank';
+        WHEN 'position' THEN rank_column := 'position_rank'; group_column := 'main_position';
+        WHEN 'nationality' THEN rank_column := 'nationality_rank'; group_column := 'nationality';
+        ELSE RAISE EXCEPTION 'Unknown leaderboard group: %', p_group;
+    END CASE;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT r.player_id, r.%1$I, %2$s, r.first_name, r.last_name, r.main_position, r.nationality, '
+        'r.avg_performance, r.percentile '
+        'FROM player_rankings r '
+        'WHERE r.%1$I <= $1 %3$s '
+        'ORDER BY %4$s r.%1$I, r.player_id',
+        rank_column,
+        CASE WHEN group_column IS NULL THEN 'NULL::VARCHAR' ELSE format('r.%I', group_column) END,
+        CASE WHEN group_column IS NULL OR p_group_value IS NULL THEN '' ELSE format('AND r.%I = $2', group_column) END,
+        CASE WHEN group_column IS NULL OR p_group_value IS NOT NULL THEN '' ELSE format('r.%I,', group_column) END
+    ) USING p_limit, p_group_value;
+END;
+$$;
+
+-- Month number of a date (year * 12 + month), so the months between two dates are a subtraction
+CREATE OR REPLACE FUNCTION month_number(p_date DATE)
+RETURNS INT
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT (extract(year FROM p_date) * 12 + extract(month FROM p_date))::INT;
+$$;
+
+-- Function to display the contracts ending within p_days of p_from (inclusive), soonest first
+CREATE OR REPLACE FUNCTION display_expiring_contracts(p_days INT, p_from DATE DEFAULT current_date)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, main_position VARCHAR, nationality VARCHAR,
+              sign_date DATE, end_date DATE, days_left INT, monthly_salary DECIMAL)
+LANGUAGE sql STABLE
+AS $$
+    SELECT c.player_id, p.first_name, p.last_name, p.main_position, p.nationality, c.sign_date, c.end_date,
+           c.end_date - p_from, c.monthly_salary
+    FROM contracts c
+    JOIN players p USING (player_id)
+    WHERE c.end_date BETWEEN p_from AND p_from + p_days
+    ORDER BY c.end_date, c.player_id;
+$$;
+
+-- Function to project the monthly payroll from p_from to p_to: a contract is paid its monthly salary for every
+-- month it runs on at least one day of. Each contract adds its salary in its first month and takes it away after
+-- its last, and a running sum over the generated months turns those changes into the payroll, so the cost grows
+-- with the contracts still running rather than with contracts times months. Contracts without an end date are
+-- not projected.
+CREATE OR REPLACE FUNCTION display_payroll_projection(p_from DATE, p_to DATE)
+RETURNS TABLE(month DATE, players INT, payroll DECIMAL)
+LANGUAGE sql STABLE
+AS $$
+    WITH running AS (
+        SELECT date_trunc('month', greatest(c.sign_date, p_from))::DATE AS first_month,
+               (date_trunc('month', c.end_date) + INTERVAL '1 month')::DATE AS after_month,
+               c.monthly_salary
+        FROM contracts c
+        WHERE c.end_date >= p_from AND (c.sign_date IS NULL OR c.sign_date <= p_to)
+    ),
+    changes AS (
+        SELECT d.change_month, sum(d.players) AS players, sum(d.payroll) AS payroll
+        FROM (
+            SELECT r.first_month AS change_month, 1 AS players, r.monthly_salary AS payroll FROM running r
+            UNION ALL
+            SELECT r.after_month, -1, -r.monthly_salary FROM running r
+        ) d
+        GROUP BY d.change_month
+    )
+    SELECT m.month::DATE, (sum(coalesce(c.players, 0)) OVER w)::INT, coalesce(sum(c.payroll) OVER w, 0)
+    FROM generate_series(date_trunc('month', p_from), date_trunc('month', p_to), INTERVAL '1 month') m(month)
+    LEFT JOIN changes c ON c.change_month = m.month
+    WINDOW w AS (ORDER BY m.month)
+    ORDER BY m.month;
+$$;
+
+-- Function to display the payroll per main position ('position') or nationality ('nationality'): the contracts
+-- running on p_from and their monthly payroll, the payroll committed from p_from to p_to (counted by month, as in
+-- display_payroll_projection) and the contracts ending in that window
+CREATE OR REPLACE FUNCTION display_payroll_by_group(p_group TEXT, p_from DATE, p_to DATE)
+RETURNS TABLE(group_value VARCHAR, players INT, monthly_payroll DECIMAL, committed_payroll DECIMAL,
+              expiring_players INT, expiring_payroll DECIMAL)
+LANGUAGE plpgsql STABLE
+AS $$
+BEGIN
+    IF p_group NOT IN ('position', 'nationality') THEN
+        RAISE EXCEPTION 'Unknown payroll group: %', p_group;
+    END IF;
+
+    RETURN QUERY
+    SELECT g.group_value,
+           (count(*) FILTER (WHERE g.running))::INT,
+           coalesce(sum(g.monthly_salary) FILTER (WHERE g.running), 0),
+           coalesce(sum(g.monthly_salary * g.months), 0),
+           (count(*) FILTER (WHERE g.expiring))::INT,
+           coalesce(sum(g.monthly_salary) FILTER (WHERE g.expiring), 0)
+    FROM (
+        SELECT CASE p_group WHEN 'position' THEN p.main_position ELSE p.nationality END AS group_value,
+               c.monthly_salary,
+               c.sign_date IS NULL OR c.sign_date <= p_from AS running,
+               c.end_date <= p_to AS expiring,
+               month_number(least(c.end_date, p_to)) - month_number(greatest(c.sign_date, p_from)) + 1 AS months
+        FROM contracts c
+        JOIN players p USING (player_id)
+        WHERE c.end_date >= p_from AND (c.sign_date IS NULL OR c.sign_date <= p_to)
+    ) g
+    GROUP BY g.group_value
+    ORDER BY 4 DESC, 1;
+END;
+$$;
+
+-- Procedure to add a new player; p_player_id returns the generated ID so the contract and statistics of a
+-- new signing can be written in the same transaction. Replaces the signature without p_player_id.
+DROP PROCEDURE IF EXISTS add_player(VARCHAR, VARCHAR, DATE, VARCHAR, VARCHAR, DECIMAL);
 CREATE OR REPLACE PROCEDURE add_player(
     p_first_name VARCHAR,
     p_last_name VARCHAR,
     p_date_of_birth DATE,
     p_nationality VARCHAR,
     p_main_position VARCHAR,
-    p_estimated_market_price DECIMAL
+    p_estimated_market_price DECIMAL,
+    INOUT p_player_id INT DEFAULT NULL
 )
 LANGUAGE plpgsql
 AS $$
 BEGIN
     INSERT INTO players (first_name, last_name, date_of_birth, nationality, main_position, estimated_market_price)
-    VALUES (p_first_name, p_last_name, p_date_of_birth, p_nationality, p_main_position, p_estimated_market_price);
+    VALUES (p_first_name, p_last_name, p_date_of_birth, p_nationality, p_main_position, p_estimated_market_price)
+    RETURNING player_id INTO p_player_id;
 END;
 $$;
 
@@ -242,15 +1325,15 @@ BEGIN
 END;
 $$;
 
--- Procedure to clean all the relevant tables in the schema
+-- Procedure to clean all the relevant tables in the schema, in one TRUNCATE so the tables are locked and emptied
+-- once; match_events and season_statistics follow through the cascade, performance_weights is kept
 CREATE OR REPLACE PROCEDURE clean_all_tables()
 LANGUAGE plpgsql
 AS $$
 BEGIN
-    CALL clean_table('players');
-    CALL clean_table('avg_performance');
-    CALL clean_table('contracts');
-    CALL clean_table('statistics');
+    TRUNCATE TABLE players, avg_performance, contracts, statistics RESTART IDENTITY CASCADE;
+    -- Otherwise the leaderboards would keep listing the removed players
+    CALL refresh_leaderboard();
 END;
 $$;
 
@@ -258,13 +1341,127 @@ $$;
 CREATE OR REPLACE FUNCTION search_by_last_name(last_name_query TEXT)
 RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, date_of_birth DATE, nationality VARCHAR, main_position VARCHAR, estimated_market_price DECIMAL,
               matches_played INT, total_play_time INT,  goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT)
-LANGUAGE plpgsql
+LANGUAGE sql STABLE
 AS $$
-BEGIN
-    RETURN QUERY
     SELECT p.*, s.matches_played, s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards, s.red_cards
-    FROM players p JOIN statistics s USING (player_id)
+    FROM players p LEFT JOIN statistics s USING (player_id)
     WHERE p.last_name = last_name_query;
+$$;
+
+-- Case-insensitive name indexes: text_pattern_ops serves prefix LIKE and its byte-wise ordering
+CREATE INDEX IF NOT EXISTS idx_players_last_name_lower ON players (lower(last_name) text_pattern_ops, player_id);
+CREATE INDEX IF NOT EXISTS idx_players_first_name_lower ON players (lower(first_name) text_pattern_ops, player_id);
+
+-- Trigram indexes for fuzzy search; GiST also answers nearest-neighbour ordering by distance (<->)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS idx_players_last_name_trgm ON players USING gist (lower(last_name) gist_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_players_first_name_trgm ON players USING gist (lower(first_name) gist_trgm_ops);
+    END IF;
+END;
+$$;
+
+-- Function to search players by first or last name.
+-- Modes: 'prefix' (case-insensitive name prefix), 'exact' (case-insensitive full name) and 'fuzzy' (trigram similarity).
+-- Last-name matches rank ahead of first-name matches; every branch reads at most p_limit rows from its index.
+CREATE OR REPLACE FUNCTION search_players(p_query TEXT, p_mode TEXT DEFAULT 'prefix', p_limit INT DEFAULT 50)
+RETURNS TABLE(player_id INT, first_name VARCHAR, last_name VARCHAR, date_of_birth DATE, nationality VARCHAR, main_position VARCHAR, estimated_market_price DECIMAL,
+              matches_played INT, total_play_time INT,  goals INT, assists INT, tackles INT, saves INT, yellow_cards INT, red_cards INT)
+LANGUAGE plpgsql STABLE
+-- Plan with the actual search text so LIKE prefixes and trigram operators can use the indexes
+SET plan_cache_mode = force_custom_plan
+AS $$
+DECLARE
+    search_text TEXT := lower(trim(p_query));
+    like_prefix TEXT;
+BEGIN
+    IF search_text IS NULL OR search_text = '' OR p_limit <= 0 THEN
+        RETURN;
+    END IF;
+
+    IF p_mode = 'prefix' THEN
+        like_prefix := replace(replace(replace(search_text, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+        RETURN QUERY
+        WITH matches AS (
+            (SELECT pl.player_id, 1 AS rank_group, lower(pl.last_name) AS rank_key
+             FROM players pl
+             WHERE lower(pl.last_name) LIKE like_prefix
+             ORDER BY lower(pl.last_name) USING ~<~, pl.player_id
+             LIMIT p_limit)
+            UNION ALL
+            (SELECT pl.player_id, 2, lower(pl.first_name)
+             FROM players pl
+             WHERE lower(pl.first_name) LIKE like_prefix
+             ORDER BY lower(pl.first_name) USING ~<~, pl.player_id
+             LIMIT p_limit)
+        ), ranked AS (
+            SELECT DISTINCT ON (m.player_id) m.player_id, m.rank_group, m.rank_key
+            FROM matches m
+            ORDER BY m.player_id, m.rank_group
+        )
+        SELECT p.*, s.matches_played, s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards, s.red_cards
+        FROM ranked r
+        JOIN players p ON p.player_id = r.player_id
+        LEFT JOIN statistics s ON s.player_id = r.player_id
+        ORDER BY r.rank_group, r.rank_key USING ~<~, r.player_id
+        LIMIT p_limit;
+
+    ELSIF p_mode = 'exact' THEN
+        RETURN QUERY
+        SELECT p.*, s.matches_played, s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards, s.red_cards
+        FROM players p
+        LEFT JOIN statistics s ON s.player_id = p.player_id
+        WHERE p.player_id IN (
+            (SELECT pl.player_id FROM players pl WHERE lower(pl.last_name) = search_text ORDER BY pl.player_id LIMIT p_limit)
+            UNION
+            (SELECT pl.player_id FROM players pl WHERE lower(pl.first_name) = search_text ORDER BY pl.player_id LIMIT p_limit)
+        )
+        ORDER BY lower(p.last_name) <> search_text, p.player_id
+        LIMIT p_limit;
+
+    ELSIF p_mode = 'fuzzy' THEN
+        IF to_regprocedure('similarity(text, text)') IS NULL THEN
+            -- Without pg_trgm the closest we can get is a case-insensitive substring match
+            RETURN QUERY
+            SELECT p.*, s.matches_played, s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards, s.red_cards
+            FROM players p
+            LEFT JOIN statistics s ON s.player_id = p.player_id
+            WHERE strpos(lower(p.last_name), search_text) > 0 OR strpos(lower(p.first_name), search_text) > 0
+            ORDER BY strpos(lower(p.last_name), search_text) = 0, lower(p.last_name), p.player_id
+            LIMIT p_limit;
+            RETURN;
+        END IF;
+
+        RETURN QUERY
+        WITH matches AS (
+            (SELECT pl.player_id, lower(pl.last_name) <-> search_text AS distance
+             FROM players pl
+             WHERE lower(pl.last_name) % search_text
+             ORDER BY lower(pl.last_name) <-> search_text
+             LIMIT p_limit)
+            UNION ALL
+            (SELECT pl.player_id, lower(pl.first_name) <-> search_text
+             FROM players pl
+             WHERE lower(pl.first_name) % search_text
+             ORDER BY lower(pl.first_name) <-> search_text
+             LIMIT p_limit)
+        ), ranked AS (
+            SELECT m.player_id, min(m.distance) AS distance
+            FROM matches m
+            GROUP BY m.player_id
+        )
+        SELECT p.*, s.matches_played, s.total_play_time, s.goals, s.assists, s.tackles, s.saves, s.yellow_cards, s.red_cards
+        FROM ranked r
+        JOIN players p ON p.player_id = r.player_id
+        LEFT JOIN statistics s ON s.player_id = r.player_id
+        ORDER BY r.distance, r.player_id
+        LIMIT p_limit;
+
+    ELSE
+        RAISE EXCEPTION 'Unknown search mode: %', p_mode;
+    END IF;
 END;
 $$;
 
@@ -292,12 +1489,17 @@ BEGIN
 END;
 $$;
 
--- Procedure to delete a player by ID
-CREATE OR REPLACE PROCEDURE delete_player(p_last_name VARCHAR)
+-- Procedure to delete players by last name through delete_by_ids; p_deleted_ids returns the removed IDs
+-- so callers can drop them from what they display. Replaces the signature without p_deleted_ids.
+DROP PROCEDURE IF EXISTS delete_player(VARCHAR);
+CREATE OR REPLACE PROCEDURE delete_player(p_last_name VARCHAR, INOUT p_deleted_ids INT[] DEFAULT NULL)
 LANGUAGE plpgsql
 AS $$
+DECLARE
+    deleted_count INT;
 BEGIN
-    DELETE FROM players WHERE last_name = p_last_name;
+    p_deleted_ids := ARRAY(SELECT player_id FROM players WHERE last_name = p_last_name ORDER BY player_id);
+    CALL delete_by_ids(p_deleted_ids, deleted_count);
 END;
 $$;
 
@@ -324,6 +1526,20 @@ GRANT USAGE, SELECT, UPDATE ON ALL SEQUENCES IN SCHEMA public TO team_manager;
 GRANT TRUNCATE ON ALL TABLES IN SCHEMA public TO team_manager;
 ALTER TABLE players OWNER TO team_manager;
 ALTER TABLE avg_performance OWNER TO team_manager;
+ALTER TABLE performance_weights OWNER TO team_manager;
 ALTER TABLE contracts OWNER TO team_manager;
 ALTER TABLE statistics OWNER TO team_manager;
-ALTER SEQUENCE players_player_id_seq OWNER TO team_manager;
\ No newline at end of file
+ALTER SEQUENCE players_player_id_seq OWNER TO team_manager;
+ALTER MATERIALIZED VIEW player_rankings OWNER TO team_manager;
+ALTER TABLE season_statistics OWNER TO team_manager;
+-- TRUNCATE ... RESTART IDENTITY requires owning match_events and its sequence; ensure_match_event_partitions
+-- hands the partitions it creates later to the same owner
+DO $$
+DECLARE
+    partition_name REGCLASS;
+BEGIN
+    ALTER TABLE match_events OWNER TO team_manager;
+    FOR partition_name IN SELECT inhrelid::REGCLASS FROM pg_inherits WHERE inhparent = 'match_events'::REGCLASS LOOP
+        EXECUTE format('ALTER TABLE %s OWNER TO team_manager', partition_name);
+    END LOOP;
+END $$;
\ No newline at end of file